@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la limpieza vectorizada frente a apply fila por fila.
+
+Compara las etapas de limpieza de valores vacíos, filtrado de identificadores
+requeridos y estadística de contactos solo con país.
+
+Uso:
+    python benchmark_cleaning.py --rows 200000
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+
+import pandas as pd
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contactos_pais import (
+    clean_value, clean_value_series, filter_required_fields, count_only_country_tags
+)
+
+CLEAN_COLUMNS = ['First Name', 'Last Name', 'Address', 'Website', 'Facebook',
+                 'Instagram', 'LinkedIn', 'Carreras', 'Notas']
+
+VALUES = ["Universidad Nacional", "  Privada ", "–", "nan", "None", "", "-", "https://uni.edu",
+          "Ingeniería Industrial", "NULL", "undefined", "Calle 5 #12-30", None]
+
+COUNTRIES = ["Honduras", "Peru", "Dominican Republic", "", "Chile"]
+
+def build_frame(n_rows, seed=7):
+    """Genera un DataFrame sintético con valores vacíos mezclados"""
+    rng = random.Random(seed)
+    data = {col: [rng.choice(VALUES) for _ in range(n_rows)] for col in CLEAN_COLUMNS}
+    data['Email'] = [rng.choice(["", "info@uni.edu"]) for _ in range(n_rows)]
+    data['Phone'] = [rng.choice(["", "+50425618727"]) for _ in range(n_rows)]
+    data['Country'] = [rng.choice(COUNTRIES) for _ in range(n_rows)]
+    data['Tags'] = [
+        country.lower() if rng.random() < 0.3 else f"{country.lower()}, logistica internacional"
+        for country in data['Country']
+    ]
+    return pd.DataFrame(data)
+
+def timed(func):
+    """Ejecuta func y devuelve (resultado, segundos)"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de limpieza vectorizada vs apply")
+    parser.add_argument('--rows', type=int, default=100000, help='Número de filas sintéticas')
+    args = parser.parse_args()
+
+    print(f"🧪 Generando {args.rows} filas sintéticas...")
+    df = build_frame(args.rows)
+    ok = True
+
+    stages = [
+        ("Limpieza de vacíos",
+         lambda: pd.DataFrame({c: df[c].apply(clean_value) for c in CLEAN_COLUMNS}),
+         lambda: pd.DataFrame({c: clean_value_series(df[c]) for c in CLEAN_COLUMNS})),
+        ("Identificadores requeridos",
+         lambda: filter_required_fields(df, vectorized=False).index,
+         lambda: filter_required_fields(df, vectorized=True).index),
+        ("Solo con país",
+         lambda: count_only_country_tags(df, vectorized=False),
+         lambda: count_only_country_tags(df, vectorized=True)),
+    ]
+
+    for name, legacy, vectorized in stages:
+        expected, legacy_time = timed(legacy)
+        result, vectorized_time = timed(vectorized)
+        if isinstance(expected, pd.DataFrame):
+            same = expected.astype(object).equals(result.astype(object))
+        elif isinstance(expected, pd.Index):
+            same = expected.equals(result)
+        else:
+            same = expected == result
+        ok = ok and same
+        print(f"📊 {name}: apply {legacy_time:.3f}s | vectorizado {vectorized_time:.3f}s | "
+              f"{legacy_time / vectorized_time:.1f}x {'✅' if same else '❌'}")
+
+    if not ok:
+        print("❌ Hay etapas con resultados distintos")
+        return 1
+    print("✅ Resultados idénticos en todas las etapas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark del motor de deduplicación.
+
+Genera contactos GHL sintéticos en los que una fracción de las filas repite
+un contacto anterior con otro email, otro teléfono o solo el sitio web en
+común, y mide dedupe_contacts frente a la deduplicación anterior por email
+(sort_values + drop_duplicates).
+
+Uso:
+    python benchmark_dedup.py --rows 1000000 --duplicates 0.1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dedup_engine import dedupe_contacts
+
+COUNTRIES = np.array(["Honduras", "Peru", "Chile", "Dominican Republic", "Colombia", "Mexico"])
+
+def build_contacts(n_rows, duplicates=0.1, seed=7):
+    """Genera contactos GHL donde ``duplicates`` de las filas repiten un contacto anterior"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_rows)
+    repeated = rng.random(n_rows) < duplicates
+    ids[repeated] = (rng.random(repeated.sum()) * np.flatnonzero(repeated)).astype(int)
+    text_ids = ids.astype(str)
+
+    # Las repeticiones cambian de email (o no lo tienen) y a veces de teléfono
+    variant = np.where(repeated, rng.integers(0, 3, n_rows), 0)
+    email = np.char.add(np.char.add("info", text_ids), "@uni.edu")
+    email = np.where(variant == 1, np.char.add("admisiones.", email), email)
+    email = np.where((variant == 2) | (rng.random(n_rows) < 0.2), "", email)
+    phone = np.char.add("+504", (20000000 + ids * 7).astype(str))
+    phone = np.where(variant == 2, np.char.add("+504", (90000000 + np.arange(n_rows)).astype(str)), phone)
+
+    return pd.DataFrame({
+        'First Name': np.char.add("Universidad ", text_ids),
+        'Last Name': "",
+        'Email': email,
+        'Phone': phone,
+        'Additional Phone Numbers': "",
+        'Additional Email Addresses': "",
+        'Country': COUNTRIES[ids % len(COUNTRIES)],
+        'Website': np.char.add(np.char.add("https://www.uni", text_ids), ".edu/"),
+        'Tags': "honduras, medicina",
+    }).astype(str)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la deduplicación de contactos")
+    parser.add_argument('--rows', type=int, default=200000, help='Número de filas sintéticas')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='Fracción de filas repetidas')
+    args = parser.parse_args()
+
+    print(f"🧪 Generando {args.rows} contactos ({args.duplicates:.0%} repetidos)...")
+    df = build_contacts(args.rows, args.duplicates)
+
+    start = time.perf_counter()
+    legacy = df.sort_values('Email').drop_duplicates(subset=['Email'], keep='first')
+    legacy_time = time.perf_counter() - start
+    print(f"📊 Por email (anterior): {legacy_time:.2f}s, {len(legacy)} filas")
+
+    start = time.perf_counter()
+    result, stats = dedupe_contacts(df)
+    elapsed = time.perf_counter() - start
+    print(f"📊 Motor de deduplicación: {elapsed:.2f}s | {args.rows / elapsed:,.0f} filas/s | {len(result)} filas")
+    stats.print_report()
+
+    expected = df['First Name'].nunique()
+    if len(result) != expected or not result.index.is_monotonic_increasing:
+        print(f"❌ Se esperaban {expected} contactos en el orden de entrada")
+        return 1
+    print("✅ Todos los duplicados fusionados en el orden de entrada")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
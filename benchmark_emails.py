@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la extracción de emails por columna frente a la función por celda.
+
+Compara, sobre las columnas Email_General y Rector_Email del Excel sintético:
+
+- normalize_email por celda (solo el primer email de cada columna, como antes),
+- split_contact_emails por celda (principal + adicionales),
+- extract_email_columns (un único patrón compilado con ``str.extractall``
+  sobre los valores únicos de cada columna).
+
+Comprueba que las dos extracciones completas coinciden y cuenta los emails
+adicionales que la versión de un solo email perdía.
+
+Uso:
+    python benchmark_emails.py --rows 200000
+"""
+
+import argparse
+import sys
+import os
+import time
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contactos_pais import extract_email_columns, normalize_email, split_contact_emails
+from synthetic_workbook import build_university_frame
+
+def timed(func):
+    """Ejecuta func y devuelve (resultado, segundos)"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def count_emails(column):
+    """Número de emails en una columna de valores separados por comas"""
+    return int(column.str.split(',').str.len().where(column != '', 0).sum())
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extracción de emails por columna vs por celda")
+    parser.add_argument('--rows', type=int, default=100000, help='Número de filas sintéticas')
+    parser.add_argument('--seed', type=int, default=7, help='Semilla del generador')
+    args = parser.parse_args()
+
+    print(f"🧪 Generando {args.rows} filas sintéticas...")
+    frame = build_university_frame(args.rows, seed=args.seed)
+    general, rector = frame['Email_General'], frame['Rector_Email']
+
+    (first_general, first_rector), first_time = timed(
+        lambda: (general.apply(normalize_email), rector.apply(normalize_email)))
+    pairs, cell_time = timed(lambda: [split_contact_emails(a, b) for a, b in zip(general, rector)])
+    (emails, additional), column_time = timed(lambda: extract_email_columns(general, rector))
+
+    same = [(a, b) for a, b in zip(emails, additional)] == pairs
+    before = int((first_general != '').sum() + ((first_rector != '') & (first_rector != first_general)).sum())
+    after = int((emails != '').sum()) + count_emails(additional)
+
+    print(f"📊 normalize_email por celda: {first_time:.3f}s")
+    print(f"📊 split_contact_emails por celda: {cell_time:.3f}s")
+    print(f"📊 extract_email_columns: {column_time:.3f}s | {cell_time / column_time:.1f}x sobre la versión por celda "
+          f"{'✅' if same else '❌'}")
+    print(f"📧 Emails conservados: {before} con solo el primero de cada celda, {after} con todos "
+          f"(+{after - before})")
+
+    if not same:
+        print("❌ La extracción por columna difiere de la versión por celda")
+        return 1
+    print("✅ Resultados idénticos")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria del modo --low-memory.
+
+Genera el Excel sintético (o usa uno existente) y ejecuta contactos_pais.py
+dos veces en procesos separados, con y sin --low-memory, leyendo el pico de
+memoria residente (RSS) del informe de --profile. Antes se hace una corrida
+sin medir para llenar la caché de libros, de modo que las dos mediciones
+parten de la misma lectura. También compara la memoria del DataFrame de
+contactos con y sin compact_frame y comprueba que los CSV son idénticos.
+
+Uso:
+    python benchmark_memory.py --rows 200000
+    python benchmark_memory.py --input BD_LATAM.xlsx
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from column_mapper import compact_frame, frame_memory_mb
+from contactos_pais import build_tagged_dataframe, read_workbook
+from synthetic_workbook import build_university_frame, write_workbook
+from workbook_cache import WorkbookCache
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'contactos_pais.py')
+
+def run_pipeline(input_excel, workdir, cache_dir, extra=()):
+    """
+    Ejecuta contactos_pais.py sin LLM en workdir.
+
+    Returns:
+        dict: Totales del informe de --profile (wall_s, rss_peak_mb...)
+    """
+    os.makedirs(workdir, exist_ok=True)
+    command = [sys.executable, SCRIPT, os.path.abspath(input_excel), '--no-llm', '--profile',
+               '--workbook-cache', cache_dir, *extra]
+    subprocess.run(command, cwd=workdir, check=True, stdout=subprocess.DEVNULL)
+    with open(os.path.join(workdir, 'contactos_todos_paises_profile.json'), encoding='utf-8') as handle:
+        return json.load(handle)['total']
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de --low-memory")
+    parser.add_argument('--rows', type=int, default=100000, help='Filas del Excel sintético')
+    parser.add_argument('--seed', type=int, default=7, help='Semilla del generador')
+    parser.add_argument('--input', default=None, help='Usar este Excel en lugar de generar uno')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_excel = args.input
+        if input_excel is None:
+            print(f"🧪 Generando Excel sintético de {args.rows} filas...")
+            input_excel = os.path.join(tmp, 'bd_sintetica.xlsx')
+            write_workbook(build_university_frame(args.rows, seed=args.seed), input_excel)
+        cache_dir = os.path.join(tmp, 'workbook_cache')
+
+        print("📥 Llenando la caché de libros...")
+        run_pipeline(input_excel, os.path.join(tmp, 'warm'), cache_dir)
+        baseline = run_pipeline(input_excel, os.path.join(tmp, 'normal'), cache_dir)
+        low = run_pipeline(input_excel, os.path.join(tmp, 'low'), cache_dir, ['--low-memory'])
+        same = filecmp.cmp(os.path.join(tmp, 'normal', 'contactos_todos_paises.csv'),
+                           os.path.join(tmp, 'low', 'contactos_todos_paises.csv'), shallow=False)
+
+        df = read_workbook(input_excel, WorkbookCache(cache_dir))
+        ghl_df = build_tagged_dataframe(df, use_llm=False)
+        del df
+        frame_before = frame_memory_mb(ghl_df)
+        frame_after = frame_memory_mb(compact_frame(ghl_df))
+        categories = [column for column in ghl_df.columns if ghl_df[column].dtype == 'category']
+
+    print(f"\n📊 Pico de RSS: {baseline['rss_peak_mb']} MB normal | {low['rss_peak_mb']} MB con --low-memory "
+          f"({low['rss_peak_mb'] - baseline['rss_peak_mb']:+.1f} MB)")
+    print(f"📊 Tiempo: {baseline['wall_s']:.2f}s normal | {low['wall_s']:.2f}s con --low-memory")
+    print(f"📊 DataFrame de contactos: {frame_before} MB -> {frame_after} MB "
+          f"({frame_after / frame_before:.0%}); category: {', '.join(categories)}")
+    if not same:
+        print("❌ Los CSV con y sin --low-memory difieren")
+        return 1
+    print("✅ CSV idénticos")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
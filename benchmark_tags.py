@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark del etiquetado por keywords: recorrido anidado original vs autómata Aho-Corasick.
+
+Uso:
+    python benchmark_tags.py --rows 200000
+    python benchmark_tags.py --rows 50000 --rule-copies 10
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contactos_pais import TAG_RULES, normalize
+from tag_matcher import KeywordTagMatcher, match_tags_loop
+
+FILLER = [
+    "Medicina", "Enfermería", "Odontología", "Arquitectura", "Contaduría Pública",
+    "Licenciatura en Historia", "Filosofía", "Música", "Artes Plásticas", "Veterinaria",
+    "Química Farmacéutica", "Biología", "Matemáticas", "Periodismo", "Teología",
+    "Trabajo Social", "Nutrición", "Fisioterapia", "Comunicación Audiovisual", "Turismo",
+]
+
+def build_rows(n_rows, seed=42):
+    """Genera textos de carreras normalizados con mezcla de keywords y relleno"""
+    rng = random.Random(seed)
+    keywords = [kw for kws in TAG_RULES.values() for kw in kws]
+    rows = []
+    for _ in range(n_rows):
+        parts = rng.sample(FILLER, rng.randint(2, 8))
+        # Aproximadamente un tercio de las filas no tiene ninguna keyword
+        if rng.random() > 0.33:
+            parts.extend(rng.sample(keywords, rng.randint(1, 3)))
+        rng.shuffle(parts)
+        rows.append(normalize(", ".join(parts)))
+    return rows
+
+def scaled_rules(copies):
+    """TAG_RULES más copias con keywords distintas, para ver cómo crece cada método con las reglas"""
+    rules = dict(TAG_RULES)
+    for copy in range(1, copies):
+        for name, keywords in TAG_RULES.items():
+            rules[f"{name} {copy}"] = [f"{keyword} v{copy}" for keyword in keywords]
+    return rules
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de etiquetado por keywords")
+    parser.add_argument('--rows', type=int, default=50000, help='Número de filas sintéticas')
+    parser.add_argument('--rule-copies', type=int, default=1,
+                        help='Multiplicar el número de keywords (1 = TAG_RULES tal cual)')
+    args = parser.parse_args()
+
+    rules = scaled_rules(args.rule_copies)
+    matcher = KeywordTagMatcher(rules)
+    print(f"🧪 Generando {args.rows} filas sintéticas "
+          f"({sum(len(keywords) for keywords in rules.values())} keywords)...")
+    rows = build_rows(args.rows)
+
+    start = time.perf_counter()
+    loop_results = [match_tags_loop(rules, text) for text in rows]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher_results = [matcher.match(text) for text in rows]
+    matcher_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(loop_results, matcher_results) if a != b)
+
+    print(f"📊 Recorrido anidado: {loop_time:.3f}s ({args.rows / loop_time:,.0f} filas/s)")
+    print(f"📊 Autómata:          {matcher_time:.3f}s ({args.rows / matcher_time:,.0f} filas/s)")
+    print(f"📊 Aceleración:       {loop_time / matcher_time:.2f}x")
+
+    if mismatches:
+        print(f"❌ {mismatches} filas con resultados distintos")
+        return 1
+    print("✅ Resultados idénticos en todas las filas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
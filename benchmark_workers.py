@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalado de la limpieza y el etiquetado con --workers.
+
+Genera filas sintéticas con teléfonos, emails y carreras distintos en cada
+fila (el peor caso para la normalización por valores únicos) y mide el
+rendimiento de build_tagged_dataframe con 1, 2, 4 y 8 procesos. Comprueba
+que el resultado es idéntico al modo serial.
+
+Uso:
+    python benchmark_workers.py --rows 100000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contactos_pais import build_tagged_dataframe
+from process_pool import worker_pool
+
+COUNTRIES = ["Honduras", "Peru", "Chile", "Dominican Republic", "Colombia", "Mexico"]
+
+CARRERAS = ["Ingeniería Industrial", "Administración de Empresas", "Sistemas Computacionales",
+            "Ingeniería Ambiental", "Medicina", "Derecho", "Contabilidad", "Logística"]
+
+def build_source_frame(n_rows, seed=11):
+    """Genera un DataFrame con las columnas del Excel y valores casi todos distintos"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        rows.append({
+            'Nombre_Universidad': f"Universidad {i}",
+            'Tipo_Institución': rng.choice(["Privada", "Pública", None]),
+            'País': rng.choice(COUNTRIES),
+            'Teléfono_Principal': f"+504 {rng.randint(2000, 9999)}-{rng.randint(1000, 9999)}",
+            'Tel_Admisiones': f"{rng.randint(20000000, 99999999)}",
+            'Email_General': f"info{i}@uni{i % 997}.edu",
+            'Rector_Email': rng.choice([f"rector{i}@uni.edu", "no disponible"]),
+            'WhatsApp': f"504{rng.randint(30000000, 99999999)}",
+            'Carreras_Disponibles': ", ".join(rng.sample(CARRERAS, 3)) + f", Programa {i % 5000}",
+        })
+    return pd.DataFrame(rows, dtype=str)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escalado de --workers")
+    parser.add_argument('--rows', type=int, default=50000, help='Número de filas sintéticas')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Procesos a medir')
+    parser.add_argument('--legacy-cleaning', action='store_true', help='Medir con apply por celda')
+    args = parser.parse_args()
+
+    print(f"🧪 Generando {args.rows} filas sintéticas ({os.cpu_count()} núcleos disponibles)...")
+    df = build_source_frame(args.rows)
+    vectorized = not args.legacy_cleaning
+    expected = None
+    ok = True
+    base_time = None
+
+    for workers in args.workers:
+        with worker_pool(workers) as pool:
+            start = time.perf_counter()
+            result = build_tagged_dataframe(df, use_llm=False, vectorized=vectorized, pool=pool, workers=workers)
+            elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = result
+        same = expected.equals(result)
+        ok = ok and same
+        base_time = base_time or elapsed
+        print(f"📊 {workers} procesos: {elapsed:.2f}s | {args.rows / elapsed:,.0f} filas/s | "
+              f"{base_time / elapsed:.2f}x {'✅' if same else '❌'}")
+
+    if not ok:
+        print("❌ Hay resultados distintos al modo serial")
+        return 1
+    print("✅ Resultados idénticos en todas las configuraciones")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Aplicación de normalizadores sobre valores únicos (factorizar y mapear).
+
+Columnas como Tipo_Institución, País o los teléfonos tienen muy pocos valores
+distintos en comparación con el número de filas. En lugar de ejecutar el
+normalizador una vez por celda, se factoriza la columna, se normalizan solo
+los valores únicos y el resultado se expande de nuevo con los códigos.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class UniqueMapStats:
+    """Acumula por columna las filas, valores únicos y tiempo de normalización."""
+
+    def __init__(self, per_cell=None):
+        """
+        Args:
+            per_cell (dict): Costes por celda ya medidos (columna -> segundos), p. ej. los
+                             del proceso principal para no volver a medirlos en el pool
+        """
+        self.columns = {}
+        self.per_cell = dict(per_cell or {})
+
+    def per_cell_cost(self, name, measure):
+        """
+        Coste por celda del normalizador de una columna, medido una sola vez por ejecución.
+
+        Args:
+            name (str): Nombre de la columna
+            measure (callable): Mide el coste (solo se llama la primera vez)
+
+        Returns:
+            float: Segundos por celda
+        """
+        if name not in self.per_cell:
+            self.per_cell[name] = measure()
+        return self.per_cell[name]
+
+    def record(self, name, rows, uniques, seconds, per_cell_seconds):
+        """
+        Registra una ejecución de map_unique (se acumula entre bloques).
+
+        Args:
+            name (str): Nombre de la columna
+            rows (int): Filas procesadas
+            uniques (int): Valores únicos normalizados
+            seconds (float): Tiempo total (factorizar + normalizar + expandir)
+            per_cell_seconds (float): Coste medio medido del normalizador por celda
+                (None si no se ha medido)
+        """
+        entry = self.columns.setdefault(name, {'rows': 0, 'uniques': 0, 'seconds': 0.0, 'saved': None})
+        entry['rows'] += rows
+        entry['uniques'] += uniques
+        entry['seconds'] += seconds
+        # Llamadas evitadas por el coste de cada una; los costes únicos de la primera
+        # llamada (índices, metadatos de phonenumbers) se pagan igual en los dos casos
+        if per_cell_seconds is not None:
+            entry['saved'] = (entry['saved'] or 0.0) + per_cell_seconds * max(rows - uniques, 0)
+
+    def merge(self, other):
+        """
+        Suma las estadísticas de otro acumulador (p. ej. de un proceso del pool).
+
+        Args:
+            other (UniqueMapStats): Estadísticas a añadir
+        """
+        for name, entry in other.columns.items():
+            own = self.columns.setdefault(name, {'rows': 0, 'uniques': 0, 'seconds': 0.0, 'saved': None})
+            for key in ('rows', 'uniques', 'seconds'):
+                own[key] += entry[key]
+            if entry['saved'] is not None:
+                own['saved'] = (own['saved'] or 0.0) + entry['saved']
+        for name, cost in other.per_cell.items():
+            self.per_cell.setdefault(name, cost)
+
+    def print_report(self):
+        """Imprime la proporción de únicos y el tiempo ahorrado por columna."""
+        if not self.columns:
+            return
+        print(f"\n📊 Normalización por valores únicos:")
+        total_saved = 0.0
+        for name, entry in self.columns.items():
+            ratio = entry['uniques'] / entry['rows'] if entry['rows'] else 0.0
+            if entry['saved'] is None:
+                saved_text = "n/d"
+            else:
+                total_saved += entry['saved']
+                saved_text = f"{entry['saved']:.3f}s"
+            print(f"   {name}: {entry['uniques']}/{entry['rows']} únicos ({ratio:.1%}), "
+                  f"{entry['seconds']:.3f}s, ahorro estimado {saved_text}")
+        print(f"   Ahorro estimado total: {total_saved:.3f}s")
+
+
+# Número de celdas sobre las que se mide el coste por celda del normalizador
+SAMPLE_SIZE = 200
+
+
+def _per_cell_seconds(columns, func):
+    """
+    Mide el coste medio de func sobre una muestra de celdas. Se llama después de
+    normalizar los únicos, así que func no debe memorizar resultados (ver ``baseline``
+    en map_unique): con la memoria llena cada celda de la muestra saldría gratis.
+    """
+    step = max(1, len(columns[0]) // SAMPLE_SIZE)
+    sample = list(zip(*(column.iloc[::step][:SAMPLE_SIZE].tolist() for column in columns)))
+    if not sample:
+        return 0.0
+    start = time.perf_counter()
+    for args in sample:
+        func(*args)
+    return (time.perf_counter() - start) / len(sample)
+
+
+def _per_cell_series_seconds(series, func):
+    """Coste por celda de un normalizador vectorizado ejecutado sobre la columna completa."""
+    if not len(series):
+        return 0.0
+    start = time.perf_counter()
+    func(series)
+    return (time.perf_counter() - start) / len(series)
+
+
+def _expand(codes, mapped, na_result, index):
+    """Expande los resultados de los únicos a todas las filas (código -1 = vacío)."""
+    values = np.empty(len(mapped) + 1, dtype=object)
+    values[:len(mapped)] = mapped
+    values[-1] = na_result
+    return pd.Series(values[codes], index=index)
+
+
+def map_unique(series, func, series_func=False, stats=None, name=None, baseline=None):
+    """
+    Aplica ``func`` solo a los valores únicos de ``series`` y expande el resultado.
+
+    Args:
+        series (Series): Columna a transformar
+        func (callable): Normalizador por valor, o por Series si series_func=True
+        series_func (bool): Si func recibe una Series completa (p. ej. clean_value_series)
+        stats (UniqueMapStats): Acumulador de estadísticas (opcional)
+        name (str): Nombre de la columna para las estadísticas
+        baseline (callable): Versión sin memoria de func con la que se mide el coste por
+                             celda (por defecto la propia func)
+
+    Returns:
+        Series: Resultado alineado con el índice de ``series``
+    """
+    start = time.perf_counter()
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+
+    if series_func:
+        mapped = list(func(pd.Series(uniques)))
+        na_result = func(pd.Series([np.nan], dtype=object)).iloc[0]
+    else:
+        mapped = [func(value) for value in uniques]
+        na_result = func(np.nan)
+
+    result = _expand(codes, mapped, na_result, series.index)
+    if stats is not None:
+        seconds = time.perf_counter() - start
+        name = name or series.name
+        baseline = baseline or func
+        if series_func:
+            per_cell = stats.per_cell_cost(name, lambda: _per_cell_series_seconds(series, baseline))
+        else:
+            per_cell = stats.per_cell_cost(name, lambda: _per_cell_seconds([series], baseline))
+        stats.record(name, len(series), len(uniques), seconds, per_cell)
+    return result
+
+
+def map_unique_fields(series, func, stats=None, name=None, baseline=None):
+    """
+    Como map_unique para un normalizador que devuelve una tupla con nombre: se
+    factoriza y se normaliza una sola vez y se expande cada campo por separado.
+
+    Args:
+        series (Series): Columna a transformar
+        func (callable): Normalizador por valor que devuelve una namedtuple
+        stats (UniqueMapStats): Acumulador de estadísticas (opcional)
+        name (str): Nombre de la columna para las estadísticas
+        baseline (callable): Versión sin memoria de func (ver map_unique)
+
+    Returns:
+        tuple: Una Series por campo de la tupla, alineadas con el índice de ``series``
+    """
+    start = time.perf_counter()
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    mapped = [func(value) for value in uniques]
+    na_result = func(np.nan)
+
+    result = tuple(_expand(codes, [value[position] for value in mapped], na_result[position], series.index)
+                   for position in range(len(na_result)))
+    if stats is not None:
+        seconds = time.perf_counter() - start
+        name = name or series.name
+        per_cell = stats.per_cell_cost(name, lambda: _per_cell_seconds([series], baseline or func))
+        stats.record(name, len(series), len(uniques), seconds, per_cell)
+    return result
+
+
+def map_unique_pairs(first, second, func, stats=None, name=None):
+    """
+    Aplica ``func(a, b)`` solo a las combinaciones únicas de dos columnas.
+
+    Args:
+        first (Series): Primera columna
+        second (Series): Segunda columna (mismo índice)
+        func (callable): Función de dos argumentos
+        stats (UniqueMapStats): Acumulador de estadísticas (opcional)
+        name (str): Nombre para las estadísticas
+
+    Returns:
+        Series: Resultado alineado con el índice de ``first``
+    """
+    start = time.perf_counter()
+    codes, uniques = pd.factorize(pd.MultiIndex.from_arrays([first, second]))
+    mapped = [func(a, b) for a, b in uniques]
+
+    result = _expand(codes, mapped, None, first.index)
+    if stats is not None:
+        seconds = time.perf_counter() - start
+        per_cell = stats.per_cell_cost(name, lambda: _per_cell_seconds([first, second], func))
+        stats.record(name, len(first), len(uniques), seconds, per_cell)
+    return result
+
+
+# Proporción máxima de valores distintos para guardar una columna como category
+CATEGORY_MAX_RATIO = 0.5
+
+
+def frame_memory_mb(df):
+    """Memoria del DataFrame en MB, contando el contenido de los textos."""
+    return round(df.memory_usage(deep=True).sum() / (1024 * 1024), 2)
+
+
+def compact_frame(df, max_ratio=CATEGORY_MAX_RATIO):
+    """
+    Reduce la memoria de las columnas de texto (modo --low-memory).
+
+    Las columnas con pocos valores distintos (Country, Last Name, Tags...) pasan
+    a ``category``: un código por fila y cada texto guardado una sola vez. Las
+    demás columnas de objetos Python pasan a ``string[pyarrow]`` (con pandas 3
+    el texto ya usa Arrow por defecto y se dejan como están).
+
+    Args:
+        df (DataFrame): Contactos con columnas de texto (se modifica en el sitio)
+        max_ratio (float): Valores distintos / filas por debajo del cual se usa category
+
+    Returns:
+        DataFrame: El mismo DataFrame
+    """
+    if len(df) == 0:
+        return df
+    for column in df.columns:
+        series = df[column]
+        if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)) \
+                or isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if series.nunique(dropna=False) <= max_ratio * len(series):
+            df[column] = series.astype('category')
+        elif pd.api.types.is_object_dtype(series.dtype):
+            df[column] = series.astype('string[pyarrow]')
+    return df
+
+
+def restore_frame(df):
+    """
+    Deshace compact_frame antes de escribir: category vuelve al tipo de texto
+    de sus categorías y ``string[pyarrow]`` vuelve a objetos.
+
+    Args:
+        df (DataFrame): Contactos (se modifica en el sitio)
+
+    Returns:
+        DataFrame: El mismo DataFrame
+    """
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(dtype.categories.dtype)
+        elif isinstance(dtype, pd.StringDtype) and dtype.na_value is pd.NA:
+            df[column] = df[column].astype(object)
+    return df
@@ -0,0 +1,259 @@
+"""
+Esquemas declarativos de mapeo de columnas del Excel a encabezados de GHL.
+
+Cada esquema es una lista de entradas con la columna de origen, el encabezado
+de GHL, el nombre del normalizador y si la columna es obligatoria.
+``compile_schema`` lo convierte en un ``MappingPlan`` que:
+
+- Lee solo la fila de encabezados y comprueba las columnas obligatorias
+  antes de cargar las filas.
+- Lee del Excel únicamente las columnas mapeadas (``usecols``), tanto en la
+  lectura completa como por bloques y desde la caché de libros.
+- Construye el DataFrame de salida con los encabezados en el orden del
+  esquema, aplicando a cada columna el normalizador que indique el script.
+
+Con ``passthrough=True`` (contactos.py, cuyo Excel ya trae encabezados de
+GHL) se leen todas las columnas y las que no están en el esquema se copian
+sin cambios después de las del esquema, en su orden original.
+
+Los normalizadores se pasan por nombre al transformar porque cada script
+tiene los suyos (apply por celda, valores únicos, perfilado...).
+"""
+
+import collections
+
+import pandas as pd
+
+from excel_stream import iter_excel_chunks, read_excel_header
+
+# Claves admitidas en cada entrada de un esquema
+SCHEMA_KEYS = {'source', 'header', 'normalizer', 'required', 'default'}
+
+# Entrada compilada: source es una tupla de columnas (el normalizador recibe
+# una Series por columna, None si falta); default '' rellena la columna de
+# salida si faltan todas las de origen y None la omite
+ColumnSpec = collections.namedtuple('ColumnSpec', ['source', 'header', 'normalizer', 'required', 'default'])
+
+# contactos.py: el Excel ya viene con encabezados de GHL; solo se formatean los
+# teléfonos y las columnas que no están aquí se conservan (passthrough)
+CONTACTOS_SCHEMA = [
+    {'source': 'First Name', 'header': 'First Name', 'required': True, 'default': None},
+    {'source': 'Last Name', 'header': 'Last Name', 'required': True, 'default': None},
+    {'source': 'Email', 'header': 'Email', 'required': True, 'default': None},
+    {'source': 'Phone', 'header': 'Phone', 'normalizer': 'phone', 'required': True, 'default': None},
+    {'source': 'Additional Phone', 'header': 'Additional Phone', 'normalizer': 'phone', 'default': None},
+    {'source': 'Company Name', 'header': 'Company Name', 'default': None},
+    {'source': 'Address', 'header': 'Address', 'default': None},
+    {'source': 'City', 'header': 'City', 'default': None},
+    {'source': 'State', 'header': 'State', 'default': None},
+    {'source': 'Postal Code', 'header': 'Postal Code', 'default': None},
+    {'source': 'Country', 'header': 'Country', 'default': None},
+    {'source': 'Website', 'header': 'Website', 'default': None},
+    {'source': 'Tags', 'header': 'Tags', 'default': None},
+    {'source': 'Source', 'header': 'Source', 'default': None},
+]
+
+# contactos_adaptado.py: base de universidades con encabezados simplificados
+ADAPTADO_SCHEMA = [
+    {'source': 'Nombre_Universidad', 'header': 'first_name', 'normalizer': 'text'},
+    {'source': 'Tipo_Institución', 'header': 'last_name', 'normalizer': 'text'},
+    {'source': 'Email_General', 'header': 'Email', 'normalizer': 'text'},
+    {'source': 'Teléfono_Principal', 'header': 'phone', 'normalizer': 'phone'},
+    {'source': 'Tel_Admisiones', 'header': 'Additional Phones', 'normalizer': 'phone'},
+    {'source': 'Rector_Email', 'header': 'Additional Emails', 'normalizer': 'text'},
+    {'source': 'País', 'header': 'Country', 'normalizer': 'text', 'default': None},
+    {'source': 'Dirección_Completa', 'header': 'Address', 'normalizer': 'text', 'default': None},
+    {'source': 'Sitio_Web', 'header': 'Website', 'normalizer': 'text', 'default': None},
+    {'source': 'Facebook', 'header': 'Facebook', 'normalizer': 'text', 'default': None},
+    {'source': 'Instagram', 'header': 'Instagram', 'normalizer': 'text', 'default': None},
+    {'source': 'LinkedIn', 'header': 'LinkedIn', 'normalizer': 'text', 'default': None},
+    {'source': 'WhatsApp', 'header': 'WhatsApp', 'normalizer': 'text', 'default': None},
+    {'source': 'Carreras_Disponibles', 'header': 'Carreras', 'normalizer': 'text', 'default': None},
+    {'source': 'Notas_Adicionales', 'header': 'Notas', 'normalizer': 'text', 'default': None},
+]
+
+# contactos_pais.py: base de universidades con encabezados exactos de GHL. El
+# primer e-mail de Email_General es el principal; el resto y los de
+# Rector_Email son adicionales, por eso las dos entradas leen ambas columnas
+GHL_SCHEMA = [
+    {'source': 'Nombre_Universidad', 'header': 'First Name', 'normalizer': 'text'},
+    {'source': 'Tipo_Institución', 'header': 'Last Name', 'normalizer': 'text'},
+    {'source': ['Email_General', 'Rector_Email'], 'header': 'Email', 'normalizer': 'email'},
+    {'source': 'Teléfono_Principal', 'header': 'Phone', 'normalizer': 'phone'},
+    {'source': 'Tel_Admisiones', 'header': 'Additional Phone Numbers', 'normalizer': 'phone'},
+    {'source': ['Email_General', 'Rector_Email'], 'header': 'Additional Email Addresses',
+     'normalizer': 'additional_emails'},
+    {'source': 'País', 'header': 'Country', 'normalizer': 'country'},
+    {'source': 'Dirección_Completa', 'header': 'Address', 'normalizer': 'text'},
+    {'source': 'Sitio_Web', 'header': 'Website', 'normalizer': 'text'},
+    {'source': 'Facebook', 'header': 'Facebook', 'normalizer': 'text'},
+    {'source': 'Instagram', 'header': 'Instagram', 'normalizer': 'text'},
+    {'source': 'LinkedIn', 'header': 'LinkedIn', 'normalizer': 'text'},
+    {'source': 'WhatsApp', 'header': 'WhatsApp', 'normalizer': 'phone'},
+    {'source': 'Carreras_Disponibles', 'header': 'Carreras', 'normalizer': 'text'},
+    {'source': 'Notas_Adicionales', 'header': 'Notas', 'normalizer': 'text'},
+]
+
+
+def compile_schema(schema, passthrough=False):
+    """
+    Valida un esquema y lo convierte en un plan de transformación.
+
+    Args:
+        schema (list): Entradas {'source', 'header', 'normalizer', 'required', 'default'};
+                       solo source y header son obligatorias (normalizer None = valor sin
+                       cambios, required False, default '')
+        passthrough (bool): Leer y conservar también las columnas que no están en el esquema
+
+    Returns:
+        MappingPlan: Plan compilado
+
+    Raises:
+        ValueError: Si una entrada tiene claves desconocidas o faltantes, o hay encabezados repetidos
+    """
+    specs = []
+    for entry in schema:
+        unknown = set(entry) - SCHEMA_KEYS
+        if unknown:
+            raise ValueError(f"Claves desconocidas en el esquema: {sorted(unknown)}")
+        if not entry.get('source') or not entry.get('header'):
+            raise ValueError(f"Cada entrada del esquema necesita 'source' y 'header': {entry}")
+        source = entry['source']
+        source = (source,) if isinstance(source, str) else tuple(source)
+        specs.append(ColumnSpec(source, entry['header'], entry.get('normalizer'),
+                                bool(entry.get('required', False)), entry.get('default', '')))
+
+    headers = [spec.header for spec in specs]
+    repeated = sorted({header for header in headers if headers.count(header) > 1})
+    if repeated:
+        raise ValueError(f"Encabezados repetidos en el esquema: {repeated}")
+    return MappingPlan(specs, passthrough)
+
+
+class MappingPlan:
+    """Plan compilado de un esquema: columnas a leer, validación y transformación."""
+
+    def __init__(self, specs, passthrough=False):
+        """
+        Args:
+            specs (list): Entradas ColumnSpec (ver compile_schema)
+            passthrough (bool): Copiar al resultado las columnas que no están en el esquema
+        """
+        self.specs = tuple(specs)
+        self.passthrough = passthrough
+        self.headers = [spec.header for spec in self.specs]
+        # Columnas de origen sin repetir, en el orden del esquema
+        self.sources = list(dict.fromkeys(column for spec in self.specs for column in spec.source))
+        self.required = list(dict.fromkeys(column for spec in self.specs if spec.required
+                                           for column in spec.source))
+
+    def select(self, header):
+        """
+        Comprueba el encabezado y elige las columnas a leer.
+
+        Args:
+            header (list): Nombres de las columnas del Excel
+
+        Returns:
+            list: Columnas del esquema presentes (todas con passthrough), en el orden del Excel
+
+        Raises:
+            ValueError: Si falta una columna obligatoria
+        """
+        present = set(header)
+        for column in self.required:
+            if column not in present:
+                raise ValueError(f"Falta columna obligatoria: {column}")
+        if self.passthrough:
+            return list(header)
+        wanted = set(self.sources)
+        return [column for column in header if column in wanted]
+
+    def read_header(self, input_excel, sheet_index=0, workbook_cache=None):
+        """
+        Lee solo la fila de encabezados (de la caché de libros si la tiene) y la valida.
+
+        Returns:
+            tuple: (encabezado completo, columnas a leer)
+        """
+        header = workbook_cache.header(input_excel, sheet_index) if workbook_cache is not None else None
+        if header is None:
+            header = read_excel_header(input_excel, sheet_index)
+        return header, self.select(header)
+
+    def read_excel(self, input_excel, sheet_index=0, workbook_cache=None):
+        """
+        Lee una hoja como texto con solo las columnas del esquema.
+
+        Args:
+            input_excel (str): Ruta del archivo Excel
+            sheet_index (int): Índice de la hoja
+            workbook_cache (WorkbookCache): Caché de hojas parseadas (opcional)
+
+        Returns:
+            DataFrame: Filas de la hoja con las columnas mapeadas presentes
+        """
+        header, usecols = self.read_header(input_excel, sheet_index, workbook_cache)
+        if self.passthrough:
+            # Todas las columnas: se lee la hoja completa como sin plan
+            header = usecols = None
+        if workbook_cache is not None:
+            return workbook_cache.read_excel(input_excel, sheet_index, columns=usecols, header=header)
+        return pd.read_excel(input_excel, sheet_name=sheet_index, dtype=str, usecols=usecols)
+
+    def iter_chunks(self, input_excel, chunk_size=5000, sheet_index=0):
+        """
+        Recorre una hoja por bloques con solo las columnas del esquema (ver iter_excel_chunks).
+
+        Yields:
+            DataFrame: Bloque de filas con las columnas mapeadas presentes
+        """
+        _, usecols = self.read_header(input_excel, sheet_index)
+        if self.passthrough:
+            usecols = None
+        yield from iter_excel_chunks(input_excel, chunk_size=chunk_size, sheet_index=sheet_index, usecols=usecols)
+
+    def transform(self, df, normalizers):
+        """
+        Construye el DataFrame con encabezados de GHL aplicando el plan.
+
+        Args:
+            df (DataFrame): Filas leídas del Excel
+            normalizers (dict): Nombre del normalizador -> función; recibe una Series por
+                                columna de origen (None si falta) y devuelve la columna limpia
+
+        Returns:
+            DataFrame: Columnas de salida en el orden del esquema (y, con passthrough,
+                       las demás columnas de df en su orden original)
+
+        Raises:
+            ValueError: Si el esquema usa un normalizador que no está en normalizers
+        """
+        unknown = sorted({spec.normalizer for spec in self.specs
+                          if spec.normalizer is not None and spec.normalizer not in normalizers})
+        if unknown:
+            raise ValueError(f"Normalizadores no definidos: {unknown}")
+
+        ghl_df = pd.DataFrame(index=df.index)
+        for spec in self.specs:
+            columns = [df[column] if column in df.columns else None for column in spec.source]
+            if all(column is None for column in columns):
+                if spec.default is not None:
+                    ghl_df[spec.header] = spec.default
+                continue
+            if spec.normalizer is None:
+                ghl_df[spec.header] = columns[0]
+            else:
+                ghl_df[spec.header] = normalizers[spec.normalizer](*columns)
+        if self.passthrough:
+            mapped = set(self.sources) | set(ghl_df.columns)
+            for column in df.columns:
+                if column not in mapped:
+                    ghl_df[column] = df[column]
+        return ghl_df
+
+
+# Planes compilados de los tres scripts
+CONTACTOS_PLAN = compile_schema(CONTACTOS_SCHEMA, passthrough=True)
+ADAPTADO_PLAN = compile_schema(ADAPTADO_SCHEMA)
+GHL_PLAN = compile_schema(GHL_SCHEMA)
@@ -2,6 +2,9 @@ import pandas as pd
 import phonenumbers
 from phonenumbers import NumberParseException
 
+from column_schema import CONTACTOS_PLAN
+from excel_stream import append_csv_chunk
+
 def format_phone_us(num: str, default_country='US'):
     try:
         pn = phonenumbers.parse(num, default_country)
@@ -12,38 +15,46 @@ def format_phone_us(num: str, default_country='US'):
     except NumberParseException:
         return None
 
-def process_excel_to_ghl_csv(input_excel, output_csv):
-    df = pd.read_excel(input_excel, sheet_name=0, dtype=str)
-    # Asegurar una sola hoja y tipos string
-    # Normalizar nombres de columnas si fuera necesario
-    # Columnas esperadas: First Name, Last Name, Email, Phone, etc.
-    required = ['First Name', 'Last Name', 'Email', 'Phone']
-    for col in required:
-        if col not in df.columns:
-            raise ValueError(f"Falta columna obligatoria: {col}")
-
-    # Procesar teléfonos
-    def clean_phone(x):
-        if pd.isna(x):
-            return ''
-        clean = str(x).strip()
-        formatted = format_phone_us(clean)
-        if formatted:
-            return formatted
-        # intento US estándar sin country:
-        try:
-            pn = phonenumbers.parse(clean, 'US')
-            if phonenumbers.is_valid_number(pn):
-                return phonenumbers.format_number(pn, phonenumbers.PhoneNumberFormat.NATIONAL)
-        except:
-            pass
-        return clean  # fallback sin formato
-
-    df['Phone'] = df['Phone'].apply(clean_phone)
-
-    # Si hay una columna adicional de teléfono
-    if 'Additional Phone' in df.columns:
-        df['Additional Phone'] = df['Additional Phone'].apply(clean_phone)
+def clean_phone(x):
+    if pd.isna(x):
+        return ''
+    clean = str(x).strip()
+    formatted = format_phone_us(clean)
+    if formatted:
+        return formatted
+    # intento US estándar sin country:
+    try:
+        pn = phonenumbers.parse(clean, 'US')
+        if phonenumbers.is_valid_number(pn):
+            return phonenumbers.format_number(pn, phonenumbers.PhoneNumberFormat.NATIONAL)
+    except:
+        pass
+    return clean  # fallback sin formato
+
+def check_required_columns(columns):
+    # Columnas esperadas: First Name, Last Name, Email, Phone (column_schema.CONTACTOS_SCHEMA)
+    CONTACTOS_PLAN.select(list(columns))
+
+def transform_contacts(df):
+    # Procesar teléfonos (Phone y, si existe, Additional Phone); el resto pasa sin cambios
+    return CONTACTOS_PLAN.transform(df, {'phone': lambda series: series.apply(clean_phone)})
+
+def process_excel_to_ghl_csv(input_excel, output_csv, chunk_size=None):
+    # El plan valida el encabezado antes de leer filas y solo lee las columnas del esquema
+    if chunk_size:
+        # Modo por bloques: memoria acotada
+        first_chunk = True
+        for df in CONTACTOS_PLAN.iter_chunks(input_excel, chunk_size=chunk_size):
+            append_csv_chunk(transform_contacts(df), output_csv, first_chunk)
+            first_chunk = False
+        if first_chunk:
+            _, usecols = CONTACTOS_PLAN.read_header(input_excel)
+            append_csv_chunk(transform_contacts(pd.DataFrame(columns=usecols)), output_csv, True)
+        print(f"CSV generado: {output_csv}")
+        return
+
+    df = CONTACTOS_PLAN.read_excel(input_excel)
+    df = transform_contacts(df)
 
     # Exportar a CSV sin índice, codificación UTF-8
     df.to_csv(output_csv, index=False, encoding='utf-8')
@@ -54,5 +65,6 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Convert Excel contactos a CSV formato GoHighLevel")
     parser.add_argument('input_excel', help='Archivo Excel de origen (.xlsx)')
     parser.add_argument('output_csv', help='Nombre del CSV de salida')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Procesar el Excel por bloques de N filas con memoria acotada (opcional)')
     args = parser.parse_args()
-    process_excel_to_ghl_csv(args.input_excel, args.output_csv)
+    process_excel_to_ghl_csv(args.input_excel, args.output_csv, chunk_size=args.chunk_size)
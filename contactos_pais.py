@@ -1,79 +1,163 @@
+import numpy as np
 import pandas as pd
-import phonenumbers
-from phonenumbers import NumberParseException
 import os
 import unicodedata
 import re
+import sys
 import json
-import openai
+import time
+import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from tag_matcher import KeywordTagMatcher
+from llm_tagging import query_llm_concurrently, query_llm_batches_concurrently
+from llm_cache import LLMTagCache
+from excel_stream import append_csv_chunk
+from column_schema import GHL_PLAN
+from column_mapper import (UniqueMapStats, compact_frame, frame_memory_mb, map_unique, map_unique_fields,
+                           map_unique_pairs, restore_frame)
+from phone_engine import format_phone_e164
+from country_resolver import COUNTRY_RESOLVER, GHL_VALID_COUNTRIES, country_key, resolve_country
+from workbook_cache import WorkbookCache, country_counts
+from workbook_inputs import SOURCE_COLUMN, expand_input_paths, parse_sheet_selector, read_inputs, iter_input_chunks, sheet_tasks
+from process_pool import worker_pool, map_frame_chunks
+from dedup_engine import LIST_SEPARATOR, ContactDeduplicator, dedupe_contacts
+from stage_profiler import StageProfiler, profile_stage, profile_iter, profiled
+from ghl_push import GHLPusher
+from csv_shards import CSVSharding
+from tag_classifier import TagClassifier
+from delta_manifest import DeltaManifest, row_identity_keys, row_content_hashes, KEY_COLUMN, HASH_COLUMN
 
 # Utilidades para validación de email
-EMAIL_PLACEHOLDERS = {"no disponible", "n/d", "n.d.", "nd", "sin email", "correo no disponible"}
-EMAIL_SEPARATORS = [';', ',', '/', '|', '\n', '\t', ' y ']
+# Celdas completas o direcciones que no son un buzón real
+EMAIL_PLACEHOLDERS = {"no disponible", "n/d", "n.d.", "nd", "sin email", "correo no disponible",
+                      "correo@correo.com", "email@email.com", "correo@dominio.com", "email@example.com",
+                      "info@example.com", "no@tiene.com"}
+
+# Búsqueda de todos los e-mails de una celda ya en minúsculas; los bordes evitan
+# cortar direcciones con caracteres no válidos (p. ej. acentos en la parte local)
+email_search_regex = re.compile(r"(?<![\w.%+-])([a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,})(?![\w-])")
 
-email_regex = re.compile(
-    r"^[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}$",
-    re.IGNORECASE
-)
+def extract_emails(raw) -> list:
+    """Devuelve todos los e-mails válidos de una celda, sin repetir y en orden de aparición."""
+    if raw is None or pd.isna(raw):
+        return []
+    
+    txt = str(raw).strip().lower()
+    if txt in EMAIL_PLACEHOLDERS:
+        return []
+    
+    found = email_search_regex.findall(txt)
+    return list(dict.fromkeys(email for email in found if email not in EMAIL_PLACEHOLDERS))
 
 def normalize_email(raw: str) -> str:
     """Devuelve el primer e-mail válido o ''."""
-    if pd.isna(raw) or raw is None:
-        return ""
+    emails = extract_emails(raw)
+    return emails[0] if emails else ""
+
+def split_contact_emails(general, extra=None):
+    """
+    Email principal y adicionales de una fila (versión por celda de extract_email_columns).
     
-    txt = str(raw).strip().lower()
+    Args:
+        general: Celda de Email_General
+        extra: Celda de Rector_Email (opcional)
+        
+    Returns:
+        tuple: (primer e-mail de general, resto de e-mails distintos separados por comas)
+    """
+    emails = extract_emails(general)
+    primary = emails[0] if emails else ""
+    additional = [email for email in emails[1:] + extract_emails(extra) if email != primary]
+    return primary, LIST_SEPARATOR.join(dict.fromkeys(additional))
+
+def find_emails(values):
+    """
+    E-mails de cada valor con un único patrón compilado (sin placeholders).
     
-    # Manejar casos especiales
-    if txt in ['nan', 'none', 'null', 'undefined'] or txt == '':
-        return ""
+    Args:
+        values (Series): Valores de una columna de e-mails
+        
+    Returns:
+        Series: Un e-mail por elemento, con el índice del valor en el que aparece
+    """
+    text = values.astype(str).str.strip().str.lower()
+    text = text.where(~text.isin(EMAIL_PLACEHOLDERS), '')
+    # dtype object: el patrón usa lookbehind, que el motor de las columnas Arrow no admite
+    found = text.astype(object).str.findall(email_search_regex).explode().dropna()
+    return found[~found.isin(EMAIL_PLACEHOLDERS)]
+
+def email_matches(series):
+    """
+    Todos los e-mails de una columna en formato largo, con un único patrón compilado.
     
-    if txt in EMAIL_PLACEHOLDERS:
-        return ""
+    La búsqueda se hace sobre los valores únicos con ``str.findall`` (más
+    rápido que ``str.extractall``, que crea un índice por coincidencia) y el
+    resultado se expande a las filas con los códigos de ``pd.factorize``.
     
-    # tomar solo la primera entrada si vienen varios correos
-    for sep in EMAIL_SEPARATORS:
-        if sep in txt:
-            txt = txt.split(sep)[0].strip()
-            break
-    
-    return txt if email_regex.match(txt) else ""
-
-# Lista oficial de países soportados por GoHighLevel
-GHL_VALID_COUNTRIES = {
-    "Afghanistan", "Albania", "Algeria", "Andorra", "Angola", "Antigua and Barbuda", 
-    "Argentina", "Armenia", "Australia", "Austria", "Azerbaijan", "Bahamas", "Bahrain", 
-    "Bangladesh", "Barbados", "Belarus", "Belgium", "Belize", "Benin", "Bhutan", 
-    "Bolivia", "Bosnia and Herzegovina", "Botswana", "Brazil", "Brunei", "Bulgaria", 
-    "Burkina Faso", "Burundi", "Cabo Verde", "Cambodia", "Cameroon", "Canada", 
-    "Central African Republic", "Chad", "Chile", "China", "Colombia", "Comoros", 
-    "Congo", "Costa Rica", "Croatia", "Cuba", "Cyprus", "Czech Republic", 
-    "Democratic Republic of the Congo", "Denmark", "Djibouti", "Dominica", 
-    "Dominican Republic", "East Timor", "Ecuador", "Egypt", "El Salvador", 
-    "Equatorial Guinea", "Eritrea", "Estonia", "Eswatini", "Ethiopia", "Fiji", 
-    "Finland", "France", "Gabon", "Gambia", "Georgia", "Germany", "Ghana", 
-    "Greece", "Grenada", "Guatemala", "Guinea", "Guinea-Bissau", "Guyana", 
-    "Haiti", "Honduras", "Hungary", "Iceland", "India", "Indonesia", "Iran", 
-    "Iraq", "Ireland", "Israel", "Italy", "Ivory Coast", "Jamaica", "Japan", 
-    "Jordan", "Kazakhstan", "Kenya", "Kiribati", "Kuwait", "Kyrgyzstan", 
-    "Laos", "Latvia", "Lebanon", "Lesotho", "Liberia", "Libya", "Liechtenstein", 
-    "Lithuania", "Luxembourg", "Madagascar", "Malawi", "Malaysia", "Maldives", 
-    "Mali", "Malta", "Marshall Islands", "Mauritania", "Mauritius", "Mexico", 
-    "Micronesia", "Moldova", "Monaco", "Mongolia", "Montenegro", "Morocco", 
-    "Mozambique", "Myanmar", "Namibia", "Nauru", "Nepal", "Netherlands", 
-    "New Zealand", "Nicaragua", "Niger", "Nigeria", "North Korea", "North Macedonia", 
-    "Norway", "Oman", "Pakistan", "Palau", "Palestine", "Panama", "Papua New Guinea", 
-    "Paraguay", "Peru", "Philippines", "Poland", "Portugal", "Qatar", "Romania", 
-    "Russia", "Rwanda", "Saint Kitts and Nevis", "Saint Lucia", 
-    "Saint Vincent and the Grenadines", "Samoa", "San Marino", 
-    "Sao Tome and Principe", "Saudi Arabia", "Senegal", "Serbia", "Seychelles", 
-    "Sierra Leone", "Singapore", "Slovakia", "Slovenia", "Solomon Islands", 
-    "Somalia", "South Africa", "South Korea", "South Sudan", "Spain", "Sri Lanka", 
-    "Sudan", "Suriname", "Sweden", "Switzerland", "Syria", "Taiwan", "Tajikistan", 
-    "Tanzania", "Thailand", "Togo", "Tonga", "Trinidad and Tobago", "Tunisia", 
-    "Turkey", "Turkmenistan", "Tuvalu", "Uganda", "Ukraine", "United Arab Emirates", 
-    "United Kingdom", "United States", "Uruguay", "Uzbekistan", "Vanuatu", 
-    "Vatican City", "Venezuela", "Vietnam", "Yemen", "Zambia", "Zimbabwe"
-}
+    Args:
+        series (Series): Columna de e-mails del Excel
+        
+    Returns:
+        tuple: (DataFrame con columnas row (posición) y email en orden de aparición,
+                número de valores únicos)
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    found = find_emails(pd.Series(uniques))
+    per_unique = pd.DataFrame({'code': found.index.to_numpy(), 'email': found.to_numpy(dtype=object)})
+    rows = pd.DataFrame({'row': np.arange(len(codes)), 'code': codes})
+    matches = rows.merge(per_unique, on='code', how='inner', sort=False)
+    return matches[['row', 'email']].sort_values('row', kind='stable'), len(uniques)
+
+def email_search_seconds(columns):
+    """Coste por celda de buscar los e-mails en todas las celdas de las columnas, sin factorizar."""
+    start = time.perf_counter()
+    for series in columns:
+        find_emails(series)
+    return (time.perf_counter() - start) / max(sum(len(series) for series in columns), 1)
+
+def extract_email_columns(general, extra=None, stats=None):
+    """
+    Versión vectorizada de split_contact_emails para columnas completas.
+    
+    Args:
+        general (Series): Columna Email_General
+        extra (Series): Columna Rector_Email con el mismo índice (opcional)
+        stats (UniqueMapStats): Acumulador de estadísticas de valores únicos (opcional)
+        
+    Returns:
+        tuple: (Series Email, Series Additional Email Addresses) alineadas con ``general``
+    """
+    start = time.perf_counter()
+    columns = [series for series in (general, extra) if series is not None]
+    parts = []
+    uniques = 0
+    for rank, series in enumerate(columns):
+        matches, column_uniques = email_matches(series)
+        parts.append(matches.assign(rank=rank))
+        uniques += column_uniques
+    long = pd.concat(parts, ignore_index=True).sort_values(['row', 'rank'], kind='stable')
+    long = long.drop_duplicates(subset=['row', 'email'], keep='first')
+    
+    # El principal es el primer e-mail de Email_General de cada fila
+    is_primary = (~long['row'].duplicated() & (long['rank'] == 0)).to_numpy()
+    primary = np.full(len(general), '', dtype=object)
+    primary[long['row'].to_numpy()[is_primary]] = long['email'].to_numpy()[is_primary]
+    # Unir los adicionales de cada fila (ordenados por fila) cortando en los cambios de fila
+    rows = long['row'].to_numpy()[~is_primary]
+    values = long['email'].to_numpy(dtype=object)[~is_primary]
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else rows
+    ends = np.r_[starts[1:], len(rows)]
+    additional = np.full(len(general), '', dtype=object)
+    additional[rows[starts]] = [LIST_SEPARATOR.join(values[a:b]) for a, b in zip(starts, ends)]
+    
+    if stats is not None:
+        seconds = time.perf_counter() - start
+        # Los únicos se cuentan por columna, así que las filas también: una celda por columna
+        stats.record('emails', len(general) * len(columns), uniques, seconds,
+                     stats.per_cell_cost('emails', lambda: email_search_seconds(columns)))
+    return pd.Series(primary, index=general.index), pd.Series(additional, index=general.index)
 
 # TODO: Externalizar TAG_RULES a archivo JSON en el futuro
 TAG_RULES = {
@@ -148,6 +232,9 @@ TAG_RULES = {
     ]
 }
 
+# Autómata compilado una sola vez a partir de TAG_RULES (ver tag_matcher.py)
+TAG_MATCHER = KeywordTagMatcher(TAG_RULES)
+
 def sanitize_llm_response(text: str) -> str:
     """
     Sanitiza la respuesta del LLM eliminando comillas, espacios extra y normalizando.
@@ -184,38 +271,37 @@ def sanitize_llm_response(text: str) -> str:
     
     return aliases.get(text, text)
 
-def query_openai_for_tags(carreras_text, country_name):
+# Clientes de OpenAI reutilizables (comparten el pool de conexiones HTTP entre hilos)
+_OPENAI_CLIENTS = {}
+
+def get_openai_client(api_key, base_url, timeout=None):
     """
-    Usa OpenAI API con modelo de Hugging Face para asignar etiquetas basadas en las carreras disponibles.
+    Devuelve un cliente de OpenAI reutilizable para la combinación de parámetros dada.
     
     Args:
-        carreras_text (str): Texto con las carreras disponibles
-        country_name (str): Nombre del país
+        api_key (str): API key de OpenAI
+        base_url (str): URL base de la API
+        timeout (float): Timeout por petición en segundos (None = valor por defecto)
         
     Returns:
-        str: Etiquetas asignadas por el LLM o cadena vacía si falla
+        openai.OpenAI: Cliente configurado
     """
-    try:
-        # Verificar que las variables de entorno estén configuradas
-        api_key = os.environ.get("OPENAI_API_KEY")
-        base_url = os.environ.get("OPENAI_API_BASE")
-        
-        if not api_key:
-            print("  ❌ OPENAI_API_KEY no está configurada")
-            return ""
-        
-        if not base_url:
-            print("  ❌ OPENAI_API_BASE no está configurada")
-            return ""
-        
-        # Crear cliente de OpenAI
-        client = openai.OpenAI(
-            api_key=api_key,
-            base_url=base_url,
-        )
-        
-        # Preparar el prompt para el LLM
-        system_prompt = """Eres un clasificador de carreras universitarias. Tu única tarea es asignar UNA SOLA etiqueta de las siguientes opciones:
+    import openai
+    
+    key = (api_key, base_url, timeout)
+    client = _OPENAI_CLIENTS.get(key)
+    if client is None:
+        kwargs = {"api_key": api_key, "base_url": base_url}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        client = openai.OpenAI(**kwargs)
+        _OPENAI_CLIENTS[key] = client
+    return client
+
+# Modelo y prompts del LLM (su hash forma parte de la clave de la caché)
+LLM_MODEL = "hf:mistralai/Mistral-7B-Instruct-v0.3"
+
+LLM_SYSTEM_PROMPT = """Eres un clasificador de carreras universitarias. Tu única tarea es asignar UNA SOLA etiqueta de las siguientes opciones:
 
 ETIQUETAS VÁLIDAS (solo estas 3):
 1. "entrenador energias renovables" - Para carreras relacionadas con energías renovables, ambiental, eléctrica, forestal, agronómica, etc.
@@ -229,18 +315,57 @@ REGLAS ESTRICTAS:
 - NO uses comillas en tu respuesta
 - NO añadas explicaciones ni texto adicional"""
 
-        user_prompt = f"""CARRERAS A ANALIZAR:
+LLM_USER_PROMPT = """CARRERAS A ANALIZAR:
 {carreras_text}
 
 PAÍS: {country_name}
 
 RESPUESTA (solo una de las 3 etiquetas o nada):"""
 
+LLM_PROMPT_HASH = hashlib.sha256(
+    "\n".join([LLM_SYSTEM_PROMPT, LLM_USER_PROMPT, *TAG_RULES.keys()]).encode('utf-8')
+).hexdigest()[:16]
+
+def query_openai_for_tags(carreras_text, country_name, timeout=None):
+    """
+    Usa OpenAI API con modelo de Hugging Face para asignar etiquetas basadas en las carreras disponibles.
+    
+    Args:
+        carreras_text (str): Texto con las carreras disponibles
+        country_name (str): Nombre del país
+        timeout (float): Timeout de la petición en segundos (opcional)
+        
+    Returns:
+        str: Etiqueta asignada por el LLM, cadena vacía si no asigna ninguna
+             o None si la petición falla
+    """
+    # Importación diferida: el cliente de OpenAI tarda en cargarse y solo se usa con LLM
+    import openai
+    
+    try:
+        # Verificar que las variables de entorno estén configuradas
+        api_key = os.environ.get("OPENAI_API_KEY")
+        base_url = os.environ.get("OPENAI_API_BASE")
+        
+        if not api_key:
+            print("  ❌ OPENAI_API_KEY no está configurada")
+            return None
+        
+        if not base_url:
+            print("  ❌ OPENAI_API_BASE no está configurada")
+            return None
+        
+        # Obtener cliente de OpenAI (reutilizado entre llamadas)
+        client = get_openai_client(api_key, base_url, timeout)
+        
+        # Preparar el prompt para el LLM
+        user_prompt = LLM_USER_PROMPT.format(carreras_text=carreras_text, country_name=country_name)
+
         # Hacer la petición a la API
         completion = client.chat.completions.create(
-            model="hf:mistralai/Mistral-7B-Instruct-v0.3",
+            model=LLM_MODEL,
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": LLM_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             max_tokens=20,
@@ -265,13 +390,150 @@ RESPUESTA (solo una de las 3 etiquetas o nada):"""
             
     except openai.AuthenticationError:
         print("  ❌ Error de autenticación con OpenAI API")
-        return ""
+        return None
     except openai.APIError as e:
         print(f"  ❌ Error en petición a OpenAI API: {str(e)}")
-        return ""
+        return None
     except Exception as e:
         print(f"  ❌ Error inesperado con OpenAI API: {str(e)}")
-        return ""
+        return None
+
+LLM_BATCH_SYSTEM_PROMPT = """Eres un clasificador de carreras universitarias. Recibirás una lista numerada de universidades y debes asignar a cada una UNA SOLA etiqueta de las siguientes opciones:
+
+ETIQUETAS VÁLIDAS (solo estas 3):
+1. "entrenador energias renovables" - Para carreras relacionadas con energías renovables, ambiental, eléctrica, forestal, agronómica, etc.
+2. "logistica internacional" - Para carreras de logística, comercio exterior, negocios internacionales, administración de empresas, etc.
+3. "cabinas de experimentacion" - Para carreras industriales, de producción, psicología organizacional, diseño industrial, etc.
+
+REGLAS ESTRICTAS:
+- Responde SOLO con un arreglo JSON de cadenas, un elemento por universidad y en el mismo orden
+- Cada elemento debe ser una de las 3 etiquetas exactas de arriba o "" si no hay una categoría clara
+- NO uses "ninguna", "ninguno", "no aplica", "ninguna de las anteriores"
+- NO añadas explicaciones ni texto adicional fuera del arreglo JSON"""
+
+LLM_BATCH_USER_PROMPT = """UNIVERSIDADES A ANALIZAR ({count} elementos):
+{items}
+
+RESPUESTA (arreglo JSON con {count} elementos):"""
+
+LLM_BATCH_PROMPT_HASH = hashlib.sha256(
+    "\n".join([LLM_BATCH_SYSTEM_PROMPT, LLM_BATCH_USER_PROMPT, *TAG_RULES.keys()]).encode('utf-8')
+).hexdigest()[:16]
+
+def parse_llm_batch_response(text, expected_count):
+    """
+    Interpreta la respuesta de un lote como arreglo JSON de etiquetas.
+    
+    Args:
+        text (str): Respuesta raw del LLM
+        expected_count (int): Número de elementos enviados en el lote
+        
+    Returns:
+        list: Etiquetas validadas ('' si no es válida) o None si la respuesta está malformada
+    """
+    if not text:
+        return None
+    
+    start = text.find('[')
+    end = text.rfind(']')
+    if start == -1 or end < start:
+        return None
+    
+    try:
+        answers = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    
+    if not isinstance(answers, list) or len(answers) != expected_count:
+        return None
+    
+    valid_tags = list(TAG_RULES.keys())
+    tags = []
+    for answer in answers:
+        if answer is None:
+            tags.append("")
+            continue
+        if not isinstance(answer, str):
+            return None
+        llm_response = sanitize_llm_response(answer)
+        if llm_response and llm_response not in valid_tags:
+            print(f"  ⚠️  LLM sugirió etiqueta no válida: '{answer}' (sanitizada: '{llm_response}')")
+            llm_response = ""
+        tags.append(llm_response)
+    return tags
+
+def query_openai_for_tags_batch(items, timeout=None, with_prompt_hash=False):
+    """
+    Clasifica varias universidades en una sola petición al LLM.
+    
+    Si la respuesta está malformada el lote se divide en dos mitades y se
+    reintenta; los lotes de un solo elemento usan query_openai_for_tags.
+    
+    Args:
+        items (list): Lista de tuplas (carreras, pais)
+        timeout (float): Timeout de la petición en segundos (opcional)
+        with_prompt_hash (bool): Devolver cada etiqueta junto con el hash del prompt que
+                                 la produjo (LLM_BATCH_PROMPT_HASH o LLM_PROMPT_HASH)
+        
+    Returns:
+        list: Etiqueta por elemento ('' si no asigna ninguna, None si la petición falla);
+              con with_prompt_hash, tuplas (etiqueta, hash del prompt) o None si falla
+    """
+    import openai
+    
+    if not items:
+        return []
+    if len(items) == 1:
+        tag = query_openai_for_tags(items[0][0], items[0][1], timeout=timeout)
+        return [(tag, LLM_PROMPT_HASH) if with_prompt_hash and tag is not None else tag]
+    
+    api_key = os.environ.get("OPENAI_API_KEY")
+    base_url = os.environ.get("OPENAI_API_BASE")
+    
+    if not api_key:
+        print("  ❌ OPENAI_API_KEY no está configurada")
+        return [None] * len(items)
+    
+    if not base_url:
+        print("  ❌ OPENAI_API_BASE no está configurada")
+        return [None] * len(items)
+    
+    lines = [
+        f"[{number}] PAÍS: {country_name} | CARRERAS: {' '.join(str(carreras_text).split())}"
+        for number, (carreras_text, country_name) in enumerate(items, 1)
+    ]
+    user_prompt = LLM_BATCH_USER_PROMPT.format(count=len(items), items="\n".join(lines))
+    
+    try:
+        client = get_openai_client(api_key, base_url, timeout)
+        completion = client.chat.completions.create(
+            model=LLM_MODEL,
+            messages=[
+                {"role": "system", "content": LLM_BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=20 * len(items) + 10,
+            temperature=0.0
+        )
+        tags = parse_llm_batch_response(completion.choices[0].message.content, len(items))
+    except openai.AuthenticationError:
+        print("  ❌ Error de autenticación con OpenAI API")
+        return [None] * len(items)
+    except openai.APIError as e:
+        print(f"  ❌ Error en petición a OpenAI API: {str(e)}")
+        return [None] * len(items)
+    except Exception as e:
+        print(f"  ❌ Error inesperado con OpenAI API: {str(e)}")
+        return [None] * len(items)
+    
+    if tags is not None:
+        return [(tag, LLM_BATCH_PROMPT_HASH) for tag in tags] if with_prompt_hash else tags
+    
+    # Respuesta malformada: dividir el lote y reintentar cada mitad
+    print(f"  ⚠️  Respuesta malformada para un lote de {len(items)} elementos, dividiendo...")
+    middle = len(items) // 2
+    return (query_openai_for_tags_batch(items[:middle], timeout=timeout, with_prompt_hash=with_prompt_hash)
+            + query_openai_for_tags_batch(items[middle:], timeout=timeout, with_prompt_hash=with_prompt_hash))
 
 def normalize(text):
     """
@@ -299,6 +561,9 @@ def normalize(text):
     
     return text
 
+# Valores que se consideran vacíos (comparados en minúsculas)
+EMPTY_VALUES = {'nan', 'none', 'null', 'undefined', '–', '-', '—', ''}
+
 def clean_value(value):
     """
     Limpia valores vacíos o inválidos reemplazándolos por string vacío.
@@ -314,37 +579,23 @@ def clean_value(value):
     
     value_str = str(value).strip()
     
-    # Valores que se consideran vacíos
-    empty_values = ['nan', 'none', 'null', 'undefined', '–', '-', '—', '']
-    
-    if value_str.lower() in empty_values or value_str == '':
+    if value_str.lower() in EMPTY_VALUES or value_str == '':
         return ""
     
     return value_str
 
 def validate_country(country):
     """
-    Valida si el país está en la lista oficial de GHL.
+    Devuelve el nombre oficial de GHL de un país escrito en español, inglés o
+    como código ISO ("Perú", "Peru" o "PE" -> "Peru").
     
     Args:
         country (str): Nombre del país a validar
         
     Returns:
-        str: País válido o string vacío
+        str: País válido o string vacío si no se reconoce
     """
-    if not country or pd.isna(country):
-        return ""
-    
-    country_clean = clean_value(country)
-    if not country_clean:
-        return ""
-    
-    # Verificar si está en la lista oficial
-    if country_clean in GHL_VALID_COUNTRIES:
-        return country_clean
-    
-    # Si no está exactamente, devolver vacío para mapeo manual
-    return ""
+    return resolve_country(country).name
 
 def validate_required_fields(row):
     """
@@ -363,93 +614,85 @@ def validate_required_fields(row):
     # Debe tener al menos uno de los tres (ya están limpios por clean_value)
     return bool(first_name or email or phone)
 
-def format_phone_e164_strict(num: str, default_country='US'):
+@functools.lru_cache(maxsize=1)
+def combining_chars_table():
+    """Tabla para str.translate que elimina los caracteres combinantes (tildes, diéresis...)"""
+    return {
+        code: None for code in range(sys.maxunicode + 1)
+        if unicodedata.combining(chr(code))
+    }
+
+def normalize_series(series):
     """
-    Formatear teléfono al formato E.164 con validación estricta para GHL.
-    Si no puede convertirse, devuelve string vacío.
+    Versión vectorizada de normalize para una columna completa.
     
     Args:
-        num (str): Número de teléfono
-        default_country (str): País por defecto para parsing
+        series (Series): Textos a normalizar
         
     Returns:
-        str: Número en formato E.164 o string vacío si no es válido
+        Series: Textos normalizados en minúsculas sin tildes ('' para vacíos)
     """
-    if pd.isna(num) or str(num).strip() == '' or str(num).strip().lower() in ['nan', 'none']:
-        return ''
-    
-    clean = str(num).strip()
+    text = series.where(series.notna(), '').astype(str)
+    text = text.str.lower().str.normalize('NFD').str.translate(combining_chars_table())
+    text = text.str.replace(r'[^\w\s]', ' ', regex=True)
+    return text.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+def clean_value_series(series):
+    """
+    Versión vectorizada de clean_value para una columna completa.
     
-    # Manejar casos especiales
-    if clean in ['–', '-', '—', 'nan', 'NaN', 'None', 'none']:
-        return ''
+    Args:
+        series (Series): Valores a limpiar
+        
+    Returns:
+        Series: Valores limpios o string vacío
+    """
+    text = series.where(series.notna(), '').astype(str).str.strip()
+    return text.where(~text.str.lower().isin(EMPTY_VALUES), '')
+
+def required_fields_mask(ghl_df):
+    """
+    Versión vectorizada de validate_required_fields.
     
-    # Manejar números flotantes (como 50425618727.0)
-    if clean.endswith('.0'):
-        clean = clean[:-2]
+    Args:
+        ghl_df (DataFrame): Contactos con encabezados GHL
+        
+    Returns:
+        Series: Máscara booleana de filas con al menos un identificador
+    """
+    mask = pd.Series(False, index=ghl_df.index)
+    for col in ('First Name', 'Email', 'Phone'):
+        if col in ghl_df.columns:
+            mask |= ghl_df[col].ne('')
+    return mask
+
+def only_country_tag_mask(ghl_df):
+    """
+    Máscara vectorizada de contactos cuyas etiquetas son únicamente el país.
     
-    # Manejar números en notación científica
-    if 'e+' in clean.lower() or 'e-' in clean.lower():
-        try:
-            # Convertir de notación científica a entero
-            clean = str(int(float(clean)))
-        except (ValueError, OverflowError):
-            return ''
-    
-    # Extraer solo el primer teléfono si hay múltiples
-    # Buscar patrones comunes de separación
-    separators = [';', ',', '/', '|', '\n', '\t', ' y ', ' - ', ' -']
-    for sep in separators:
-        if sep in clean:
-            clean = clean.split(sep)[0].strip()
-            break
-    
-    # Limpiar caracteres no numéricos excepto +, espacios y paréntesis
-    clean = re.sub(r'[^\d\s\(\)\+\-]', '', clean)
-    clean = clean.strip()
-    
-    # Si después de limpiar no queda nada, devolver vacío
-    if not clean:
-        return ''
-    
-    # Verificar que el número limpio tenga al menos 7 dígitos (mínimo para un teléfono)
-    digits_only = re.sub(r'[^\d]', '', clean)
-    if len(digits_only) < 7:
-        return ''
-    
-    # Si el número no empieza con +, intentar agregar el código de país por defecto
-    if not clean.startswith('+'):
-        # Para Honduras, agregar +504
-        if clean.startswith('504'):
-            clean = '+' + clean
-        else:
-            # Intentar con el país por defecto
-            clean = '+' + clean
+    Args:
+        ghl_df (DataFrame): Contactos con columnas Tags y Country
+        
+    Returns:
+        Series: Máscara booleana
+    """
+    tags = ghl_df['Tags'].where(ghl_df['Tags'].notna(), '').astype(str).str.strip()
+    return (tags != '') & (tags == normalize_series(ghl_df['Country']))
+
+def format_phone_e164_strict(num: str, default_country=None):
+    """
+    Formatear teléfono al formato E.164 con validación estricta para GHL.
+    Si no puede convertirse, devuelve string vacío.
     
-    try:
-        # Intentar parsear con el país por defecto
-        pn = phonenumbers.parse(clean, default_country)
-        if phonenumbers.is_valid_number(pn):
-            formatted = phonenumbers.format_number(pn, phonenumbers.PhoneNumberFormat.E164)
-            # Verificar que el resultado esté en formato E.164 correcto
-            if re.match(r'^\+[1-9]\d{1,14}$', formatted):
-                return formatted
-    except NumberParseException:
-        pass
-    
-    # Si falla, intentar sin país
-    try:
-        pn = phonenumbers.parse(clean)
-        if phonenumbers.is_valid_number(pn):
-            formatted = phonenumbers.format_number(pn, phonenumbers.PhoneNumberFormat.E164)
-            # Verificar que el resultado esté en formato E.164 correcto
-            if re.match(r'^\+[1-9]\d{1,14}$', formatted):
-                return formatted
-    except NumberParseException:
-        pass
-    
-    # Si no se puede formatear a E.164, devolver vacío para evitar errores en GHL
-    return ''
+    Args:
+        num (str): Número de teléfono
+        default_country (str): Código ISO de la región del contacto (p. ej. 'HN');
+                               None si el número debe incluir el código de país
+        
+    Returns:
+        str: Número en formato E.164 o string vacío si no es válido
+    """
+    return format_phone_e164(num, default_country)
 
 def generate_tags(carreras, country_name, use_llm=True):
     """
@@ -475,12 +718,8 @@ def generate_tags(carreras, country_name, use_llm=True):
     carreras_normalized = normalize(carreras)
     
     if carreras_normalized:
-        # Revisar cada regla de etiquetado
-        for tag_name, keywords in TAG_RULES.items():
-            for keyword in keywords:
-                if keyword in carreras_normalized:
-                    tags.append(tag_name)
-                    break  # Solo añadir la etiqueta una vez por regla
+        # Una sola pasada del autómata sobre el texto encuentra todas las reglas
+        tags.extend(TAG_MATCHER.match(carreras_normalized))
     
     # Si solo tenemos la etiqueta del país y LLM está habilitado, intentar con LLM
     if use_llm and len(tags) == 1 and tags[0] == normalize(country_name):
@@ -503,147 +742,398 @@ def generate_tags(carreras, country_name, use_llm=True):
     return ', '.join(unique_tags)
 
 
-
-def process_excel_to_ghl_csv(input_excel, country_filter=None, use_llm=True, validate_only=False):
+def needs_llm_tag(tags, country_name):
     """
-    Procesa Excel a CSV con formato GoHighLevel con validaciones estrictas.
+    Indica si una fila quedó solo con la etiqueta de país y debe consultarse al LLM.
     
     Args:
-        input_excel (str): Ruta del archivo Excel
-        country_filter (str): Filtro de país opcional
-        use_llm (bool): Si usar LLM para etiquetado
-        validate_only (bool): Solo validar sin exportar archivo
+        tags (str): Etiquetas generadas sin LLM
+        country_name (str): Nombre del país
         
     Returns:
-        str: Nombre del archivo generado o None si validate_only=True
+        bool: True si las etiquetas son únicamente el país
     """
-    # Leer el Excel con tipos específicos para evitar conversiones automáticas
-    df = pd.read_excel(input_excel, sheet_name=0, dtype=str)
-    
-    # Filtrar por país si se especifica
-    if country_filter:
-        df = df[df['País'].str.contains(country_filter, case=False, na=False)]
-        if len(df) == 0:
-            print(f"No se encontraron contactos para el país: {country_filter}")
-            return None
-        print(f"Filtrado por país: {country_filter}")
-        print(f"Contactos encontrados: {len(df)}")
-    
-    # Crear nuevo DataFrame con encabezados exactos de GHL
-    ghl_df = pd.DataFrame()
+    country_normalized = normalize(country_name)
+    return bool(country_normalized) and tags == country_normalized
+
+def apply_classifier_tags(ghl_df, classifier, profiler=None):
+    """
+    Etiqueta con el clasificador local las filas que solo tienen la etiqueta de país.
     
-    # Mapeo con encabezados exactos de GHL
-    if 'Nombre_Universidad' in df.columns:
-        ghl_df['First Name'] = df['Nombre_Universidad'].apply(clean_value)
-    else:
-        ghl_df['First Name'] = ''
+    Los textos de carreras únicos de esas filas se puntúan en un solo lote; se
+    aceptan las predicciones con confianza >= classifier.threshold (si no asigna
+    ninguna categoría la fila queda solo con el país) y el resto queda para el LLM.
     
-    if 'Tipo_Institución' in df.columns:
-        ghl_df['Last Name'] = df['Tipo_Institución'].apply(clean_value)
-    else:
-        ghl_df['Last Name'] = ''
+    Args:
+        ghl_df (DataFrame): DataFrame con columnas Carreras, Country y Tags (sin LLM)
+        classifier (TagClassifier): Modelo cargado con TagClassifier.load
+        profiler (StageProfiler): Cuenta las filas resueltas por el clasificador (opcional)
+        
+    Returns:
+        tuple: (columna Tags actualizada, índice de las filas resueltas que ya no
+                deben consultarse al LLM)
+    """
+    carreras = normalize_series(ghl_df['Carreras'])
+    positions = np.flatnonzero((only_country_tag_mask(ghl_df) & (carreras != '')).to_numpy())
+    if not len(positions):
+        return ghl_df['Tags'].copy(), ghl_df.index[:0]
+    
+    codes, uniques = pd.factorize(carreras.iloc[positions])
+    labels, confidence = classifier.predict(list(uniques))
+    accepted = (confidence >= classifier.threshold)[codes]
+    labels = np.array([', '.join(categories) for categories in labels], dtype=object)[codes]
+    tagged = accepted & (labels != '')
+    values = ghl_df['Tags'].to_numpy(dtype=object).copy()
+    values[positions[tagged]] = values[positions[tagged]] + ', ' + labels[tagged]
+    tags = pd.Series(values, index=ghl_df.index, name='Tags').astype(ghl_df['Tags'].dtype)
+    resolved = ghl_df.index[positions[accepted]]
+    
+    print(f"  🧮 Clasificador local: {len(resolved)}/{len(positions)} filas resueltas con confianza >= "
+          f"{classifier.threshold} ({int(tagged.sum())} etiquetadas)")
+    if profiler is not None:
+        profiler.count('classifier_resolved_rows', len(resolved))
+    return tags, resolved
+
+def apply_llm_tags(ghl_df, max_workers=4, timeout=None, cache=None, batch_size=1, profiler=None, skip=None):
+    """
+    Completa con el LLM las filas que solo tienen la etiqueta de país.
     
-    if 'Email_General' in df.columns:
-        ghl_df['Email'] = df['Email_General'].apply(normalize_email)
-    else:
-        ghl_df['Email'] = ''
+    Las filas con el mismo texto de carreras y país normalizados se agrupan en
+    una sola consulta, se reutilizan las respuestas guardadas en la caché y el
+    resto se envía en paralelo con un número máximo de peticiones simultáneas.
     
-    # Procesar teléfonos principales con validación estricta
-    if 'Teléfono_Principal' in df.columns:
-        # Asegurar que se procesen como strings
-        phone_series = df['Teléfono_Principal'].astype(str).replace('nan', '')
-        ghl_df['Phone'] = phone_series.apply(format_phone_e164_strict)
+    Args:
+        ghl_df (DataFrame): DataFrame con columnas Carreras, Country y Tags (sin LLM)
+        max_workers (int): Número máximo de peticiones simultáneas al LLM
+        timeout (float): Timeout por petición en segundos (opcional)
+        cache (LLMTagCache): Caché persistente de respuestas (opcional)
+        batch_size (int): Universidades por petición al LLM (1 = una por petición)
+        profiler (StageProfiler): Registra la latencia de cada petición (opcional)
+        skip (Index): Filas ya resueltas por el clasificador local (opcional)
+        
+    Returns:
+        Series: Columna Tags actualizada
+    """
+    tags = ghl_df['Tags'].copy()
+    skip = set(skip) if skip is not None else ()
+    
+    # Agrupar filas pendientes por clave normalizada (una consulta por clave)
+    pending = {}
+    for index, tag_value, carreras, country in zip(ghl_df.index, ghl_df['Tags'], ghl_df['Carreras'], ghl_df['Country']):
+        if index not in skip and needs_llm_tag(tag_value, country):
+            key = (normalize(carreras), normalize(country))
+            pending.setdefault(key, {'item': (carreras, country), 'rows': []})['rows'].append(index)
+    if not pending:
+        return tags
+    
+    # Los lotes de un elemento se responden con el prompt individual, así que en modo
+    # por lotes también valen las respuestas guardadas con ese prompt
+    prompt_hashes = (LLM_BATCH_PROMPT_HASH, LLM_PROMPT_HASH) if batch_size > 1 else (LLM_PROMPT_HASH,)
+    answers = {}
+    to_query = []
+    for key in pending:
+        cached = cache.get(*key, LLM_MODEL, prompt_hashes) if cache is not None else None
+        if cached is None:
+            to_query.append(key)
+        else:
+            answers[key] = cached
+    
+    total_rows = sum(len(group['rows']) for group in pending.values())
+    print(f"  🤖 Consultando LLM para {len(to_query)} textos únicos de {total_rows} filas "
+          f"({len(pending) - len(to_query)} desde caché, {max_workers} peticiones simultáneas)...")
+    items = [pending[key]['item'] for key in to_query]
+    query_fn = query_openai_for_tags_batch if batch_size > 1 else query_openai_for_tags
+    if profiler is not None:
+        query_fn = profiler.timed(query_fn)
+        profiler.count('llm_unique_texts', len(pending))
+        profiler.count('llm_cache_hits', len(pending) - len(to_query))
+    if batch_size > 1:
+        # Cada respuesta se guarda con el hash del prompt que la produjo
+        results = query_llm_batches_concurrently(items, functools.partial(query_fn, with_prompt_hash=True),
+                                                 batch_size=batch_size, max_workers=max_workers, timeout=timeout)
     else:
-        ghl_df['Phone'] = ''
+        results = query_llm_concurrently(items, query_fn, max_workers=max_workers, timeout=timeout)
+        results = [(llm_tag, LLM_PROMPT_HASH) if llm_tag is not None else None for llm_tag in results]
+    
+    for key, result in zip(to_query, results):
+        # Los fallos de red/API no se guardan para reintentarlos en la próxima corrida
+        if result is None:
+            continue
+        llm_tag, prompt_hash = result
+        answers[key] = llm_tag
+        if cache is not None:
+            cache.set(*key, LLM_MODEL, prompt_hash, llm_tag)
+    if cache is not None:
+        cache.commit()
+    
+    assigned = 0
+    for key, group in pending.items():
+        llm_tag = answers.get(key)
+        if llm_tag:
+            for index in group['rows']:
+                tags.at[index] = f"{tags.at[index]}, {llm_tag}"
+            assigned += len(group['rows'])
+    print(f"  ✅ LLM asignó etiqueta a {assigned}/{total_rows} filas")
     
-    # Procesar teléfonos adicionales
-    if 'Tel_Admisiones' in df.columns:
-        # Asegurar que se procesen como strings
-        additional_phone_series = df['Tel_Admisiones'].astype(str).replace('nan', '')
-        ghl_df['Additional Phone Numbers'] = additional_phone_series.apply(format_phone_e164_strict)
-    else:
-        ghl_df['Additional Phone Numbers'] = ''
+    return tags
+
+def build_ghl_dataframe(df, vectorized=True, stats=None, profiler=None):
+    """
+    Mapea las columnas del Excel a los encabezados exactos de GHL, limpiando cada valor.
     
-    # Procesar emails adicionales
-    if 'Rector_Email' in df.columns:
-        ghl_df['Additional Email Addresses'] = df['Rector_Email'].apply(normalize_email)
+    Args:
+        df (DataFrame): Datos leídos del Excel
+        vectorized (bool): Normalizar solo los valores únicos de cada columna (con
+                           limpieza vectorizada) en lugar de apply por celda
+        stats (UniqueMapStats): Acumulador de estadísticas de valores únicos (opcional)
+        profiler (StageProfiler): Mide teléfonos, emails, países y limpieza de texto (opcional)
+        
+    Returns:
+        DataFrame: Contactos con encabezados GHL (sin columna Tags)
+    """
+    if vectorized:
+        clean = lambda series: map_unique(series, clean_value_series, series_func=True, stats=stats)
+        resolve_cell = lambda series: map_unique_fields(series, resolve_country, stats=stats,
+                                                        baseline=COUNTRY_RESOLVER.lookup)
+        format_phone = lambda series: map_unique_pairs(series, regions, format_phone_e164_strict,
+                                                       stats=stats, name=series.name)
+        split_emails = lambda general, extra: extract_email_columns(general, extra, stats=stats)
     else:
-        ghl_df['Additional Email Addresses'] = ''
-    
-    # Validar países según lista oficial de GHL
+        clean = lambda series: series.apply(clean_value)
+        def resolve_cell(series):
+            resolved = [resolve_country(value) for value in series]
+            return tuple(pd.Series([value[position] for value in resolved], index=series.index, dtype=object)
+                         for position in range(2))
+        format_phone = lambda series: pd.Series(
+            [format_phone_e164_strict(num, region) for num, region in zip(series, regions)],
+            index=series.index, dtype=object)
+        def split_emails(general, extra):
+            pairs = [split_contact_emails(a, b) for a, b in
+                     zip(general, extra if extra is not None else [None] * len(general))]
+            return (pd.Series([pair[0] for pair in pairs], index=general.index, dtype=object),
+                    pd.Series([pair[1] for pair in pairs], index=general.index, dtype=object))
+    
+    if profiler is not None:
+        # Cada tipo de normalización se acumula como una etapa del perfil
+        resolve_cell = profiled(profiler, 'countries', resolve_cell)
+        clean = profiled(profiler, 'clean_text', clean)
+        format_phone = profiled(profiler, 'phones', format_phone)
+        split_emails = profiled(profiler, 'emails', split_emails)
+    
+    # Nombre de GHL (columna Country) y región ISO de cada fila (para los teléfonos sin
+    # código de país) salen de una sola resolución de los valores únicos de País
     if 'País' in df.columns:
-        ghl_df['Country'] = df['País'].apply(validate_country)
+        countries, regions = resolve_cell(df['País'])
     else:
-        ghl_df['Country'] = ''
+        regions = pd.Series(None, index=df.index, dtype=object)
+    
+    # El primer e-mail de Email_General es el principal; el resto y los de Rector_Email
+    # son adicionales. Las dos columnas de GHL salen de una sola separación
+    email_parts = {}
+    def email_part(position):
+        def normalize(general, extra):
+            if 'pair' not in email_parts:
+                if general is None:
+                    general = pd.Series(None, index=df.index, dtype=object)
+                email_parts['pair'] = split_emails(general, extra)
+            return email_parts['pair'][position]
+        return normalize
+    
+    # Los teléfonos se procesan como strings con validación estricta
+    normalizers = {
+        'text': clean,
+        'phone': lambda series: format_phone(series.astype(str).replace('nan', '')),
+        'country': lambda series: countries,
+        'email': email_part(0),
+        'additional_emails': email_part(1),
+    }
     
-    if 'Dirección_Completa' in df.columns:
-        ghl_df['Address'] = df['Dirección_Completa'].apply(clean_value)
-    else:
-        ghl_df['Address'] = ''
+    # Mapeo declarativo con encabezados exactos de GHL (column_schema.GHL_SCHEMA)
+    ghl_df = GHL_PLAN.transform(df, normalizers)
     
-    if 'Sitio_Web' in df.columns:
-        ghl_df['Website'] = df['Sitio_Web'].apply(clean_value)
-    else:
-        ghl_df['Website'] = ''
+    # Procedencia (archivo:hoja) cuando se combinan varias hojas o archivos
+    if SOURCE_COLUMN in df.columns:
+        ghl_df[SOURCE_COLUMN] = df[SOURCE_COLUMN]
     
-    # Redes sociales
-    if 'Facebook' in df.columns:
-        ghl_df['Facebook'] = df['Facebook'].apply(clean_value)
-    else:
-        ghl_df['Facebook'] = ''
+    return ghl_df
+
+def apply_fallback_tags(ghl_df, use_llm=True, llm_workers=4, llm_timeout=None, llm_cache=None, llm_batch_size=1,
+                        tag_classifier=None, profiler=None):
+    """
+    Completa las filas que las keywords dejaron solo con el país: primero el
+    clasificador local (si hay modelo) y después el LLM con las que quedan.
     
-    if 'Instagram' in df.columns:
-        ghl_df['Instagram'] = df['Instagram'].apply(clean_value)
-    else:
-        ghl_df['Instagram'] = ''
+    Returns:
+        DataFrame: El mismo DataFrame con la columna Tags actualizada
+    """
+    resolved = None
+    if tag_classifier is not None:
+        with profile_stage(profiler, 'classifier_tags', items=len(ghl_df)):
+            ghl_df['Tags'], resolved = apply_classifier_tags(ghl_df, tag_classifier, profiler=profiler)
+    if use_llm:
+        with profile_stage(profiler, 'llm_tags', items=len(ghl_df)):
+            ghl_df['Tags'] = apply_llm_tags(ghl_df, max_workers=llm_workers, timeout=llm_timeout, cache=llm_cache,
+                                            batch_size=llm_batch_size, profiler=profiler, skip=resolved)
+    return ghl_df
+
+def add_tags_column(ghl_df, use_llm=True, llm_workers=4, llm_timeout=None, llm_cache=None, llm_batch_size=1,
+                    vectorized=True, stats=None, profiler=None, tag_classifier=None):
+    """
+    Genera la columna Tags: primero por keywords, después con el clasificador local
+    (si hay modelo) y por último, si está habilitado, con el LLM.
     
-    if 'LinkedIn' in df.columns:
-        ghl_df['LinkedIn'] = df['LinkedIn'].apply(clean_value)
-    else:
-        ghl_df['LinkedIn'] = ''
-    
-    # WhatsApp con validación estricta
-    if 'WhatsApp' in df.columns:
-        # Asegurar que se procesen como strings
-        whatsapp_series = df['WhatsApp'].astype(str).replace('nan', '')
-        ghl_df['WhatsApp'] = whatsapp_series.apply(format_phone_e164_strict)
-    else:
-        ghl_df['WhatsApp'] = ''
+    Args:
+        ghl_df (DataFrame): Contactos con columnas Carreras y Country
+        use_llm (bool): Si usar LLM para etiquetado
+        llm_workers (int): Peticiones simultáneas al LLM (1 = serial)
+        llm_timeout (float): Timeout por petición al LLM en segundos
+        llm_cache (LLMTagCache): Caché persistente de respuestas del LLM (opcional)
+        llm_batch_size (int): Universidades por petición al LLM (1 = una por petición)
+        vectorized (bool): Etiquetar solo las combinaciones únicas de Carreras y Country
+        stats (UniqueMapStats): Acumulador de estadísticas de valores únicos (opcional)
+        profiler (StageProfiler): Mide el etiquetado por keywords y el LLM (opcional)
+        tag_classifier (TagClassifier): Clasificador local previo al LLM (opcional)
+        
+    Returns:
+        DataFrame: El mismo DataFrame con la columna Tags
+    """
+    # Primero etiquetas por keywords; el clasificador y el LLM completan después
+    with profile_stage(profiler, 'keyword_tags', items=len(ghl_df)):
+        if vectorized:
+            ghl_df['Tags'] = map_unique_pairs(
+                ghl_df['Carreras'], ghl_df['Country'],
+                lambda carreras, country: generate_tags(carreras, country, use_llm=False),
+                stats=stats, name='Tags (Carreras + Country)'
+            )
+        else:
+            ghl_df['Tags'] = ghl_df.apply(
+                lambda row: generate_tags(row['Carreras'], row['Country'], use_llm=False), 
+                axis=1
+            )
+    return apply_fallback_tags(ghl_df, use_llm=use_llm, llm_workers=llm_workers, llm_timeout=llm_timeout,
+                               llm_cache=llm_cache, llm_batch_size=llm_batch_size,
+                               tag_classifier=tag_classifier, profiler=profiler)
+
+def _clean_and_tag_chunk(args):
+    """Limpia y etiqueta por keywords un bloque de filas (se ejecuta en un proceso del pool)."""
+    df, vectorized, profiler, per_cell = args
+    # Los costes por celda ya medidos en el proceso principal no se vuelven a medir
+    stats = UniqueMapStats(per_cell) if vectorized else None
+    ghl_df = build_ghl_dataframe(df, vectorized=vectorized, stats=stats, profiler=profiler)
+    return add_tags_column(ghl_df, use_llm=False, vectorized=vectorized, stats=stats, profiler=profiler), stats, profiler
+
+def build_tagged_dataframe(df, use_llm=True, llm_workers=4, llm_timeout=None, llm_cache=None, llm_batch_size=1,
+                           vectorized=True, stats=None, pool=None, workers=1, profiler=None, tag_classifier=None,
+                           low_memory=False):
+    """
+    Limpia las filas del Excel y genera la columna Tags.
     
-    # Información adicional
-    if 'Carreras_Disponibles' in df.columns:
-        ghl_df['Carreras'] = df['Carreras_Disponibles'].apply(clean_value)
-    else:
-        ghl_df['Carreras'] = ''
+    Con un pool de procesos, las filas se reparten en bloques contiguos y cada
+    proceso hace la limpieza y el etiquetado por keywords; los bloques se
+    concatenan en el orden original. El clasificador local y el LLM se aplican
+    después en el proceso principal (el clasificador puntúa todo en un lote y
+    el LLM usa la caché y ya tiene su propio paralelismo de peticiones).
     
-    if 'Notas_Adicionales' in df.columns:
-        ghl_df['Notas'] = df['Notas_Adicionales'].apply(clean_value)
+    Args:
+        df (DataFrame): Datos leídos del Excel
+        use_llm (bool): Si usar LLM para etiquetado
+        llm_workers (int): Peticiones simultáneas al LLM (1 = serial)
+        llm_timeout (float): Timeout por petición al LLM en segundos
+        llm_cache (LLMTagCache): Caché persistente de respuestas del LLM (opcional)
+        llm_batch_size (int): Universidades por petición al LLM (1 = una por petición)
+        vectorized (bool): Normalizar por valores únicos (False = apply por celda)
+        stats (UniqueMapStats): Acumulador de estadísticas de valores únicos (opcional)
+        pool (ProcessPoolExecutor): Pool de procesos (None = serial)
+        workers (int): Número de bloques en que se reparten las filas
+        profiler (StageProfiler): Perfil por etapas; con pool se suman los tiempos de
+                                  todos los procesos (opcional)
+        tag_classifier (TagClassifier): Clasificador local previo al LLM (opcional)
+        low_memory (bool): Guardar las columnas repetitivas como category y el resto
+                           como string[pyarrow] (ver compact_frame)
+        
+    Returns:
+        DataFrame: Contactos con encabezados GHL y columna Tags
+    """
+    if pool is None or len(df) < 2:
+        ghl_df = build_ghl_dataframe(df, vectorized=vectorized, stats=stats, profiler=profiler)
+        ghl_df = add_tags_column(ghl_df, use_llm=use_llm, llm_workers=llm_workers, llm_timeout=llm_timeout,
+                                 llm_cache=llm_cache, llm_batch_size=llm_batch_size,
+                                 vectorized=vectorized, stats=stats, profiler=profiler, tag_classifier=tag_classifier)
     else:
-        ghl_df['Notas'] = ''
+        with profile_stage(profiler, 'process_pool', items=len(df)):
+            results = map_frame_chunks(pool, _clean_and_tag_chunk, df, workers, vectorized,
+                                       profiler.worker_profiler() if profiler is not None else None,
+                                       stats.per_cell if stats is not None else None)
+        for _, chunk_stats, chunk_profiler in results:
+            if stats is not None:
+                stats.merge(chunk_stats)
+            if profiler is not None:
+                profiler.merge(chunk_profiler)
+        ghl_df = pd.concat([chunk for chunk, _, _ in results])
+        ghl_df = apply_fallback_tags(ghl_df, use_llm=use_llm, llm_workers=llm_workers, llm_timeout=llm_timeout,
+                                     llm_cache=llm_cache, llm_batch_size=llm_batch_size,
+                                     tag_classifier=tag_classifier, profiler=profiler)
+    
+    # Las etiquetas ya no cambian: las columnas repetitivas pasan a category hasta la escritura
+    if low_memory:
+        with profile_stage(profiler, 'compact_dtypes', items=len(ghl_df)):
+            compact_frame(ghl_df)
+    return ghl_df
+
+def filter_by_country(df, country_filter):
+    """
+    Filtra las filas del Excel por país con el mismo resolvedor que la columna Country.
     
-    # Generar columna Tags con soporte para LLM
-    if use_llm:
-        print("Generando etiquetas con soporte para LLM...")
-    else:
-        print("Generando etiquetas (LLM deshabilitado)...")
+    "Mexico", "México" o "MX" seleccionan las filas cuyo País se resuelve al mismo
+    país de GHL. Si el filtro no es un país reconocido se buscan las filas cuyo País
+    contiene el texto (sin distinguir mayúsculas).
     
-    ghl_df['Tags'] = ghl_df.apply(
-        lambda row: generate_tags(row['Carreras'], row['Country'], use_llm=use_llm), 
-        axis=1
-    )
+    Args:
+        df (DataFrame): Filas leídas del Excel (con la columna País)
+        country_filter (str): País a seleccionar
+        
+    Returns:
+        DataFrame: Filas del país
+    """
+    target = resolve_country(country_filter).name
+    if not target:
+        return df[df['País'].str.contains(country_filter, case=False, na=False)]
+    names = map_unique(df['País'], lambda country: resolve_country(country).name)
+    return df[(names == target).to_numpy()]
 
-    # Filtrar filas que no cumplen con los requisitos mínimos de GHL
-    initial_count = len(ghl_df)
-    ghl_df = ghl_df[ghl_df.apply(validate_required_fields, axis=1)]
-    filtered_count = len(ghl_df)
+def filter_required_fields(ghl_df, vectorized=True):
+    """
+    Filtra filas que no cumplen con los requisitos mínimos de GHL.
     
-    if filtered_count < initial_count:
-        print(f"⚠️  Se eliminaron {initial_count - filtered_count} filas sin identificadores válidos")
+    Args:
+        ghl_df (DataFrame): Contactos con encabezados GHL
+        vectorized (bool): Usar máscaras booleanas en lugar de apply por fila
+        
+    Returns:
+        DataFrame: Solo las filas con al menos un identificador válido
+    """
+    if len(ghl_df) == 0:
+        return ghl_df
+    if vectorized:
+        return ghl_df[required_fields_mask(ghl_df)]
+    return ghl_df[ghl_df.apply(validate_required_fields, axis=1)]
 
-    # Log final con estadísticas de etiquetado
-    total_contacts = len(ghl_df)
+def count_only_country_tags(ghl_df, vectorized=True):
+    """
+    Cuenta contactos que solo tienen la etiqueta de país.
+    
+    Args:
+        ghl_df (DataFrame): Contactos con columnas Tags y Country
+        vectorized (bool): Usar máscaras booleanas en lugar de apply por fila
+        
+    Returns:
+        int: Número de contactos solo con etiqueta de país
+    """
+    if len(ghl_df) == 0:
+        return 0
+    if vectorized:
+        return int(only_country_tag_mask(ghl_df).sum())
     
-    # Contar contactos que solo tienen etiqueta de país
     def has_only_country_tag(row):
         if pd.isna(row['Tags']) or row['Tags'].strip() == '':
             return False
@@ -651,7 +1141,10 @@ def process_excel_to_ghl_csv(input_excel, country_filter=None, use_llm=True, val
         tags = row['Tags'].strip()
         return tags == country_normalized
     
-    contacts_with_only_country = len(ghl_df[ghl_df.apply(has_only_country_tag, axis=1)])
+    return len(ghl_df[ghl_df.apply(has_only_country_tag, axis=1)])
+
+def print_tagging_stats(total_contacts, contacts_with_only_country, use_llm=True, llm_cache=None):
+    """Imprime el bloque final de estadísticas de etiquetado"""
     contacts_with_extra_tags = total_contacts - contacts_with_only_country
     
     print(f"\n📊 Estadísticas de etiquetado:")
@@ -660,51 +1153,80 @@ def process_excel_to_ghl_csv(input_excel, country_filter=None, use_llm=True, val
     print(f"   Solo con país: {contacts_with_only_country}")
     if contacts_with_only_country > 0:
         print(f"   ⚠️  {contacts_with_only_country} contactos quedaron solo con etiqueta de país")
-        print(f"   💡 Considera añadir más keywords a TAG_RULES para mejorar cobertura")
+        print(f"   💡 Considera añadir más keywords a TAG_RULES; tag_coverage.py muestra las carreras sin categoría")
+    if use_llm and llm_cache is not None:
+        print(f"   Caché LLM: {llm_cache.hits} aciertos, {llm_cache.misses} fallos")
 
-    # Si es solo validación, mostrar estadísticas y retornar
-    if validate_only:
-        print(f"\n🔍 VALIDACIÓN COMPLETA:")
-        print(f"   Filas finales: {total_contacts}")
-        
-        # Contar filas con Phone vacío pero Email presente y viceversa
-        phone_empty_email_present = len(ghl_df[(ghl_df['Phone'] == '') & (ghl_df['Email'] != '')])
-        email_empty_phone_present = len(ghl_df[(ghl_df['Email'] == '') & (ghl_df['Phone'] != '')])
-        
-        print(f"   Con Phone vacío pero Email presente: {phone_empty_email_present}")
-        print(f"   Con Email vacío pero Phone presente: {email_empty_phone_present}")
-        
-        # Lista de países únicos que no están en la lista oficial
-        unique_countries = set(ghl_df['Country'].unique())
-        invalid_countries = [c for c in unique_countries if c and c not in GHL_VALID_COUNTRIES]
-        
-        if invalid_countries:
-            print(f"   ⚠️  Países no válidos en GHL: {invalid_countries}")
-        else:
-            print(f"   ✅ Todos los países son válidos para GHL")
+def validation_counts(ghl_df):
+    """
+    Calcula los conteos del reporte de validación.
+    
+    Args:
+        ghl_df (DataFrame): Contactos con encabezados GHL
         
-        return None
+    Returns:
+        dict: Filas, filas con solo Email o solo Phone y países no válidos
+    """
+    return {
+        'rows': len(ghl_df),
+        'phone_empty_email_present': len(ghl_df[(ghl_df['Phone'] == '') & (ghl_df['Email'] != '')]),
+        'email_empty_phone_present': len(ghl_df[(ghl_df['Email'] == '') & (ghl_df['Phone'] != '')]),
+        'invalid_countries': {c for c in ghl_df['Country'].unique() if c and c not in GHL_VALID_COUNTRIES},
+    }
 
-    # Generar nombre del archivo con el país
-    if country_filter:
-        # Limpiar el nombre del país para el archivo
-        country_clean = country_filter.replace(' ', '_').replace('-', '_').lower()
-        output_csv = f"contactos_{country_clean}_ghl.csv"
+def print_validation_report(counts):
+    """Imprime el reporte de --validate-only a partir de validation_counts"""
+    print(f"\n🔍 VALIDACIÓN COMPLETA:")
+    print(f"   Filas finales: {counts['rows']}")
+    print(f"   Con Phone vacío pero Email presente: {counts['phone_empty_email_present']}")
+    print(f"   Con Email vacío pero Phone presente: {counts['email_empty_phone_present']}")
+    
+    if counts['invalid_countries']:
+        print(f"   ⚠️  Países no válidos en GHL: {list(counts['invalid_countries'])}")
     else:
-        output_csv = "contactos_todos_paises.csv"
+        print(f"   ✅ Todos los países son válidos para GHL")
 
-    # Quitar duplicados de email no vacío
-    initial_count = len(ghl_df)
-    ghl_df = ghl_df.sort_values('Email').drop_duplicates(
-        subset=['Email'], keep='first'
-    )
-    duplicates_removed = initial_count - len(ghl_df)
+def output_csv_name(country_filter=None):
+    """
+    Genera el nombre del archivo de salida con el país.
     
-    # Log de limpieza de emails
-    invalid_email_count = (ghl_df['Email'] == '').sum()
-    print(f"❗ Emails descartados por formato/placeholder: {invalid_email_count}")
-    if duplicates_removed > 0:
-        print(f"❗ Emails duplicados eliminados: {duplicates_removed}")
+    Args:
+        country_filter (str): Filtro de país opcional
+        
+    Returns:
+        str: Nombre del CSV de salida
+    """
+    if country_filter:
+        # Limpiar el nombre del país para el archivo: sin acentos, espacios ni puntuación
+        country_clean = country_key(country_filter).replace(' ', '_')
+        return f"contactos_{country_clean}_ghl.csv"
+    return "contactos_todos_paises.csv"
+
+def profile_report_path(country_filter=None):
+    """
+    Nombre del informe de --profile junto al CSV de salida.
+    
+    Args:
+        country_filter (str): Filtro de país opcional
+        
+    Returns:
+        str: Ruta del JSON (p. ej. contactos_todos_paises_profile.json)
+    """
+    return output_csv_name(country_filter)[:-len('.csv')] + '_profile.json'
+
+def prepare_for_export(ghl_df):
+    """
+    Asegura que las columnas de teléfono y email se guarden como strings sin 'nan'
+    y devuelve a texto las columnas compactadas con --low-memory.
+    
+    Args:
+        ghl_df (DataFrame): Contactos con encabezados GHL
+        
+    Returns:
+        DataFrame: Contactos listos para exportar
+    """
+    # Las columnas compactadas con --low-memory vuelven a texto solo al escribir
+    restore_frame(ghl_df)
     
     # Asegurar que las columnas de teléfono y email se guarden como strings
     phone_columns = ['Phone', 'Additional Phone Numbers', 'WhatsApp']
@@ -720,41 +1242,833 @@ def process_excel_to_ghl_csv(input_excel, country_filter=None, use_llm=True, val
             # Reemplazar 'nan' por string vacío
             ghl_df[col] = ghl_df[col].replace('nan', '')
     
+    return ghl_df
+
+def write_export_csv(ghl_df, output_csv, sharding=None, report=True):
+    """
+    Escribe el CSV de contactos, en partes y/o comprimido si se indica.
+    
+    Args:
+        ghl_df (DataFrame): Contactos ya preparados con prepare_for_export
+        output_csv (str): Ruta del CSV de salida
+        sharding (CSVSharding): Opciones de --shard-rows, --shard-size-mb y --gzip
+                                (None = un único CSV sin comprimir)
+        report (bool): Imprimir los archivos generados
+        
+    Returns:
+        str: Ruta del CSV o, con sharding, del manifiesto de archivos
+    """
+    if sharding is None:
+        ghl_df.to_csv(output_csv, index=False, encoding='utf-8')
+        return output_csv
+    writer = sharding.write_frame(ghl_df, output_csv)
+    if report:
+        writer.print_report()
+    return writer.manifest_path
+
+def read_workbook(input_excel, workbook_cache=None, sheets=None, read_workers=4, plan=GHL_PLAN):
+    """
+    Lee el Excel como texto, usando la caché de libros si se indica.
+    
+    Con una sola ruta y sin selector de hojas se lee la primera hoja. Con varias
+    rutas o un selector se leen todas las hojas seleccionadas en paralelo y se
+    concatenan (con la columna Source si hay más de una hoja). Con un plan de
+    column_schema se valida antes el encabezado y solo se leen las columnas mapeadas.
+    
+    Args:
+        input_excel (str o list): Ruta del archivo Excel o lista de rutas
+        workbook_cache (WorkbookCache): Caché de hojas parseadas (opcional)
+        sheets: Selector de hojas de parse_sheet_selector (None = primera hoja)
+        read_workers (int): Procesos para leer varias hojas a la vez
+        plan (MappingPlan): Columnas a leer (None = todas)
+        
+    Returns:
+        DataFrame: Filas con las columnas como texto
+    """
+    if isinstance(input_excel, str) and sheets is None:
+        if plan is not None:
+            hits = workbook_cache.hits if workbook_cache is not None else 0
+            df = plan.read_excel(input_excel, workbook_cache=workbook_cache)
+        elif workbook_cache is None:
+            return pd.read_excel(input_excel, sheet_name=0, dtype=str)
+        else:
+            hits = workbook_cache.hits
+            df = workbook_cache.read_excel(input_excel)
+        if workbook_cache is not None and workbook_cache.hits > hits:
+            print(f"📦 Excel cargado desde la caché: {workbook_cache.cache_dir}")
+        return df
+    
+    paths = [input_excel] if isinstance(input_excel, str) else list(input_excel)
+    hits = workbook_cache.hits if workbook_cache is not None else 0
+    df, sources = read_inputs(paths, sheets, workers=read_workers, workbook_cache=workbook_cache, plan=plan)
+    cached = f", {workbook_cache.hits - hits} desde la caché" if workbook_cache is not None else ""
+    print(f"📚 {len(sources)} hojas de {len(paths)} archivos: {len(df)} filas{cached}")
+    return df
+
+def report_push(pusher, profiler=None):
+    """Imprime el resumen del envío a GHL y lo suma a los contadores del perfil."""
+    pusher.stats.print_report()
+    if profiler is not None:
+        profiler.count('ghl_sent', pusher.stats.sent)
+        profiler.count('ghl_failed', pusher.stats.failed)
+        profiler.count('ghl_retries', pusher.stats.retries)
+
+def push_contacts(pusher, ghl_df, profiler=None):
+    """
+    Envía a la API de GHL los contactos ya exportados, sin volver a leer el CSV.
+    
+    Args:
+        pusher (GHLPusher): Cliente de la API de GHL
+        ghl_df (DataFrame): Contactos listos para exportar (prepare_for_export)
+        profiler (StageProfiler): Mide la etapa ghl_push (opcional)
+        
+    Returns:
+        PushStats: Estadísticas del envío
+    """
+    print(f"📤 Enviando {len(ghl_df)} contactos a GHL con {pusher.workers} conexiones...")
+    with profile_stage(profiler, 'ghl_push', items=len(ghl_df)):
+        pusher.push_frame(ghl_df)
+    report_push(pusher, profiler)
+    return pusher.stats
+
+def process_excel_to_ghl_csv(input_excel, country_filter=None, use_llm=True, validate_only=False,
+                             llm_workers=4, llm_timeout=None, llm_cache=None, llm_batch_size=1,
+                             chunk_size=None, vectorized=True, workbook_cache=None, workers=1,
+                             sheets=None, read_workers=4, profiler=None, pusher=None, sharding=None,
+                             tag_classifier=None, low_memory=False):
+    """
+    Procesa Excel a CSV con formato GoHighLevel con validaciones estrictas.
+    
+    Args:
+        input_excel (str o list): Ruta del archivo Excel o lista de rutas
+        country_filter (str): Filtro de país opcional
+        use_llm (bool): Si usar LLM para etiquetado
+        validate_only (bool): Solo validar sin exportar archivo
+        llm_workers (int): Peticiones simultáneas al LLM (1 = serial)
+        llm_timeout (float): Timeout por petición al LLM en segundos
+        llm_cache (LLMTagCache): Caché persistente de respuestas del LLM (opcional)
+        llm_batch_size (int): Universidades por petición al LLM (1 = una por petición)
+        chunk_size (int): Si se indica, procesa el Excel por bloques de este tamaño
+                          con memoria acotada (ver process_excel_streaming)
+        vectorized (bool): Limpieza, filtrado y estadísticas con operaciones vectorizadas
+                           de pandas (False = apply fila por fila)
+        workbook_cache (WorkbookCache): Caché de hojas parseadas (no se usa en modo por bloques)
+        workers (int): Procesos para la limpieza y el etiquetado por keywords (1 = serial)
+        sheets: Selector de hojas de parse_sheet_selector (None = primera hoja)
+        read_workers (int): Procesos para leer varias hojas o archivos a la vez
+        profiler (StageProfiler): Perfil por etapas de --profile (opcional)
+        pusher (GHLPusher): Si se indica, envía los contactos exportados a la API de GHL
+        sharding (CSVSharding): Dividir y/o comprimir el CSV de salida (opcional)
+        tag_classifier (TagClassifier): Clasificador local previo al LLM (opcional)
+        low_memory (bool): Columnas repetitivas como category hasta la escritura (--low-memory)
+        
+    Returns:
+        str: Nombre del archivo generado (el manifiesto de archivos con sharding)
+             o None si validate_only=True
+    """
+    llm_options = dict(use_llm=use_llm, llm_workers=llm_workers, llm_timeout=llm_timeout,
+                       llm_cache=llm_cache, llm_batch_size=llm_batch_size, tag_classifier=tag_classifier)
+    if chunk_size:
+        return process_excel_streaming(input_excel, country_filter, validate_only=validate_only,
+                                       chunk_size=chunk_size, vectorized=vectorized, workers=workers,
+                                       sheets=sheets, profiler=profiler, pusher=pusher, sharding=sharding,
+                                       low_memory=low_memory, **llm_options)
+    
+    # Leer el Excel con tipos específicos para evitar conversiones automáticas
+    with profile_stage(profiler, 'read_excel'):
+        df = read_workbook(input_excel, workbook_cache, sheets, read_workers)
+    if profiler is not None:
+        profiler.stages['read_excel']['items'] += len(df)
+        profiler.count('rows_read', len(df))
+    
+    # Filtrar por país si se especifica
+    if country_filter:
+        df = filter_by_country(df, country_filter)
+        if len(df) == 0:
+            print(f"No se encontraron contactos para el país: {country_filter}")
+            return None
+        print(f"Filtrado por país: {country_filter}")
+        print(f"Contactos encontrados: {len(df)}")
+    
+    unique_stats = UniqueMapStats() if vectorized else None
+    
+    # Generar columna Tags con soporte para LLM
+    if use_llm:
+        print("Generando etiquetas con soporte para LLM...")
+    else:
+        print("Generando etiquetas (LLM deshabilitado)...")
+    with worker_pool(workers) as pool:
+        ghl_df = build_tagged_dataframe(df, vectorized=vectorized, stats=unique_stats, pool=pool,
+                                        workers=workers, profiler=profiler, low_memory=low_memory, **llm_options)
+    if low_memory:
+        # El Excel leído ya no se usa: liberarlo antes de la deduplicación y la escritura
+        del df
+        print(f"🗜️  Contactos en memoria: {frame_memory_mb(ghl_df)} MB (category / string[pyarrow])")
+
+    # Filtrar filas que no cumplen con los requisitos mínimos de GHL
+    initial_count = len(ghl_df)
+    with profile_stage(profiler, 'filter_required', items=initial_count):
+        ghl_df = filter_required_fields(ghl_df, vectorized=vectorized)
+    filtered_count = len(ghl_df)
+    
+    if filtered_count < initial_count:
+        print(f"⚠️  Se eliminaron {initial_count - filtered_count} filas sin identificadores válidos")
+
+    # Log final con estadísticas de etiquetado
+    print_tagging_stats(len(ghl_df), count_only_country_tags(ghl_df, vectorized=vectorized),
+                        use_llm=use_llm, llm_cache=llm_cache)
+    if unique_stats is not None:
+        unique_stats.print_report()
+
+    # Si es solo validación, mostrar estadísticas y retornar
+    if validate_only:
+        print_validation_report(validation_counts(ghl_df))
+        return None
+
+    output_csv = output_csv_name(country_filter)
+
+    # Fusionar contactos duplicados
+    with profile_stage(profiler, 'dedup', items=len(ghl_df)):
+        ghl_df, dedup_stats = dedupe_contacts(ghl_df)
+    
+    # Log de limpieza de emails
+    invalid_email_count = (ghl_df['Email'] == '').sum()
+    print(f"❗ Emails descartados por formato/placeholder: {invalid_email_count}")
+    dedup_stats.print_report()
+    
     # Exportar a CSV sin índice, codificación UTF-8
-    ghl_df.to_csv(output_csv, index=False, encoding='utf-8')
+    with profile_stage(profiler, 'to_csv', items=len(ghl_df)):
+        ghl_df = prepare_for_export(ghl_df)
+        output_csv = write_export_csv(ghl_df, output_csv, sharding)
+    if profiler is not None:
+        profiler.count('contacts_written', len(ghl_df))
+        profiler.count('duplicates_merged', dedup_stats.removed)
     print(f"CSV generado: {output_csv}")
     print(f"Total de contactos procesados: {len(ghl_df)}")
     print(f"Columnas en el CSV: {list(ghl_df.columns)}")
     
+    if pusher is not None:
+        push_contacts(pusher, ghl_df, profiler)
+    
+    return output_csv
+
+def process_excel_streaming(input_excel, country_filter=None, use_llm=True, validate_only=False,
+                            llm_workers=4, llm_timeout=None, llm_cache=None, llm_batch_size=1,
+                            chunk_size=5000, vectorized=True, workers=1, sheets=None, profiler=None,
+                            pusher=None, sharding=None, tag_classifier=None, low_memory=False):
+    """
+    Procesa el Excel por bloques con memoria acotada y va añadiendo cada bloque al CSV.
+    
+    Cada bloque pasa por las mismas etapas que process_excel_to_ghl_csv. Los
+    duplicados se fusionan dentro de cada bloque y los contactos que coinciden
+    con uno ya escrito se descartan (ContactDeduplicator en modo streaming), así
+    que la memoria solo crece con el número de claves distintas.
+    
+    Args:
+        input_excel (str o list): Ruta del archivo Excel o lista de rutas
+        country_filter (str): Filtro de país opcional
+        use_llm (bool): Si usar LLM para etiquetado
+        validate_only (bool): Solo validar sin exportar archivo
+        llm_workers (int): Peticiones simultáneas al LLM (1 = serial)
+        llm_timeout (float): Timeout por petición al LLM en segundos
+        llm_cache (LLMTagCache): Caché persistente de respuestas del LLM (opcional)
+        llm_batch_size (int): Universidades por petición al LLM (1 = una por petición)
+        chunk_size (int): Número de filas por bloque
+        vectorized (bool): Limpieza, filtrado y estadísticas vectorizadas (False = apply)
+        workers (int): Procesos para la limpieza y el etiquetado de cada bloque (1 = serial)
+        sheets: Selector de hojas de parse_sheet_selector (None = primera hoja); las
+                hojas se recorren una tras otra
+        profiler (StageProfiler): Perfil por etapas de --profile; cada bloque suma
+                                  a las mismas etapas (opcional)
+        pusher (GHLPusher): Si se indica, envía a la API de GHL cada bloque escrito
+        sharding (CSVSharding): Dividir y/o comprimir el CSV de salida; los bloques se
+                                reparten en los archivos a medida que se escriben (opcional)
+        tag_classifier (TagClassifier): Clasificador local previo al LLM (opcional)
+        low_memory (bool): Columnas repetitivas como category hasta la escritura (--low-memory)
+        
+    Returns:
+        str: Nombre del archivo generado (el manifiesto de archivos con sharding)
+             o None si validate_only=True o no hay contactos
+    """
+    output_csv = output_csv_name(country_filter)
+    print(f"Procesando por bloques de {chunk_size} filas...")
+    if use_llm:
+        print("Generando etiquetas con soporte para LLM...")
+    else:
+        print("Generando etiquetas (LLM deshabilitado)...")
+    
+    deduplicator = ContactDeduplicator(streaming=True)
+    matched_rows = 0
+    removed_rows = 0
+    total_contacts = 0
+    contacts_with_only_country = 0
+    written_rows = 0
+    invalid_email_count = 0
+    counts = {'rows': 0, 'phone_empty_email_present': 0, 'email_empty_phone_present': 0,
+              'invalid_countries': set()}
+    first_chunk = True
+    unique_stats = UniqueMapStats() if vectorized else None
+    writer = sharding.writer(output_csv) if sharding is not None and not validate_only else None
+    
+    with worker_pool(workers) as pool:
+        paths = [input_excel] if isinstance(input_excel, str) else list(input_excel)
+        chunks = profile_iter(profiler, 'read_excel', iter_input_chunks(paths, sheets, chunk_size=chunk_size,
+                                                                     plan=GHL_PLAN))
+        for df in chunks:
+            if profiler is not None:
+                profiler.count('rows_read', len(df))
+            # Filtrar por país si se especifica
+            if country_filter:
+                df = filter_by_country(df, country_filter)
+                if len(df) == 0:
+                    continue
+            matched_rows += len(df)
+            
+            ghl_df = build_tagged_dataframe(df, use_llm=use_llm, llm_workers=llm_workers, llm_timeout=llm_timeout,
+                                            llm_cache=llm_cache, llm_batch_size=llm_batch_size,
+                                            vectorized=vectorized, stats=unique_stats, pool=pool, workers=workers,
+                                            profiler=profiler, tag_classifier=tag_classifier, low_memory=low_memory)
+            
+            initial_count = len(ghl_df)
+            with profile_stage(profiler, 'filter_required', items=initial_count):
+                ghl_df = filter_required_fields(ghl_df, vectorized=vectorized)
+            removed_rows += initial_count - len(ghl_df)
+            total_contacts += len(ghl_df)
+            contacts_with_only_country += count_only_country_tags(ghl_df, vectorized=vectorized)
+            
+            if validate_only:
+                chunk_counts = validation_counts(ghl_df)
+                for key in ('rows', 'phone_empty_email_present', 'email_empty_phone_present'):
+                    counts[key] += chunk_counts[key]
+                counts['invalid_countries'] |= chunk_counts['invalid_countries']
+                continue
+            
+            # Fusionar duplicados del bloque y descartar los ya escritos
+            with profile_stage(profiler, 'dedup', items=len(ghl_df)):
+                ghl_df, _ = deduplicator.dedupe(ghl_df)
+            invalid_email_count += int((ghl_df['Email'] == '').sum())
+            
+            with profile_stage(profiler, 'to_csv', items=len(ghl_df)):
+                ghl_df = prepare_for_export(ghl_df)
+                if writer is not None:
+                    writer.write(ghl_df)
+                else:
+                    append_csv_chunk(ghl_df, output_csv, first_chunk)
+            first_chunk = False
+            written_rows += len(ghl_df)
+            if pusher is not None:
+                with profile_stage(profiler, 'ghl_push', items=len(ghl_df)):
+                    pusher.push_frame(ghl_df)
+    
+    if country_filter:
+        if matched_rows == 0:
+            print(f"No se encontraron contactos para el país: {country_filter}")
+            return None
+        print(f"Filtrado por país: {country_filter}")
+        print(f"Contactos encontrados: {matched_rows}")
+    
+    if removed_rows:
+        print(f"⚠️  Se eliminaron {removed_rows} filas sin identificadores válidos")
+    print_tagging_stats(total_contacts, contacts_with_only_country, use_llm=use_llm, llm_cache=llm_cache)
+    if unique_stats is not None:
+        unique_stats.print_report()
+    
+    if validate_only:
+        print_validation_report(counts)
+        return None
+    
+    if first_chunk:
+        # Ningún bloque tuvo contactos: escribir solo los encabezados
+        empty = build_ghl_dataframe(pd.DataFrame())
+        empty['Tags'] = ''
+        if writer is not None:
+            writer.write(empty)
+        else:
+            append_csv_chunk(empty, output_csv, True)
+    if writer is not None:
+        writer.close()
+        writer.print_report()
+        output_csv = writer.manifest_path
+    
+    print(f"❗ Emails descartados por formato/placeholder: {invalid_email_count}")
+    deduplicator.stats.print_report()
+    if profiler is not None:
+        profiler.count('contacts_written', written_rows)
+        profiler.count('duplicates_merged', deduplicator.stats.removed)
+    print(f"CSV generado: {output_csv}")
+    print(f"Total de contactos procesados: {written_rows}")
+    if pusher is not None:
+        report_push(pusher, profiler)
+    
     return output_csv
 
-def list_available_countries(input_excel):
-    """Listar todos los países disponibles en el archivo"""
-    df = pd.read_excel(input_excel, sheet_name=0, dtype=str)
-    countries = df['País'].unique()
-    countries = [c for c in countries if pd.notna(c) and str(c).strip() != '']
-    countries.sort()
+def export_country_csv(country, ghl_df, sharding=None):
+    """
+    Escribe el CSV de un país ya limpio y etiquetado (usado por el modo dividido).
+    
+    Args:
+        country (str): Nombre de GHL del país (o clave del valor de País si no se reconoce)
+        ghl_df (DataFrame): Contactos de ese país con columna Tags
+        sharding (CSVSharding): Dividir y/o comprimir el CSV (opcional)
+        
+    Returns:
+        tuple: (archivo generado, contactos escritos, duplicados fusionados)
+    """
+    output_csv = output_csv_name(country)
+    ghl_df, dedup_stats = dedupe_contacts(ghl_df)
+    ghl_df = prepare_for_export(ghl_df)
+    # Los hilos escriben a la vez: el resumen de cada país lo imprime el llamador
+    output_csv = write_export_csv(ghl_df, output_csv, sharding, report=False)
+    return output_csv, len(ghl_df), dedup_stats.removed
+
+def process_excel_split_by_country(input_excel, use_llm=True, llm_workers=4, llm_timeout=None,
+                                   llm_cache=None, llm_batch_size=1, vectorized=True, split_workers=4,
+                                   workbook_cache=None, workers=1, sheets=None, read_workers=4, profiler=None,
+                                   sharding=None, tag_classifier=None, low_memory=False):
+    """
+    Genera un CSV por país leyendo el Excel una sola vez.
+    
+    La limpieza y el etiquetado (incluido el LLM) se hacen una vez sobre todo el
+    libro; después las filas se agrupan por el país resuelto (México, Mexico y MX
+    van al mismo grupo) y cada grupo se escribe en contactos_<pais>_ghl.csv en
+    paralelo. El resultado de cada archivo es el mismo que con --country para ese
+    país. Los valores de País que no se reconocen se agrupan por su clave sin
+    acentos ni mayúsculas.
+    
+    Args:
+        input_excel (str o list): Ruta del archivo Excel o lista de rutas
+        use_llm (bool): Si usar LLM para etiquetado
+        llm_workers (int): Peticiones simultáneas al LLM (1 = serial)
+        llm_timeout (float): Timeout por petición al LLM en segundos
+        llm_cache (LLMTagCache): Caché persistente de respuestas del LLM (opcional)
+        llm_batch_size (int): Universidades por petición al LLM (1 = una por petición)
+        vectorized (bool): Limpieza, filtrado y estadísticas vectorizadas (False = apply)
+        split_workers (int): Hilos que escriben los CSV por país
+        workbook_cache (WorkbookCache): Caché de hojas parseadas (opcional)
+        workers (int): Procesos para la limpieza y el etiquetado por keywords (1 = serial)
+        sheets: Selector de hojas de parse_sheet_selector (None = primera hoja)
+        read_workers (int): Procesos para leer varias hojas o archivos a la vez
+        profiler (StageProfiler): Perfil por etapas de --profile (opcional)
+        sharding (CSVSharding): Dividir y/o comprimir el CSV de cada país (opcional)
+        tag_classifier (TagClassifier): Clasificador local previo al LLM (opcional)
+        low_memory (bool): Columnas repetitivas como category hasta la escritura (--low-memory)
+        
+    Returns:
+        dict: Nombre de GHL del país -> archivo generado (el manifiesto de archivos con sharding)
+    """
+    with profile_stage(profiler, 'read_excel'):
+        df = read_workbook(input_excel, workbook_cache, sheets, read_workers)
+    if profiler is not None:
+        profiler.stages['read_excel']['items'] += len(df)
+        profiler.count('rows_read', len(df))
+    
+    unique_stats = UniqueMapStats() if vectorized else None
+    
+    if use_llm:
+        print("Generando etiquetas con soporte para LLM...")
+    else:
+        print("Generando etiquetas (LLM deshabilitado)...")
+    with worker_pool(workers) as pool:
+        ghl_df = build_tagged_dataframe(df, use_llm=use_llm, llm_workers=llm_workers, llm_timeout=llm_timeout,
+                                        llm_cache=llm_cache, llm_batch_size=llm_batch_size,
+                                        vectorized=vectorized, stats=unique_stats, pool=pool, workers=workers,
+                                        profiler=profiler, tag_classifier=tag_classifier, low_memory=low_memory)
+    
+    initial_count = len(ghl_df)
+    with profile_stage(profiler, 'filter_required', items=initial_count):
+        ghl_df = filter_required_fields(ghl_df, vectorized=vectorized)
+    if len(ghl_df) < initial_count:
+        print(f"⚠️  Se eliminaron {initial_count - len(ghl_df)} filas sin identificadores válidos")
+    
+    print_tagging_stats(len(ghl_df), count_only_country_tags(ghl_df, vectorized=vectorized),
+                        use_llm=use_llm, llm_cache=llm_cache)
+    if unique_stats is not None:
+        unique_stats.print_report()
+    
+    # Agrupar por el país resuelto de la columna Country; los valores de País que no
+    # se reconocen, por su clave (las filas conservan el índice del Excel)
+    countries = ghl_df['Country'].astype(object).where(ghl_df['Country'].notna(), '')
+    if 'País' in df.columns:
+        unresolved = map_unique(df['País'].reindex(ghl_df.index),
+                                lambda country: country_key(country) if isinstance(country, str) else '')
+        countries = countries.where(countries != '', unresolved)
+    without_country = int((countries == '').sum())
+    groups = [(country, group) for country, group in ghl_df.groupby(countries, sort=True) if country]
+    
+    print(f"\nExportando {len(groups)} países con {split_workers} hilos...")
+    # Los hilos deduplican y escriben cada país; el perfil los mide como una sola etapa
+    with profile_stage(profiler, 'split_export', items=len(ghl_df)):
+        with ThreadPoolExecutor(max_workers=max(1, split_workers)) as executor:
+            results = list(executor.map(lambda item: export_country_csv(*item, sharding=sharding), groups))
+    
+    outputs = {}
+    total_written = 0
+    for (country, _), (output_csv, written, duplicates_removed) in zip(groups, results):
+        outputs[country] = output_csv
+        total_written += written
+        duplicates_text = f" ({duplicates_removed} duplicados fusionados)" if duplicates_removed else ""
+        print(f"   {output_csv}: {written} contactos{duplicates_text}")
+    
+    if without_country:
+        print(f"⚠️  {without_country} contactos sin País no se exportaron")
+    print(f"Total de contactos procesados: {total_written}")
+    if profiler is not None:
+        profiler.count('contacts_written', total_written)
+        profiler.count('duplicates_merged', sum(result[2] for result in results))
+        profiler.count('countries', len(groups))
+    
+    return outputs
+
+def incremental_fingerprint(use_llm=True, tag_classifier=None):
+    """
+    Huella de la configuración que determina la fila GHL de cada fila del Excel.
+    
+    Si cambian las reglas de etiquetado, los prompts, el uso del LLM o el
+    clasificador local (modelo o umbral), las filas guardadas en el manifiesto
+    dejan de ser válidas.
+    
+    Args:
+        use_llm (bool): Si se usa el LLM para etiquetar
+        tag_classifier (TagClassifier): Clasificador local previo al LLM (opcional)
+        
+    Returns:
+        str: Hash hexadecimal
+    """
+    settings = {'tag_rules': TAG_RULES, 'llm_prompt': LLM_PROMPT_HASH,
+                'llm_batch_prompt': LLM_BATCH_PROMPT_HASH, 'use_llm': bool(use_llm)}
+    if tag_classifier is not None:
+        settings['classifier'] = {'model': tag_classifier.model_id, 'threshold': tag_classifier.threshold}
+    payload = json.dumps(settings, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def incremental_paths(country_filter=None):
+    """
+    Nombres del CSV delta y del manifiesto junto al CSV completo.
+    
+    Args:
+        country_filter (str): Filtro de país opcional
+        
+    Returns:
+        tuple: (CSV completo, CSV delta, base del manifiesto)
+    """
+    output_csv = output_csv_name(country_filter)
+    base = output_csv[:-len('.csv')]
+    return output_csv, f"{base}_delta.csv", f"{base}_manifest"
+
+def process_excel_incremental(input_excel, country_filter=None, use_llm=True, llm_workers=4,
+                              llm_timeout=None, llm_cache=None, llm_batch_size=1, vectorized=True,
+                              workbook_cache=None, manifest_path=None, workers=1, sheets=None,
+                              read_workers=4, profiler=None, pusher=None, sharding=None,
+                              tag_classifier=None, low_memory=False):
+    """
+    Procesa solo las filas nuevas o modificadas respecto a la ejecución anterior.
+    
+    Cada fila se identifica por institución + país (normalizados) y se compara
+    el hash de su contenido con el del manifiesto. Las filas sin cambios se
+    toman ya limpias y etiquetadas del manifiesto (sin teléfonos, etiquetado
+    ni LLM). Se escriben dos CSV: el delta con las filas nuevas o modificadas
+    para importar en GHL y el completo, idéntico al de process_excel_to_ghl_csv.
+    
+    Args:
+        input_excel (str o list): Ruta del archivo Excel o lista de rutas
+        country_filter (str): Filtro de país opcional
+        use_llm (bool): Si usar LLM para etiquetado
+        llm_workers (int): Peticiones simultáneas al LLM (1 = serial)
+        llm_timeout (float): Timeout por petición al LLM en segundos
+        llm_cache (LLMTagCache): Caché persistente de respuestas del LLM (opcional)
+        llm_batch_size (int): Universidades por petición al LLM (1 = una por petición)
+        vectorized (bool): Limpieza, filtrado y estadísticas vectorizadas (False = apply)
+        workbook_cache (WorkbookCache): Caché de hojas parseadas (opcional)
+        manifest_path (str): Base del manifiesto (por defecto junto al CSV de salida)
+        workers (int): Procesos para la limpieza y el etiquetado por keywords (1 = serial)
+        sheets: Selector de hojas de parse_sheet_selector (None = primera hoja)
+        read_workers (int): Procesos para leer varias hojas o archivos a la vez
+        profiler (StageProfiler): Perfil por etapas de --profile (opcional)
+        pusher (GHLPusher): Si se indica, envía a la API de GHL solo los contactos del delta
+        sharding (CSVSharding): Dividir y/o comprimir los dos CSV (opcional)
+        tag_classifier (TagClassifier): Clasificador local previo al LLM (opcional)
+        low_memory (bool): Columnas repetitivas como category hasta la escritura (--low-memory)
+        
+    Returns:
+        tuple: (CSV completo, CSV delta) o None si no hay contactos; con sharding,
+               los manifiestos de archivos de cada uno
+    """
+    output_csv, delta_csv, default_manifest = incremental_paths(country_filter)
+    manifest = DeltaManifest(manifest_path or default_manifest)
+    
+    with profile_stage(profiler, 'read_excel'):
+        df = read_workbook(input_excel, workbook_cache, sheets, read_workers)
+    if profiler is not None:
+        profiler.stages['read_excel']['items'] += len(df)
+        profiler.count('rows_read', len(df))
+    if country_filter:
+        df = filter_by_country(df, country_filter)
+        if len(df) == 0:
+            print(f"No se encontraron contactos para el país: {country_filter}")
+            return None
+        print(f"Filtrado por país: {country_filter}")
+        print(f"Contactos encontrados: {len(df)}")
+    
+    # Identidad estable (institución + país) y hash del contenido de cada fila
+    with profile_stage(profiler, 'row_hashes', items=len(df)):
+        names = normalize_series(df['Nombre_Universidad']) if 'Nombre_Universidad' in df.columns else pd.Series('', index=df.index)
+        countries = normalize_series(df['País']) if 'País' in df.columns else pd.Series('', index=df.index)
+        keys = row_identity_keys(names + '|' + countries)
+        hashes = row_content_hashes(df)
+    
+    fingerprint = incremental_fingerprint(use_llm, tag_classifier)
+    with profile_stage(profiler, 'manifest_load'):
+        previous = manifest.load(fingerprint, df.columns)
+    if previous is None:
+        print("📋 Sin manifiesto compatible: se procesan todas las filas")
+        previous = pd.DataFrame(columns=[HASH_COLUMN])
+    
+    previous_hashes = keys.map(previous[HASH_COLUMN])
+    changed = (previous_hashes != hashes).to_numpy()
+    new_rows = int(previous_hashes.isna().sum())
+    removed_rows = len(previous.index.difference(pd.Index(keys)))
+    print(f"📋 Filas nuevas: {new_rows}, modificadas: {int(changed.sum()) - new_rows}, "
+          f"sin cambios: {int((~changed).sum())}, eliminadas: {removed_rows}")
+    
+    unique_stats = UniqueMapStats() if vectorized else None
+    if changed.any():
+        if use_llm:
+            print("Generando etiquetas con soporte para LLM...")
+        else:
+            print("Generando etiquetas (LLM deshabilitado)...")
+        with worker_pool(workers) as pool:
+            delta_df = build_tagged_dataframe(df[changed], use_llm=use_llm, llm_workers=llm_workers,
+                                              llm_timeout=llm_timeout, llm_cache=llm_cache,
+                                              llm_batch_size=llm_batch_size, vectorized=vectorized,
+                                              stats=unique_stats, pool=pool, workers=workers,
+                                              profiler=profiler, tag_classifier=tag_classifier,
+                                              low_memory=low_memory)
+    else:
+        delta_df = build_ghl_dataframe(pd.DataFrame())
+        delta_df['Tags'] = ''
+    
+    # Filas sin cambios desde el manifiesto, en el orden del Excel
+    if changed.all():
+        unchanged_df = delta_df.iloc[:0]
+    else:
+        unchanged_df = previous.loc[keys[~changed], delta_df.columns]
+        unchanged_df.index = df.index[~changed]
+    combined = pd.concat([delta_df.astype(object), unchanged_df.astype(object)]).loc[df.index]
+    # Reconstruir las columnas como en build_ghl_dataframe (mismo dtype inferido,
+    # para que la fusión de duplicados y el CSV sean idénticos al modo normal)
+    ghl_df = pd.DataFrame({col: combined[col].to_numpy(dtype=object) for col in combined.columns},
+                          index=combined.index)
+    
+    manifest_rows = ghl_df.copy()
+    manifest_rows.insert(0, KEY_COLUMN, keys.to_numpy())
+    manifest_rows.insert(1, HASH_COLUMN, hashes.to_numpy())
+    with profile_stage(profiler, 'manifest_save', items=len(manifest_rows)):
+        manifest.save(manifest_rows, fingerprint, df.columns)
+    
+    # CSV completo: mismas etapas que process_excel_to_ghl_csv
+    initial_count = len(ghl_df)
+    with profile_stage(profiler, 'filter_required', items=initial_count):
+        ghl_df = filter_required_fields(ghl_df, vectorized=vectorized)
+    if len(ghl_df) < initial_count:
+        print(f"⚠️  Se eliminaron {initial_count - len(ghl_df)} filas sin identificadores válidos")
+    print_tagging_stats(len(ghl_df), count_only_country_tags(ghl_df, vectorized=vectorized),
+                        use_llm=use_llm, llm_cache=llm_cache)
+    if unique_stats is not None:
+        unique_stats.print_report()
+    
+    with profile_stage(profiler, 'dedup', items=len(ghl_df)):
+        ghl_df, dedup_stats = dedupe_contacts(ghl_df)
+    print(f"❗ Emails descartados por formato/placeholder: {(ghl_df['Email'] == '').sum()}")
+    dedup_stats.print_report()
+    with profile_stage(profiler, 'to_csv', items=len(ghl_df)):
+        output_csv = write_export_csv(prepare_for_export(ghl_df), output_csv, sharding)
+    
+    # CSV delta: solo filas nuevas o modificadas
+    delta_df = filter_required_fields(delta_df, vectorized=vectorized)
+    delta_df, _ = dedupe_contacts(delta_df)
+    with profile_stage(profiler, 'to_csv', items=len(delta_df)):
+        delta_csv = write_export_csv(prepare_for_export(delta_df), delta_csv, sharding)
+    if profiler is not None:
+        profiler.count('rows_reprocessed', int(changed.sum()))
+        profiler.count('contacts_written', len(ghl_df))
+        profiler.count('delta_contacts_written', len(delta_df))
+        profiler.count('duplicates_merged', dedup_stats.removed)
+    
+    print(f"CSV generado: {output_csv} ({len(ghl_df)} contactos)")
+    print(f"CSV delta generado: {delta_csv} ({len(delta_df)} contactos nuevos o modificados)")
+    
+    if pusher is not None:
+        push_contacts(pusher, delta_df, profiler)
+    
+    return output_csv, delta_csv
+
+def list_available_countries(input_excel, workbook_cache=None, sheets=None, read_workers=4):
+    """
+    Listar todos los países disponibles en el archivo.
+    
+    Con caché de libros, los conteos por país se guardan al parsear el Excel y
+    las siguientes llamadas no necesitan leerlo.
+    
+    Args:
+        input_excel (str o list): Ruta del archivo Excel o lista de rutas
+        workbook_cache (WorkbookCache): Caché de hojas parseadas (opcional)
+        sheets: Selector de hojas de parse_sheet_selector (None = primera hoja)
+        read_workers (int): Procesos para leer varias hojas o archivos a la vez
+        
+    Returns:
+        list: Países ordenados
+    """
+    single_sheet = isinstance(input_excel, str) and sheets is None
+    counts = workbook_cache.country_counts(input_excel) if workbook_cache is not None and single_sheet else None
+    if counts is None:
+        counts = country_counts(read_workbook(input_excel, workbook_cache, sheets, read_workers))
+    countries = sorted(counts)
     
     print("Países disponibles:")
     for i, country in enumerate(countries, 1):
-        count = len(df[df['País'] == country])
-        print(f"{i}. {country} ({count} contactos)")
+        print(f"{i}. {country} ({counts[country]} contactos)")
     
     return countries
 
 if __name__ == '__main__':
     import argparse
     parser = argparse.ArgumentParser(description="Convert Excel contactos a CSV formato GoHighLevel con filtrado por país, generación de columna Tags y soporte para LLM")
-    parser.add_argument('input_excel', help='Archivo Excel de origen (.xlsx)')
+    parser.add_argument('input_excel', nargs='+', help='Archivos Excel de origen (.xlsx); admite comodines como "lotes/*.xlsx"')
+    parser.add_argument('--sheet', default=None, help='Hojas a leer: "all", o nombres/índices separados por comas (por defecto: la primera)')
+    parser.add_argument('--read-workers', type=int, default=4, help='Procesos para leer varias hojas o archivos a la vez (por defecto: 4)')
     parser.add_argument('--country', '-c', help='Filtrar por país específico (opcional)')
     parser.add_argument('--list-countries', '-l', action='store_true', help='Listar países disponibles')
+    parser.add_argument('--all-countries-split', action='store_true', help='Generar un CSV por país leyendo el Excel una sola vez')
+    parser.add_argument('--incremental', action='store_true', help='Procesar solo filas nuevas o modificadas respecto al manifiesto y generar un CSV delta')
+    parser.add_argument('--manifest', default=None, help='Base del manifiesto del modo incremental (por defecto junto al CSV de salida)')
+    parser.add_argument('--split-workers', type=int, default=4, help='Hilos que escriben los CSV por país con --all-countries-split (por defecto: 4)')
     parser.add_argument('--no-llm', action='store_true', help='Deshabilitar el uso de LLM para etiquetado')
     parser.add_argument('--validate-only', action='store_true', help='Solo validar sin exportar archivo')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Procesar el Excel por bloques de N filas con memoria acotada (opcional)')
+    parser.add_argument('--workers', type=int, default=1, help='Procesos para la limpieza y el etiquetado por keywords (por defecto: 1, serial)')
+    parser.add_argument('--legacy-cleaning', action='store_true', help='Usar la limpieza fila por fila con apply en lugar de la vectorizada por valores únicos')
+    parser.add_argument('--low-memory', action='store_true', help='Guardar las columnas repetitivas (Country, Last Name, Tags...) como category y el resto como string[pyarrow] hasta la escritura')
+    parser.add_argument('--llm-workers', type=int, default=4, help='Peticiones simultáneas al LLM (1 = serial, por defecto: 4)')
+    parser.add_argument('--llm-timeout', type=float, default=None, help='Timeout por petición al LLM en segundos (opcional)')
+    parser.add_argument('--llm-batch-size', type=int, default=1, help='Universidades por petición al LLM (por defecto: 1)')
+    parser.add_argument('--llm-cache', default='llm_tags_cache.sqlite', help='Archivo SQLite de caché del LLM (por defecto: llm_tags_cache.sqlite)')
+    parser.add_argument('--no-llm-cache', action='store_true', help='Deshabilitar la caché persistente del LLM')
+    parser.add_argument('--llm-cache-ttl-days', type=float, default=None, help='Días de validez de las entradas de la caché (opcional)')
+    parser.add_argument('--llm-cache-max-entries', type=int, default=None, help='Máximo de entradas en la caché (opcional)')
+    parser.add_argument('--workbook-cache', default='.workbook_cache', help='Directorio de la caché de Excel parseados (por defecto: .workbook_cache)')
+    parser.add_argument('--no-workbook-cache', action='store_true', help='Leer siempre el Excel sin usar la caché de libros')
+    parser.add_argument('--profile', action='store_true', help='Medir tiempo, CPU, memoria y elementos por etapa y guardar un informe JSON junto al CSV')
+    parser.add_argument('--profile-memory', action='store_true', help='Con --profile, medir el pico de memoria de cada etapa con tracemalloc (más lento)')
+    parser.add_argument('--profile-cprofile', metavar='ETAPA', default=None, help='Con --profile, volcar cProfile de una etapa (p. ej. phones, keyword_tags, llm_tags) en un .prof')
+    parser.add_argument('--shard-rows', type=int, default=None, help='Dividir el CSV en archivos de como máximo N contactos (_0001.csv, _0002.csv...)')
+    parser.add_argument('--shard-size-mb', type=float, default=None, help='Dividir el CSV en archivos de como máximo N MB sin comprimir')
+    parser.add_argument('--gzip', action='store_true', help='Comprimir los CSV con gzip (.csv.gz)')
+    parser.add_argument('--tag-classifier', default=None, help='Modelo de tag_classifier.py que etiqueta antes del LLM (p. ej. tag_classifier.npz)')
+    parser.add_argument('--classifier-threshold', type=float, default=None, help='Confianza mínima del clasificador para no consultar al LLM (por defecto: la guardada con el modelo)')
+    parser.add_argument('--ghl-push', action='store_true', help='Enviar los contactos exportados a la API de GHL (upsert); usa GHL_API_KEY')
+    parser.add_argument('--ghl-location-id', default=None, help='Location de GHL para --ghl-push (por defecto: GHL_LOCATION_ID)')
+    parser.add_argument('--ghl-api-base', default=None, help='URL base de la API de GHL (por defecto: GHL_API_BASE o la API pública)')
+    parser.add_argument('--ghl-workers', type=int, default=4, help='Peticiones simultáneas a GHL con --ghl-push (por defecto: 4)')
+    parser.add_argument('--ghl-max-retries', type=int, default=5, help='Reintentos por contacto ante 429, 5xx o errores de red (por defecto: 5)')
     args = parser.parse_args()
+    if args.all_countries_split and (args.country or args.validate_only or args.chunk_size):
+        parser.error('--all-countries-split no se puede combinar con --country, --validate-only ni --chunk-size')
+    if args.incremental and (args.all_countries_split or args.validate_only or args.chunk_size):
+        parser.error('--incremental no se puede combinar con --all-countries-split, --validate-only ni --chunk-size')
+    try:
+        input_paths = expand_input_paths(args.input_excel)
+        sheets = parse_sheet_selector(args.sheet) if args.sheet else None
+        if sheets is not None:
+            sheet_tasks(input_paths, sheets)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+    input_excel = input_paths[0] if len(input_paths) == 1 else input_paths
+    pusher = None
+    if args.ghl_push:
+        if args.all_countries_split or args.validate_only or args.list_countries:
+            parser.error('--ghl-push no se puede combinar con --all-countries-split, --validate-only ni --list-countries')
+        try:
+            pusher = GHLPusher.from_env(args.ghl_location_id, args.ghl_api_base, workers=args.ghl_workers,
+                                        max_retries=args.ghl_max_retries)
+        except ValueError as e:
+            parser.error(str(e))
+    sharding = None
+    if args.shard_rows or args.shard_size_mb or args.gzip:
+        max_bytes = int(args.shard_size_mb * 1024 * 1024) if args.shard_size_mb else None
+        try:
+            sharding = CSVSharding(max_rows=args.shard_rows, max_bytes=max_bytes, compress=args.gzip)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.classifier_threshold is not None and not 0 < args.classifier_threshold <= 1:
+        parser.error('--classifier-threshold debe estar entre 0 y 1')
+    tag_classifier = None
+    if args.tag_classifier:
+        try:
+            tag_classifier = TagClassifier.load(args.tag_classifier, categories=list(TAG_RULES))
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"No se pudo cargar el clasificador: {e}")
+        if args.classifier_threshold is not None:
+            tag_classifier.threshold = args.classifier_threshold
+        print(f"🧮 Clasificador local {tag_classifier.model_id} (umbral {tag_classifier.threshold})")
+    elif args.classifier_threshold is not None:
+        parser.error('--classifier-threshold requiere --tag-classifier')
+    read_options = dict(sheets=sheets, read_workers=args.read_workers)
+    workbook_cache = None if args.no_workbook_cache else WorkbookCache(args.workbook_cache)
+    profiler = None
+    if args.profile:
+        if args.profile_memory:
+            # Importar los datos geográficos de phonenumbers con tracemalloc activo tarda minutos
+            COUNTRY_RESOLVER.warm()
+        profiler = StageProfiler(trace_memory=args.profile_memory, cprofile_stage=args.profile_cprofile)
+    elif args.profile_memory or args.profile_cprofile:
+        parser.error('--profile-memory y --profile-cprofile requieren --profile')
     
     if args.list_countries:
-        list_available_countries(args.input_excel)
+        list_available_countries(input_excel, workbook_cache, **read_options)
     else:
         # Si no se especifica país, usar todos los países
         country_filter = args.country if args.country else None
-        process_excel_to_ghl_csv(args.input_excel, country_filter, use_llm=not args.no_llm, validate_only=args.validate_only) 
\ No newline at end of file
+        llm_cache = None
+        if not args.no_llm and not args.no_llm_cache:
+            ttl_seconds = args.llm_cache_ttl_days * 86400 if args.llm_cache_ttl_days is not None else None
+            llm_cache = LLMTagCache(args.llm_cache, ttl_seconds=ttl_seconds, max_entries=args.llm_cache_max_entries)
+        try:
+            if args.all_countries_split:
+                process_excel_split_by_country(input_excel, use_llm=not args.no_llm,
+                                               llm_workers=args.llm_workers, llm_timeout=args.llm_timeout,
+                                               llm_cache=llm_cache, llm_batch_size=args.llm_batch_size,
+                                               vectorized=not args.legacy_cleaning,
+                                               split_workers=args.split_workers, workbook_cache=workbook_cache,
+                                               workers=args.workers, profiler=profiler, sharding=sharding,
+                                               tag_classifier=tag_classifier, low_memory=args.low_memory,
+                                               **read_options)
+            elif args.incremental:
+                process_excel_incremental(input_excel, country_filter, use_llm=not args.no_llm,
+                                          llm_workers=args.llm_workers, llm_timeout=args.llm_timeout,
+                                          llm_cache=llm_cache, llm_batch_size=args.llm_batch_size,
+                                          vectorized=not args.legacy_cleaning, workbook_cache=workbook_cache,
+                                          manifest_path=args.manifest, workers=args.workers, profiler=profiler,
+                                          pusher=pusher, sharding=sharding, tag_classifier=tag_classifier,
+                                          low_memory=args.low_memory, **read_options)
+            else:
+                process_excel_to_ghl_csv(input_excel, country_filter, use_llm=not args.no_llm, validate_only=args.validate_only,
+                                         llm_workers=args.llm_workers, llm_timeout=args.llm_timeout, llm_cache=llm_cache,
+                                         llm_batch_size=args.llm_batch_size, chunk_size=args.chunk_size,
+                                         vectorized=not args.legacy_cleaning, workbook_cache=workbook_cache,
+                                         workers=args.workers, profiler=profiler, pusher=pusher,
+                                         sharding=sharding, tag_classifier=tag_classifier,
+                                         low_memory=args.low_memory, **read_options)
+            if profiler is not None:
+                mode = ('split' if args.all_countries_split else 'incremental' if args.incremental
+                        else 'chunked' if args.chunk_size else 'validate' if args.validate_only else 'full')
+                report_path = profile_report_path(country_filter)
+                report = profiler.write(report_path, input=input_paths, mode=mode, country=country_filter,
+                                        options={key: value for key, value in vars(args).items()
+                                                 if key != 'input_excel'})
+                profiler.print_summary(report)
+                print(f"⏱️  Informe de perfil: {report_path}")
+        finally:
+            if llm_cache is not None:
+                llm_cache.close()
+            if pusher is not None:
+                pusher.close() 
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Resolución de nombres de país a la lista oficial de GoHighLevel.
+
+La columna País del Excel viene en español ("México", "Perú", "República
+Dominicana") y a veces con abreviaturas ("EE.UU.") o códigos ISO ("MX"),
+mientras que GHL solo acepta los nombres en inglés de GHL_VALID_COUNTRIES.
+``CountryResolver`` precalcula una sola vez un diccionario de alias (nombres
+de GHL, nombres en inglés y español de phonenumbers, códigos ISO y alias
+habituales), todos en minúsculas, sin acentos ni puntuación, y cada búsqueda
+es una consulta O(1) memorizada por valor. El resultado incluye el nombre de
+GHL y el código ISO de región, de modo que los teléfonos se interpretan con
+la misma resolución sin volver a buscar el país.
+"""
+
+import collections
+import re
+import unicodedata
+
+import phonenumbers
+
+from phone_engine import country_region_table
+
+# Lista oficial de países soportados por GoHighLevel
+GHL_VALID_COUNTRIES = {
+    "Afghanistan", "Albania", "Algeria", "Andorra", "Angola", "Antigua and Barbuda", 
+    "Argentina", "Armenia", "Australia", "Austria", "Azerbaijan", "Bahamas", "Bahrain", 
+    "Bangladesh", "Barbados", "Belarus", "Belgium", "Belize", "Benin", "Bhutan", 
+    "Bolivia", "Bosnia and Herzegovina", "Botswana", "Brazil", "Brunei", "Bulgaria", 
+    "Burkina Faso", "Burundi", "Cabo Verde", "Cambodia", "Cameroon", "Canada", 
+    "Central African Republic", "Chad", "Chile", "China", "Colombia", "Comoros", 
+    "Congo", "Costa Rica", "Croatia", "Cuba", "Cyprus", "Czech Republic", 
+    "Democratic Republic of the Congo", "Denmark", "Djibouti", "Dominica", 
+    "Dominican Republic", "East Timor", "Ecuador", "Egypt", "El Salvador", 
+    "Equatorial Guinea", "Eritrea", "Estonia", "Eswatini", "Ethiopia", "Fiji", 
+    "Finland", "France", "Gabon", "Gambia", "Georgia", "Germany", "Ghana", 
+    "Greece", "Grenada", "Guatemala", "Guinea", "Guinea-Bissau", "Guyana", 
+    "Haiti", "Honduras", "Hungary", "Iceland", "India", "Indonesia", "Iran", 
+    "Iraq", "Ireland", "Israel", "Italy", "Ivory Coast", "Jamaica", "Japan", 
+    "Jordan", "Kazakhstan", "Kenya", "Kiribati", "Kuwait", "Kyrgyzstan", 
+    "Laos", "Latvia", "Lebanon", "Lesotho", "Liberia", "Libya", "Liechtenstein", 
+    "Lithuania", "Luxembourg", "Madagascar", "Malawi", "Malaysia", "Maldives", 
+    "Mali", "Malta", "Marshall Islands", "Mauritania", "Mauritius", "Mexico", 
+    "Micronesia", "Moldova", "Monaco", "Mongolia", "Montenegro", "Morocco", 
+    "Mozambique", "Myanmar", "Namibia", "Nauru", "Nepal", "Netherlands", 
+    "New Zealand", "Nicaragua", "Niger", "Nigeria", "North Korea", "North Macedonia", 
+    "Norway", "Oman", "Pakistan", "Palau", "Palestine", "Panama", "Papua New Guinea", 
+    "Paraguay", "Peru", "Philippines", "Poland", "Portugal", "Qatar", "Romania", 
+    "Russia", "Rwanda", "Saint Kitts and Nevis", "Saint Lucia", 
+    "Saint Vincent and the Grenadines", "Samoa", "San Marino", 
+    "Sao Tome and Principe", "Saudi Arabia", "Senegal", "Serbia", "Seychelles", 
+    "Sierra Leone", "Singapore", "Slovakia", "Slovenia", "Solomon Islands", 
+    "Somalia", "South Africa", "South Korea", "South Sudan", "Spain", "Sri Lanka", 
+    "Sudan", "Suriname", "Sweden", "Switzerland", "Syria", "Taiwan", "Tajikistan", 
+    "Tanzania", "Thailand", "Togo", "Tonga", "Trinidad and Tobago", "Tunisia", 
+    "Turkey", "Turkmenistan", "Tuvalu", "Uganda", "Ukraine", "United Arab Emirates", 
+    "United Kingdom", "United States", "Uruguay", "Uzbekistan", "Vanuatu", 
+    "Vatican City", "Venezuela", "Vietnam", "Yemen", "Zambia", "Zimbabwe"
+}
+
+# Países de GHL cuyo nombre no coincide con ninguno de phonenumbers
+GHL_COUNTRY_REGIONS = {
+    "Democratic Republic of the Congo": "CD",
+    "East Timor": "TL",
+    "Eswatini": "SZ",
+    "Ivory Coast": "CI",
+    "North Macedonia": "MK",
+    "Vatican City": "VA",
+}
+
+# Alias habituales que no están en phonenumbers -> nombre de GHL
+COUNTRY_ALIASES = {
+    "EE.UU.": "United States",
+    "EEUU": "United States",
+    "USA": "United States",
+    "Estados Unidos de América": "United States",
+    "Estados Unidos de Norteamérica": "United States",
+    "UK": "United Kingdom",
+    "Inglaterra": "United Kingdom",
+    "Gran Bretaña": "United Kingdom",
+    "República Checa": "Czech Republic",
+    "Czechia": "Czech Republic",
+    "Côte d'Ivoire": "Ivory Coast",
+    "Timor-Leste": "East Timor",
+    "Swaziland": "Eswatini",
+    "Esuatini": "Eswatini",
+    "Macedonia del Norte": "North Macedonia",
+    "Birmania": "Myanmar",
+    "Myanmar (Burma)": "Myanmar",
+    "Países Bajos": "Netherlands",
+    "República del Congo": "Congo",
+    "RD Congo": "Democratic Republic of the Congo",
+    "Vaticano": "Vatican City",
+    "Santa Sede": "Vatican City",
+    "Corea": "South Korea",
+    "República de Corea": "South Korea",
+    "Micronesia (Estados Federados de)": "Micronesia",
+    "Trinidad y Tobago": "Trinidad and Tobago",
+}
+
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+ResolvedCountry = collections.namedtuple('ResolvedCountry', ['name', 'region'])
+
+UNRESOLVED = ResolvedCountry('', None)
+
+
+def country_key(text):
+    """Clave de búsqueda: minúsculas, sin acentos y con la puntuación como espacios."""
+    text = unicodedata.normalize('NFD', str(text).lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return NON_ALNUM.sub(' ', text).strip()
+
+
+class CountryResolver:
+    """Alias de país (español, inglés, ISO) -> nombre de GHL y código de región."""
+
+    def __init__(self, valid_countries, aliases=None):
+        """
+        Args:
+            valid_countries (iterable): Nombres aceptados por GHL
+            aliases (dict): Alias adicionales -> nombre de GHL (por defecto COUNTRY_ALIASES)
+        """
+        self.valid_countries = frozenset(valid_countries)
+        self.aliases = COUNTRY_ALIASES if aliases is None else aliases
+        self._index = None
+        self._memo = {}
+
+    @property
+    def index(self):
+        """Diccionario clave -> ResolvedCountry (se construye la primera vez que se usa)."""
+        return self.warm()._index
+
+    def warm(self):
+        """
+        Construye el índice si aún no existe; permite hacerlo por adelantado (p. ej.
+        antes de activar tracemalloc).
+
+        Returns:
+            CountryResolver: El propio resolvedor
+        """
+        if self._index is None:
+            self._index = self._build_index()
+        return self
+
+    def _build_index(self):
+        region_table = {country_key(alias): region for alias, region in country_region_table().items()}
+        index = {}
+        names_by_region = {}
+        for name in sorted(self.valid_countries):
+            key = country_key(name)
+            region = GHL_COUNTRY_REGIONS.get(name) or region_table.get(key)
+            index[key] = ResolvedCountry(name, region)
+            if region:
+                names_by_region.setdefault(region, name)
+        for alias, name in self.aliases.items():
+            if name in self.valid_countries:
+                index.setdefault(country_key(alias), index[country_key(name)])
+        # Nombres en inglés y español de phonenumbers; los territorios sin nombre
+        # en GHL (p. ej. Puerto Rico) conservan la región para los teléfonos
+        for alias, region in region_table.items():
+            index.setdefault(alias, ResolvedCountry(names_by_region.get(region, ''), region))
+        for region in phonenumbers.SUPPORTED_REGIONS:
+            index.setdefault(country_key(region), ResolvedCountry(names_by_region.get(region, ''), region))
+        return index
+
+    def resolve(self, country):
+        """
+        Resuelve un país escrito en español, inglés o como código ISO.
+
+        Args:
+            country (str): Valor de la columna País (p. ej. "Perú", "Dominican Republic", "MX")
+
+        Returns:
+            ResolvedCountry: (nombre de GHL o '', código de región o None)
+        """
+        resolved = self._memo.get(country) if isinstance(country, str) else UNRESOLVED
+        if resolved is None:
+            resolved = self._memo[country] = self.lookup(country)
+        return resolved
+
+    def lookup(self, country):
+        """
+        Igual que resolve pero sin memorizar el resultado (coste real de cada
+        resolución, p. ej. para estimar el ahorro de normalizar solo los únicos).
+
+        Args:
+            country (str): Valor de la columna País
+
+        Returns:
+            ResolvedCountry: (nombre de GHL o '', código de región o None)
+        """
+        if not isinstance(country, str):
+            return UNRESOLVED
+        return self.index.get(country_key(country), UNRESOLVED)
+
+
+COUNTRY_RESOLVER = CountryResolver(GHL_VALID_COUNTRIES)
+
+
+def resolve_country(country):
+    """Resuelve un país con el resolvedor de GHL_VALID_COUNTRIES (ver CountryResolver.resolve)."""
+    return COUNTRY_RESOLVER.resolve(country)
+
+
+def country_region(country):
+    """Código ISO de región de un país en cualquiera de sus alias (None si no se reconoce)."""
+    return COUNTRY_RESOLVER.resolve(country).region
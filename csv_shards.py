@@ -0,0 +1,249 @@
+"""
+Escritura de CSV en archivos parciales (shards), opcionalmente comprimidos.
+
+GHL limita el tamaño de los archivos que se pueden importar y un único CSV
+grande tarda en copiarse o subirse. ``ShardedCSVWriter`` recibe bloques de
+filas a medida que se generan y los reparte en ``<base>_0001.csv``,
+``<base>_0002.csv``... cortando por número máximo de filas y/o de bytes (cada
+archivo lleva su fila de encabezados), con gzip opcional (``.csv.gz``). Al
+cerrar escribe ``<base>_shards.json`` con las filas, bytes y SHA-256 de cada
+archivo.
+
+Las filas se serializan con ``DataFrame.to_csv``, así que la concatenación de
+los shards (sin los encabezados repetidos) es idéntica byte a byte al CSV
+único. Los límites de bytes se aplican al CSV sin comprimir, que es lo que
+GHL importa.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Filas que se serializan de una vez (acota la memoria del texto generado)
+STREAM_ROWS = 20000
+
+# Nivel de gzip: el 9 es mucho más lento y apenas reduce más un CSV
+GZIP_LEVEL = 6
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_sha256(path):
+    """SHA-256 hexadecimal del contenido de un archivo."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CSVSharding:
+    """Opciones de salida de --shard-rows, --shard-size-mb y --gzip."""
+
+    def __init__(self, max_rows=None, max_bytes=None, compress=False):
+        """
+        Args:
+            max_rows (int): Filas de datos por archivo (None = sin límite)
+            max_bytes (int): Bytes del CSV sin comprimir por archivo (None = sin límite)
+            compress (bool): Comprimir cada archivo con gzip
+        """
+        if max_rows is not None and max_rows < 1:
+            raise ValueError('El máximo de filas por archivo debe ser al menos 1')
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError('El máximo de bytes por archivo debe ser positivo')
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.compress = compress
+
+    @property
+    def sharded(self):
+        """True si la salida se divide en varios archivos."""
+        return bool(self.max_rows or self.max_bytes)
+
+    def writer(self, output_csv):
+        """Crea el escritor para el CSV indicado."""
+        return ShardedCSVWriter(output_csv, max_rows=self.max_rows, max_bytes=self.max_bytes,
+                                compress=self.compress)
+
+    def write_frame(self, df, output_csv):
+        """
+        Escribe un DataFrame completo y cierra el escritor.
+
+        Returns:
+            ShardedCSVWriter: Escritor cerrado (shards y manifiesto)
+        """
+        writer = self.writer(output_csv)
+        writer.write(df)
+        writer.close()
+        return writer
+
+
+class ShardedCSVWriter:
+    """Escritor de CSV por bloques que reparte las filas en archivos parciales."""
+
+    def __init__(self, output_csv, max_rows=None, max_bytes=None, compress=False):
+        """
+        Args:
+            output_csv (str): Nombre del CSV único equivalente (p. ej. contactos_todos_paises.csv)
+            max_rows (int): Filas de datos por archivo (None = sin límite)
+            max_bytes (int): Bytes del CSV sin comprimir por archivo, incluidos los
+                             encabezados (None = sin límite)
+            compress (bool): Comprimir cada archivo con gzip
+        """
+        self.base = output_csv[:-len('.csv')] if output_csv.endswith('.csv') else output_csv
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.manifest_path = f"{self.base}_shards.json"
+        self.shards = []
+        self.columns = None
+        self._header = None
+        self._handle = None
+        self._raw = None
+        self._current = None
+
+    @property
+    def sharded(self):
+        return bool(self.max_rows or self.max_bytes)
+
+    @property
+    def rows(self):
+        """Filas de datos escritas en todos los archivos."""
+        return sum(shard['rows'] for shard in self.shards)
+
+    def _shard_path(self, number):
+        suffix = '.csv.gz' if self.compress else '.csv'
+        if not self.sharded:
+            return self.base + suffix
+        return f"{self.base}_{number:04d}{suffix}"
+
+    def _open_shard(self):
+        path = self._shard_path(len(self.shards) + 1)
+        if self.compress:
+            # mtime=0 y sin nombre interno: el mismo contenido da el mismo .gz y el mismo checksum
+            raw = open(path, 'wb')
+            self._handle = gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=GZIP_LEVEL, mtime=0)
+            self._raw = raw
+        else:
+            self._handle = open(path, 'wb')
+            self._raw = None
+        self._current = {'file': os.path.basename(path), 'path': path, 'rows': 0,
+                         'uncompressed_bytes': 0}
+        self._write_bytes(self._header)
+
+    def _write_bytes(self, data):
+        self._handle.write(data)
+        self._current['uncompressed_bytes'] += len(data)
+
+    def _close_shard(self):
+        if self._handle is None:
+            return
+        self._handle.close()
+        if self._raw is not None:
+            self._raw.close()
+        shard = self._current
+        shard['bytes'] = os.path.getsize(shard['path'])
+        shard['sha256'] = file_sha256(shard['path'])
+        self.shards.append(shard)
+        self._handle = self._current = None
+
+    def _encode(self, df):
+        return df.to_csv(index=False, header=False).encode('utf-8')
+
+    @staticmethod
+    def _row_ends(data):
+        """
+        Posiciones (exclusivas) donde termina cada fila de un bloque CSV.
+
+        Un salto de línea cierra una fila solo si queda fuera de comillas, es
+        decir, si las comillas anteriores son pares (las comillas escapadas
+        ``""`` suman dos y no cambian la paridad).
+        """
+        raw = np.frombuffer(data, dtype=np.uint8)
+        quotes = np.cumsum(raw == ord('"'))
+        newlines = np.flatnonzero(raw == ord('\n'))
+        return newlines[quotes[newlines] % 2 == 0] + 1
+
+    def write(self, df):
+        """
+        Añade filas; el primer bloque fija las columnas y los encabezados.
+
+        Args:
+            df (DataFrame): Bloque de filas con las mismas columnas en todos los bloques
+        """
+        if self.columns is None:
+            self.columns = list(df.columns)
+            self._header = df.iloc[:0].to_csv(index=False).encode('utf-8')
+        for start in range(0, len(df), STREAM_ROWS):
+            part = df.iloc[start:start + STREAM_ROWS]
+            self._write_rows(self._encode(part), len(part))
+
+    def _write_rows(self, data, n_rows):
+        """Reparte un bloque ya serializado en shards sin volver a generar el CSV."""
+        if not self.sharded:
+            if self._handle is None:
+                self._open_shard()
+            self._write_bytes(data)
+            self._current['rows'] += n_rows
+            return
+        ends = self._row_ends(data)
+        total_rows = len(ends)
+        row, offset = 0, 0
+        while row < total_rows:
+            if self._handle is None:
+                self._open_shard()
+            current = self._current
+            last = total_rows
+            if self.max_rows:
+                last = min(last, row + self.max_rows - current['rows'])
+            if self.max_bytes:
+                room = self.max_bytes - current['uncompressed_bytes']
+                fitting = int(np.searchsorted(ends, offset + room, side='right'))
+                if fitting <= row:
+                    if current['rows']:
+                        self._close_shard()
+                        continue
+                    # Una fila más grande que el límite va sola en su archivo
+                    fitting = row + 1
+                last = min(last, fitting)
+            end = int(ends[last - 1])
+            self._write_bytes(data[offset:end])
+            current['rows'] += last - row
+            row, offset = last, end
+            if row < total_rows or (self.max_rows and current['rows'] >= self.max_rows):
+                self._close_shard()
+
+    def close(self):
+        """
+        Cierra el último archivo y escribe el manifiesto.
+
+        Sin filas se escribe un único archivo con los encabezados.
+
+        Returns:
+            dict: Manifiesto escrito
+        """
+        if self._handle is None and not self.shards and self._header is not None:
+            self._open_shard()
+        self._close_shard()
+        manifest = {
+            'columns': self.columns or [],
+            'rows': self.rows,
+            'max_rows': self.max_rows,
+            'max_bytes': self.max_bytes,
+            'compression': 'gzip' if self.compress else None,
+            'shards': [{key: value for key, value in shard.items() if key != 'path'} for shard in self.shards],
+        }
+        with open(self.manifest_path, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, ensure_ascii=False, indent=2)
+        return manifest
+
+    def print_report(self):
+        """Imprime los archivos generados."""
+        total = sum(shard['bytes'] for shard in self.shards)
+        compressed = " comprimidos" if self.compress else ""
+        print(f"📦 {len(self.shards)} archivos{compressed} ({self.rows} filas, {total / (1024 * 1024):.1f} MB): "
+              f"{self.shards[0]['file']}{' ... ' + self.shards[-1]['file'] if len(self.shards) > 1 else ''}")
+        print(f"📦 Manifiesto: {self.manifest_path}")
@@ -0,0 +1,378 @@
+"""
+Detección y fusión de contactos duplicados.
+
+Cada fila GHL se indexa por cuatro claves de bloqueo: email normalizado,
+teléfono E.164, dominio del sitio web e institución + país normalizados. Dos
+filas que comparten alguna clave pertenecen al mismo contacto y los grupos se
+cierran de forma transitiva (componentes conexos). Todo se calcula con
+``factorize`` y operaciones de numpy sobre las claves, sin comparar pares de
+filas, así que el coste crece de forma casi lineal con el número de filas.
+
+Las claves débiles (teléfono y dominio) se ignoran cuando las comparten más de
+``max_block_size`` filas: suelen ser centralitas, placeholders o portales
+compartidos y unirían instituciones distintas. Las claves vacías nunca unen
+filas, de modo que los contactos sin email ya no se colapsan en uno.
+
+Cada grupo se fusiona en la fila que aparece primero en la entrada: conserva
+sus valores, completa los campos vacíos con los de las demás filas y lleva el
+resto de emails y teléfonos distintos a ``Additional Email Addresses`` y
+``Additional Phone Numbers``. El resultado mantiene el orden de entrada.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Claves de bloqueo, en el orden en que se informan en las estadísticas
+KEY_KINDS = ('email', 'phone', 'domain', 'name')
+
+# Claves que pueden compartir instituciones distintas (se limita el tamaño del bloque)
+WEAK_KEYS = ('phone', 'domain')
+
+# Bloques de claves débiles más grandes que esto no unen filas
+DEFAULT_MAX_BLOCK_SIZE = 20
+
+# Dominios genéricos que no identifican a una institución
+GENERIC_DOMAINS = frozenset({
+    'facebook.com', 'instagram.com', 'linkedin.com', 'twitter.com', 'x.com', 'youtube.com',
+    'google.com', 'sites.google.com', 'gmail.com', 'hotmail.com', 'outlook.com', 'yahoo.com',
+    'wixsite.com', 'blogspot.com', 'wordpress.com', 'linktr.ee',
+})
+
+# Textos que necesitan la descomposición NFD para quitar las tildes
+NON_ASCII = '[^\x00-\x7f]'
+
+# Marcas diacríticas que quedan tras la descomposición NFD
+COMBINING_MARKS = '[\u0300-\u036f]'
+
+# Separador de los valores múltiples en las columnas Additional y Tags
+LIST_SEPARATOR = ', '
+
+EMAIL_COLUMNS = ('Email', 'Additional Email Addresses')
+PHONE_COLUMNS = ('Phone', 'Additional Phone Numbers')
+
+
+def _text(df, column):
+    """Columna como texto sin NaN ('' si no existe)."""
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    series = df[column]
+    return series.where(series.notna(), '').astype(str).str.strip()
+
+
+def _normalize_names(series):
+    """Minúsculas sin tildes ni puntuación, con espacios simples (vectorizado)."""
+    text = series.str.lower()
+    accented = text.str.contains(NON_ASCII, regex=True).to_numpy(dtype=bool)
+    if accented.any():
+        folded = text[accented].str.normalize('NFD').str.replace(COMBINING_MARKS, '', regex=True)
+        text = text.astype(object)
+        text[accented] = folded.to_numpy(dtype=object)
+    text = text.str.replace(r'[^0-9a-z]+', ' ', regex=True)
+    return text.str.strip()
+
+
+def website_domains(websites):
+    """
+    Extrae el dominio de cada sitio web para usarlo como clave.
+
+    Args:
+        websites (Series): Sitios web tal como aparecen en los contactos
+
+    Returns:
+        Series: Dominio sin esquema, "www." ni ruta ('' si es genérico o no válido)
+    """
+    host = websites.str.strip().str.lower()
+    host = host.str.replace(r'^[a-z][a-z0-9+.-]*://', '', regex=True)
+    host = host.str.replace(r'[/?#].*$', '', regex=True)
+    host = host.str.replace(r'^[^@]*@', '', regex=True)
+    host = host.str.replace(r':.*$', '', regex=True).str.strip('.')
+    host = host.str.replace(r'^www\.', '', regex=True)
+    invalid = ~host.str.contains('.', regex=False) | host.str.contains(' ', regex=False)
+    return host.where(~(invalid | host.isin(GENERIC_DOMAINS)), '')
+
+
+def blocking_keys(ghl_df):
+    """
+    Calcula las claves de bloqueo de cada fila.
+
+    Args:
+        ghl_df (DataFrame): Contactos con encabezados GHL
+
+    Returns:
+        dict: Tipo de clave -> Series de texto ('' = sin clave)
+    """
+    names = _normalize_names(_text(ghl_df, 'First Name'))
+    countries = _normalize_names(_text(ghl_df, 'Country'))
+    name_keys = (names + '|' + countries).where((names != '') & (countries != ''), '')
+    return {
+        'email': _text(ghl_df, 'Email').str.lower(),
+        'phone': _text(ghl_df, 'Phone'),
+        'domain': website_domains(_text(ghl_df, 'Website')),
+        'name': name_keys,
+    }
+
+
+def _block_codes(keys, max_block_size=None):
+    """
+    Códigos de bloque por fila (-1 = la fila no se une por esta clave).
+
+    Args:
+        keys (Series): Clave de cada fila
+        max_block_size (int): Tamaño máximo de bloque (None = sin límite)
+
+    Returns:
+        tuple: (código del bloque de cada fila, bloques descartados por tamaño)
+    """
+    codes, uniques = pd.factorize(keys.to_numpy(dtype=object))
+    empty = np.flatnonzero(uniques == '')
+    if len(empty):
+        codes[codes == empty[0]] = -1
+    sizes = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    oversized = sizes > max_block_size if max_block_size else np.zeros(len(sizes), dtype=bool)
+    useless = (sizes < 2) | oversized
+    valid = codes >= 0
+    codes[valid & useless[np.where(valid, codes, 0)]] = -1
+    return codes, int(oversized.sum())
+
+
+def cluster_labels(block_codes, n_rows):
+    """
+    Componentes conexos de las filas unidas por bloques compartidos.
+
+    Propaga la posición mínima de cada bloque a sus filas y comprime los
+    punteros hasta que ninguna etiqueta cambia; cada pasada es O(n).
+
+    Args:
+        block_codes (list): Arrays de códigos de bloque (uno por tipo de clave)
+        n_rows (int): Número de filas
+
+    Returns:
+        ndarray: Para cada fila, la posición de la primera fila de su grupo
+    """
+    labels = np.arange(n_rows)
+    active = [(codes >= 0, codes) for codes in block_codes if (codes >= 0).any()]
+    while active:
+        previous = labels.copy()
+        for valid, codes in active:
+            rows = np.flatnonzero(valid)
+            minimum = np.full(codes.max() + 1, n_rows)
+            np.minimum.at(minimum, codes[rows], labels[rows])
+            labels[rows] = np.minimum(labels[rows], minimum[codes[rows]])
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, previous):
+            break
+    return labels
+
+
+def _ordered_values(frame, columns, groups, order):
+    """
+    Valores distintos de varias columnas por grupo, en orden de aparición.
+
+    Args:
+        frame (DataFrame): Filas de los grupos con duplicados
+        columns (tuple): Columnas cuyos valores (separados por comas) se combinan
+        groups (ndarray): Grupo de cada fila de ``frame``
+        order (ndarray): Posición de cada fila en la entrada
+
+    Returns:
+        Series: Lista de valores por grupo
+    """
+    parts = []
+    for rank, column in enumerate(columns):
+        values = _text(frame, column).str.split(',')
+        parts.append(pd.DataFrame({'group': groups, 'order': order, 'rank': rank,
+                                   'value': values.to_numpy()}).explode('value'))
+    long = pd.concat(parts, ignore_index=True)
+    long['value'] = long['value'].where(long['value'].notna(), '').astype(str).str.strip()
+    long = long[long['value'] != '']
+    long = long.assign(folded=long['value'].str.lower())
+    long = long.sort_values(['group', 'order', 'rank'], kind='stable')
+    long = long.drop_duplicates(subset=['group', 'folded'], keep='first')
+
+    groups = long['group'].to_numpy()
+    values = long['value'].to_numpy(dtype=object)
+    bounds = np.flatnonzero(np.diff(groups)) + 1
+    starts = np.concatenate(([0], bounds)) if len(groups) else bounds
+    ends = np.concatenate((bounds, [len(groups)]))
+    return pd.Series([values[a:b].tolist() for a, b in zip(starts, ends)],
+                     index=groups[starts], dtype=object)
+
+
+def _merge_groups(ghl_df, labels, merged_mask):
+    """
+    Fusiona cada grupo con duplicados en la fila de su primera aparición.
+
+    Args:
+        ghl_df (DataFrame): Contactos con encabezados GHL
+        labels (ndarray): Grupo (primera posición) de cada fila
+        merged_mask (ndarray): Filas que pertenecen a un grupo con duplicados
+
+    Returns:
+        DataFrame: Una fila por grupo con duplicados, indexada por la posición del grupo
+    """
+    positions = np.flatnonzero(merged_mask)
+    frame = ghl_df.iloc[positions]
+    groups = labels[positions]
+    list_columns = set(EMAIL_COLUMNS + PHONE_COLUMNS + ('Tags',))
+
+    merged = {}
+    for column in ghl_df.columns:
+        if column in list_columns:
+            continue
+        values = _text(frame, column)
+        values = values.where(values != '')
+        first = values.groupby(groups, sort=False).first()
+        merged[column] = first.where(first.notna(), '')
+
+    group_index = pd.Index(pd.unique(groups))
+    for primary, additional in (EMAIL_COLUMNS, PHONE_COLUMNS):
+        if primary not in ghl_df.columns:
+            continue
+        values = _ordered_values(frame, (primary, additional), groups, positions).reindex(group_index)
+        values = values.apply(lambda items: items if isinstance(items, list) else [])
+        merged[primary] = values.str[0].fillna('')
+        if additional in ghl_df.columns:
+            merged[additional] = values.str[1:].str.join(LIST_SEPARATOR).fillna('')
+
+    if 'Tags' in ghl_df.columns:
+        tags = _ordered_values(frame, ('Tags',), groups, positions).reindex(group_index)
+        merged['Tags'] = tags.apply(lambda items: LIST_SEPARATOR.join(items) if isinstance(items, list) else '')
+
+    result = pd.DataFrame({column: merged[column].reindex(group_index) for column in ghl_df.columns
+                           if column in merged})
+    return result[[c for c in ghl_df.columns if c in result.columns]]
+
+
+class DedupStats:
+    """Resumen de una deduplicación."""
+
+    def __init__(self, max_block_size=DEFAULT_MAX_BLOCK_SIZE):
+        self.max_block_size = max_block_size
+        self.input_rows = 0
+        self.output_rows = 0
+        self.merged_groups = 0
+        self.linked_by = {kind: 0 for kind in KEY_KINDS}
+        self.skipped_blocks = 0
+
+    @property
+    def removed(self):
+        """Filas absorbidas por otra fila del mismo contacto."""
+        return self.input_rows - self.output_rows
+
+    def merge(self, other):
+        """Suma las estadísticas de otra deduplicación (p. ej. de otro bloque)."""
+        self.input_rows += other.input_rows
+        self.output_rows += other.output_rows
+        self.merged_groups += other.merged_groups
+        self.skipped_blocks += other.skipped_blocks
+        for kind in KEY_KINDS:
+            self.linked_by[kind] += other.linked_by[kind]
+
+    def print_report(self):
+        """Imprime el resumen de grupos fusionados."""
+        if not self.removed:
+            return
+        links = ", ".join(f"{kind}: {count}" for kind, count in self.linked_by.items() if count)
+        print(f"🔗 Duplicados fusionados: {self.removed} filas en {self.merged_groups} contactos ({links})")
+        if self.skipped_blocks:
+            print(f"   {self.skipped_blocks} teléfonos/dominios compartidos por más de "
+                  f"{self.max_block_size} filas no se usaron para unir")
+
+
+class ContactDeduplicator:
+    """
+    Deduplicador de contactos GHL.
+
+    ``dedupe`` procesa un DataFrame completo. Con ``streaming=True`` se puede
+    llamar una vez por bloque: solo se usan las claves fuertes (email e
+    institución + país), porque el límite de tamaño de las débiles necesita
+    conocer todas las filas; las filas cuya clave ya se devolvió en un bloque
+    anterior se descartan (ya están escritas y no se pueden fusionar) y dentro
+    de cada bloque se fusionan.
+    """
+
+    def __init__(self, max_block_size=DEFAULT_MAX_BLOCK_SIZE, streaming=False):
+        self.max_block_size = max_block_size
+        self.stats = DedupStats(max_block_size)
+        self.kinds = tuple(k for k in KEY_KINDS if k not in WEAK_KEYS) if streaming else KEY_KINDS
+        # Claves fuertes ya devueltas (solo en modo por bloques)
+        self._seen = {kind: set() for kind in self.kinds} if streaming else {}
+
+    def dedupe(self, ghl_df):
+        """
+        Fusiona los contactos duplicados conservando el orden de entrada.
+
+        Args:
+            ghl_df (DataFrame): Contactos con encabezados GHL
+
+        Returns:
+            tuple: (DataFrame sin duplicados, DedupStats de esta llamada)
+        """
+        stats = DedupStats(self.max_block_size)
+        stats.input_rows = len(ghl_df)
+        if len(ghl_df) == 0:
+            self.stats.merge(stats)
+            return ghl_df, stats
+
+        keys = blocking_keys(ghl_df)
+        keep = np.ones(len(ghl_df), dtype=bool)
+        for kind, seen in self._seen.items():
+            if seen:
+                keep &= ~(keys[kind].isin(seen).to_numpy() & (keys[kind] != '').to_numpy())
+        if not keep.all():
+            ghl_df = ghl_df[keep]
+            keys = {kind: values[keep] for kind, values in keys.items()}
+
+        block_codes = []
+        for kind in self.kinds:
+            limit = self.max_block_size if kind in WEAK_KEYS else None
+            codes, oversized = _block_codes(keys[kind], limit)
+            stats.skipped_blocks += oversized
+            block_codes.append(codes)
+        labels = cluster_labels(block_codes, len(ghl_df))
+
+        primary = labels == np.arange(len(ghl_df))
+        sizes = np.bincount(labels, minlength=len(ghl_df))
+        merged_mask = sizes[labels] > 1
+        for kind, codes in zip(self.kinds, block_codes):
+            stats.linked_by[kind] = int(((codes >= 0) & ~primary).sum())
+
+        primary_positions = np.flatnonzero(primary)
+        result = ghl_df.iloc[primary_positions].copy()
+        if merged_mask.any():
+            merged = _merge_groups(ghl_df, labels, merged_mask)
+            rows = np.searchsorted(primary_positions, merged.index.to_numpy())
+            for column in merged.columns:
+                values = result[column].to_numpy(dtype=object, copy=True)
+                values[rows] = merged[column].to_numpy(dtype=object)
+                dtype = result[column].dtype
+                if isinstance(dtype, pd.CategoricalDtype):
+                    # Los valores fusionados son nuevos: se añaden como categorías
+                    dtype = 'category'
+                result[column] = pd.Series(values, index=result.index).astype(dtype)
+            stats.merged_groups = len(merged)
+
+        for kind, seen in self._seen.items():
+            seen.update(keys[kind][keys[kind] != ''])
+        stats.output_rows = len(result)
+        stats.input_rows = int(keep.size)
+        self.stats.merge(stats)
+        return result, stats
+
+
+def dedupe_contacts(ghl_df, max_block_size=DEFAULT_MAX_BLOCK_SIZE):
+    """
+    Fusiona los contactos duplicados de un DataFrame completo.
+
+    Args:
+        ghl_df (DataFrame): Contactos con encabezados GHL
+        max_block_size (int): Máximo de filas que pueden compartir un teléfono o dominio
+
+    Returns:
+        tuple: (DataFrame sin duplicados en el orden de entrada, DedupStats)
+    """
+    return ContactDeduplicator(max_block_size).dedupe(ghl_df)
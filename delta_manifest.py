@@ -0,0 +1,111 @@
+"""
+Manifiesto del modo incremental.
+
+Guarda, para cada fila del Excel procesado, una clave de identidad estable
+(institución + país), el hash del contenido de la fila original y la fila GHL
+ya limpia y etiquetada. En la siguiente versión del Excel solo las filas
+nuevas o con otro hash pasan por la limpieza, los teléfonos y el etiquetado;
+el resto se toma del manifiesto.
+
+El manifiesto son dos archivos: ``<base>.parquet`` con las filas y
+``<base>.json`` con la huella de la configuración (reglas de etiquetado,
+prompts, uso del LLM) y las columnas del Excel. Si alguna cambia, el
+manifiesto se ignora y se reprocesa todo.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+# Versión del formato del manifiesto; cambiarla invalida los anteriores
+MANIFEST_VERSION = 1
+
+KEY_COLUMN = '_row_key'
+HASH_COLUMN = '_row_hash'
+
+
+def row_identity_keys(base_keys):
+    """
+    Hace únicas las claves de identidad numerando las repeticiones.
+
+    Args:
+        base_keys (Series): Clave normalizada por fila (p. ej. "universidad x|honduras")
+
+    Returns:
+        Series: Clave única por fila; la n-ésima repetición lleva el sufijo "#n"
+    """
+    occurrence = base_keys.groupby(base_keys, sort=False).cumcount()
+    suffix = ('#' + occurrence.astype(str)).where(occurrence > 0, '')
+    return base_keys.astype(str) + suffix
+
+
+def row_content_hashes(df):
+    """
+    Hash de 64 bits del contenido de cada fila (independiente del índice).
+
+    Args:
+        df (DataFrame): Filas originales del Excel
+
+    Returns:
+        Series: Hash por fila como texto decimal (se compara sin pérdidas aunque falten filas)
+    """
+    return pd.util.hash_pandas_object(df.astype(object), index=False).astype(str)
+
+
+class DeltaManifest:
+    """Filas GHL procesadas de la última ejecución, indexadas por clave de identidad."""
+
+    def __init__(self, path):
+        base = path[:-len('.parquet')] if path.endswith('.parquet') else path
+        self.data_path = base + '.parquet'
+        self.meta_path = base + '.json'
+
+    def load(self, fingerprint, source_columns):
+        """
+        Carga las filas del manifiesto si es compatible con la ejecución actual.
+
+        Args:
+            fingerprint (str): Huella de la configuración de limpieza y etiquetado
+            source_columns (list): Columnas del Excel actual
+
+        Returns:
+            DataFrame: Filas indexadas por clave (con la columna de hash) o None
+        """
+        try:
+            with open(self.meta_path, encoding='utf-8') as handle:
+                meta = json.load(handle)
+            if (meta.get('version') != MANIFEST_VERSION or meta.get('fingerprint') != fingerprint
+                    or meta.get('source_columns') != list(source_columns)):
+                return None
+            rows = pd.read_parquet(self.data_path)
+        except (OSError, ValueError):
+            return None
+        return rows.set_index(KEY_COLUMN)
+
+    def save(self, rows, fingerprint, source_columns):
+        """
+        Sustituye el manifiesto por las filas procesadas de esta ejecución.
+
+        Args:
+            rows (DataFrame): Filas GHL con las columnas de clave y hash
+            fingerprint (str): Huella de la configuración de limpieza y etiquetado
+            source_columns (list): Columnas del Excel actual
+        """
+        directory = os.path.dirname(self.data_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.data_path + '.tmp'
+        rows.reset_index(drop=True).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.data_path)
+
+        meta = {
+            'version': MANIFEST_VERSION,
+            'fingerprint': fingerprint,
+            'source_columns': [str(c) for c in source_columns],
+            'rows': len(rows),
+        }
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(meta, handle, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
@@ -0,0 +1,122 @@
+"""
+Lectura de Excel por bloques y escritura incremental de CSV.
+
+Usa el iterador de solo lectura de openpyxl para que la memoria dependa del
+tamaño del bloque y no del número total de filas del libro.
+"""
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+# Valores que pandas.read_excel interpreta como vacíos por defecto
+EXCEL_NA_VALUES = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+
+
+def excel_cell_to_str(value):
+    """
+    Convierte el valor de una celda como lo hace ``pd.read_excel(dtype=str)``.
+
+    Args:
+        value: Valor devuelto por openpyxl
+
+    Returns:
+        str: Texto de la celda o NaN si está vacía
+    """
+    if value is None:
+        return np.nan
+    # Los números enteros guardados como float se leen sin el sufijo '.0'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value)
+    if text in EXCEL_NA_VALUES:
+        return np.nan
+    return text
+
+
+def read_excel_header(input_excel, sheet_index=0):
+    """
+    Lee solo la fila de encabezados de una hoja.
+
+    Args:
+        input_excel (str): Ruta del archivo Excel
+        sheet_index (int): Índice de la hoja
+
+    Returns:
+        list: Nombres de las columnas
+    """
+    workbook = load_workbook(input_excel, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_index]
+        header = next(sheet.iter_rows(values_only=True), None) or ()
+        return [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+    finally:
+        workbook.close()
+
+
+def iter_excel_chunks(input_excel, chunk_size=5000, sheet_index=0, usecols=None):
+    """
+    Recorre una hoja de Excel en bloques de filas.
+
+    Args:
+        input_excel (str): Ruta del archivo Excel
+        chunk_size (int): Número de filas por bloque
+        sheet_index (int): Índice de la hoja
+        usecols (list): Solo estas columnas, en el orden de la hoja (None = todas)
+
+    Yields:
+        DataFrame: Bloque de filas con valores de texto (NaN para celdas vacías);
+        el índice es la posición de la fila en la hoja, continuo entre bloques
+    """
+    workbook = load_workbook(input_excel, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_index]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+        width = len(columns)
+        # Posiciones de las columnas pedidas; las demás celdas no se convierten
+        positions = None
+        if usecols is not None:
+            wanted = set(usecols)
+            positions = [i for i, column in enumerate(columns) if column in wanted]
+            columns = [columns[i] for i in positions]
+
+        buffer = []
+        offset = 0
+        for row in rows:
+            # Las filas completamente vacías no aportan contactos
+            if all(value is None for value in row):
+                continue
+            if positions is not None:
+                values = [excel_cell_to_str(row[i]) if i < len(row) else np.nan for i in positions]
+            else:
+                values = [excel_cell_to_str(value) for value in row[:width]]
+                values.extend([np.nan] * (width - len(values)))
+            buffer.append(values)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=columns, index=range(offset, offset + len(buffer)), dtype=object)
+                offset += len(buffer)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns, index=range(offset, offset + len(buffer)), dtype=object)
+    finally:
+        workbook.close()
+
+
+def append_csv_chunk(df, output_csv, first_chunk):
+    """
+    Escribe un bloque en el CSV; el primero crea el archivo con encabezados.
+
+    Args:
+        df (DataFrame): Bloque a escribir
+        output_csv (str): Ruta del CSV de salida
+        first_chunk (bool): Si es el primer bloque (sobrescribe y escribe encabezados)
+    """
+    df.to_csv(output_csv, mode='w' if first_chunk else 'a', header=first_chunk,
+              index=False, encoding='utf-8')
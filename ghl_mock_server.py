@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita el endpoint de upsert de contactos de GoHighLevel.
+
+Implementa ``POST /contacts/upsert`` con las comprobaciones básicas de la API
+real (token Bearer, cabecera Version y locationId), guarda los contactos en
+memoria (uno por email o teléfono, como el upsert de GHL) y simula el límite
+de peticiones por ventana con las cabeceras ``X-RateLimit-*`` y respuestas
+429, además de latencia y errores 500 aleatorios. Uso:
+
+    python ghl_mock_server.py --port 8790 --rate-limit 100 --rate-window 10
+    export GHL_API_KEY=mock GHL_LOCATION_ID=loc123 GHL_API_BASE=http://127.0.0.1:8790
+    python contactos_pais.py BD_LATAM.xlsx --no-llm --ghl-push
+"""
+
+import argparse
+import collections
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ghl_push import GHL_API_VERSION, UPSERT_PATH
+
+
+class MockGHLState:
+    """Contactos guardados, configuración y contadores compartidos por los hilos."""
+
+    def __init__(self, api_key='mock', location_id='loc123', latency=0.0, error_rate=0.0,
+                 rate_limit=None, rate_window=10.0, seed=None):
+        self.api_key = api_key
+        self.location_id = location_id
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.contacts = {}
+        self.requests = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._window = collections.deque()
+        self._keys = {}
+
+    def rate_headers(self, now):
+        """Cabeceras X-RateLimit-* de la ventana actual (llamar con el lock tomado)."""
+        if not self.rate_limit:
+            return {}
+        while self._window and now - self._window[0] >= self.rate_window:
+            self._window.popleft()
+        return {'X-RateLimit-Max': str(self.rate_limit),
+                'X-RateLimit-Remaining': str(max(0, self.rate_limit - len(self._window))),
+                'X-RateLimit-Interval-Milliseconds': str(int(self.rate_window * 1000))}
+
+    def admit(self):
+        """
+        Decide el resultado de una petición nueva.
+
+        Returns:
+            tuple: (código HTTP o None si se acepta, cabeceras de límite)
+        """
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            headers = self.rate_headers(now)
+            if self.rate_limit and len(self._window) >= self.rate_limit:
+                self.rate_limited += 1
+                retry_after = self.rate_window - (now - self._window[0])
+                return 429, {**headers, 'Retry-After': f"{max(retry_after, 0.001):.3f}"}
+            if self.rate_limit:
+                self._window.append(now)
+                headers = self.rate_headers(now)
+            if self._rng.random() < self.error_rate:
+                self.errors += 1
+                return 500, headers
+            return None, headers
+
+    def upsert(self, payload):
+        """
+        Crea o actualiza un contacto buscando por email y después por teléfono.
+
+        Returns:
+            tuple: (contacto guardado, True si es nuevo)
+        """
+        email = (payload.get('email') or '').lower()
+        phone = payload.get('phone') or ''
+        lookup = [key for key in (f"email:{email}" if email else None, f"phone:{phone}" if phone else None) if key]
+        with self.lock:
+            contact_id = next((self._keys[key] for key in lookup if key in self._keys), None)
+            is_new = contact_id is None
+            if is_new:
+                contact_id = uuid.uuid4().hex[:20]
+                self.contacts[contact_id] = {'id': contact_id}
+                self.created += 1
+            else:
+                self.updated += 1
+            contact = self.contacts[contact_id]
+            contact.update({key: value for key, value in payload.items() if key != 'tags'})
+            contact['tags'] = sorted(set(contact.get('tags', [])) | set(payload.get('tags', [])))
+            for key in lookup:
+                self._keys[key] = contact_id
+            return dict(contact), is_new
+
+
+def make_handler(state):
+    """Crea la clase manejadora HTTP ligada al estado dado."""
+
+    class ContactsHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 para mantener la conexión abierta entre peticiones (keep-alive)
+        protocol_version = 'HTTP/1.1'
+        # Cabeceras y cuerpo van en escrituras distintas: sin esto Nagle retrasa cada respuesta
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            raw = self.rfile.read(length)
+            if self.path.rstrip('/') != UPSERT_PATH:
+                self._send_json(404, {'message': 'Not found'})
+                return
+            if self.headers.get('Authorization') != f'Bearer {state.api_key}':
+                self._send_json(401, {'message': 'Invalid JWT'})
+                return
+            if self.headers.get('Version') != GHL_API_VERSION:
+                self._send_json(400, {'message': 'Version header was not found'})
+                return
+
+            status, headers = state.admit()
+            if status == 429:
+                self._send_json(429, {'message': 'Too many requests'}, headers)
+                return
+            if state.latency:
+                time.sleep(state.latency)
+            if status == 500:
+                self._send_json(500, {'message': 'Internal server error'}, headers)
+                return
+
+            try:
+                payload = json.loads(raw or b'{}')
+            except ValueError:
+                self._send_json(400, {'message': 'Invalid JSON'}, headers)
+                return
+            if payload.get('locationId') != state.location_id:
+                self._send_json(403, {'message': 'The token does not have access to this location'}, headers)
+                return
+            if not payload.get('email') and not payload.get('phone'):
+                self._send_json(422, {'message': 'email or phone is required'}, headers)
+                return
+            contact, is_new = state.upsert(payload)
+            self._send_json(201 if is_new else 200, {'new': is_new, 'contact': contact}, headers)
+
+    return ContactsHandler
+
+
+def start_mock_server(host='127.0.0.1', port=0, **options):
+    """
+    Arranca el servidor en un hilo de fondo.
+
+    Args:
+        host (str): Dirección de escucha
+        port (int): Puerto (0 = puerto libre aleatorio)
+        **options: Argumentos de MockGHLState (api_key, location_id, latency,
+                   error_rate, rate_limit, rate_window, seed)
+
+    Returns:
+        tuple: (servidor, estado, base_url)
+    """
+    state = MockGHLState(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, state, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Servidor local que imita el upsert de contactos de GoHighLevel")
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección de escucha')
+    parser.add_argument('--port', type=int, default=8790, help='Puerto de escucha')
+    parser.add_argument('--api-key', default='mock', help='Token aceptado')
+    parser.add_argument('--location-id', default='loc123', help='Location aceptada')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latencia por petición en segundos')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de peticiones con error 500')
+    parser.add_argument('--rate-limit', type=int, default=None, help='Peticiones permitidas por ventana (GHL: 100)')
+    parser.add_argument('--rate-window', type=float, default=10.0, help='Duración de la ventana en segundos')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla de los errores aleatorios')
+    args = parser.parse_args()
+
+    server, state, base_url = start_mock_server(args.host, args.port, api_key=args.api_key,
+                                                location_id=args.location_id, latency=args.latency,
+                                                error_rate=args.error_rate, rate_limit=args.rate_limit,
+                                                rate_window=args.rate_window, seed=args.seed)
+    print(f"🏢 Mock de GHL escuchando en {base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"📊 Peticiones: {state.requests} | Nuevos: {state.created} | Actualizados: {state.updated} | "
+              f"429: {state.rate_limited} | 500: {state.errors} | Conexiones: {state.connections}")
+        server.shutdown()
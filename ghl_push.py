@@ -0,0 +1,353 @@
+"""
+Envío directo de contactos a la API de GoHighLevel (--ghl-push).
+
+Después de escribir el CSV, los contactos del DataFrame final se envían uno a
+uno al endpoint de upsert de contactos (``POST /contacts/upsert``), que crea
+el contacto o actualiza el existente con el mismo email o teléfono. Al ser un
+upsert, reenviar un contacto no crea duplicados, así que los reintentos son
+seguros.
+
+- Las conexiones HTTP se reutilizan (keep-alive) desde un pool compartido por
+  los hilos, sin abrir una conexión TLS por contacto.
+- Varios hilos envían a la vez, con un número acotado de contactos en vuelo:
+  las filas se recorren directamente del DataFrame sin construir todos los
+  payloads ni volver a leer el CSV.
+- Los 429 respetan ``Retry-After`` y las cabeceras ``X-RateLimit-*`` de GHL
+  (todos los hilos esperan cuando se agota la ventana); los 5xx y los errores
+  de conexión se reintentan con espera exponencial y jitter. Los demás 4xx no
+  se reintentan.
+
+Solo usa la biblioteca estándar (http.client). Para probar sin la API real
+ver ghl_mock_server.py.
+"""
+
+import http.client
+import json
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from country_resolver import country_region
+
+GHL_API_BASE = 'https://services.leadconnectorhq.com'
+GHL_API_VERSION = '2021-07-28'
+UPSERT_PATH = '/contacts/upsert'
+
+# Códigos que se reintentan (además de los errores de conexión)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Fallos guardados con detalle para el informe
+MAX_FAILURE_DETAILS = 20
+
+LIST_SEPARATOR = ','
+
+
+def _split_list(value):
+    """Separa una celda 'a, b, c' en lista sin vacíos."""
+    return [item.strip() for item in str(value or '').split(LIST_SEPARATOR) if item.strip()]
+
+
+def contact_payload(row, location_id):
+    """
+    Convierte una fila GHL (encabezados del CSV) en el cuerpo de un upsert.
+
+    Args:
+        row (dict): Fila con las columnas de build_ghl_dataframe y Tags
+        location_id (str): Subcuenta (location) de GHL
+
+    Returns:
+        dict: Cuerpo JSON; los campos vacíos se omiten
+    """
+    fields = {
+        'firstName': row.get('First Name'),
+        'lastName': row.get('Last Name'),
+        'email': row.get('Email'),
+        'phone': row.get('Phone'),
+        'address1': row.get('Address'),
+        'website': row.get('Website'),
+        'country': country_region(row.get('Country')),
+    }
+    payload = {'locationId': location_id}
+    payload.update({key: value for key, value in fields.items() if isinstance(value, str) and value})
+    for key, column in (('tags', 'Tags'), ('additionalEmails', 'Additional Email Addresses'),
+                        ('additionalPhones', 'Additional Phone Numbers')):
+        values = _split_list(row.get(column))
+        if values:
+            payload[key] = values
+    return payload
+
+
+class GHLConnectionPool:
+    """Pool de conexiones HTTP keep-alive a un mismo host, compartido por varios hilos."""
+
+    def __init__(self, base_url, size=4, timeout=30):
+        """
+        Args:
+            base_url (str): URL base de la API (http o https)
+            size (int): Conexiones que se conservan abiertas
+            timeout (float): Timeout de conexión y lectura en segundos
+        """
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        with self._lock:
+            self.opened += 1
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body, headers):
+        """
+        Envía una petición por una conexión del pool.
+
+        Una conexión reutilizada que el servidor ya cerró se reabre una vez;
+        cualquier otro error de red se propaga para que lo reintente el llamador.
+
+        Returns:
+            tuple: (código HTTP, cabeceras, cuerpo en bytes)
+        """
+        try:
+            connection, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self._connect(), False
+        while True:
+            try:
+                connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = self._connect(), False
+            except Exception:
+                connection.close()
+                raise
+        if response.will_close:
+            connection.close()
+        else:
+            try:
+                self._idle.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+        return response.status, response.headers, data
+
+    def close(self):
+        """Cierra las conexiones inactivas."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class PushStats:
+    """Resumen de un envío a GHL."""
+
+    def __init__(self):
+        self.sent = 0
+        self.skipped = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = []
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, **counts):
+        """Suma contadores desde varios hilos."""
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def add_failure(self, payload, status, message):
+        """Cuenta un contacto que no se pudo enviar y guarda los primeros detalles."""
+        with self._lock:
+            self.failed += 1
+            if len(self.failures) < MAX_FAILURE_DETAILS:
+                self.failures.append({'email': payload.get('email', ''), 'phone': payload.get('phone', ''),
+                                      'status': status, 'message': message})
+
+    def print_report(self):
+        """Imprime el resumen del envío."""
+        rate = f", {self.sent / self.elapsed:.1f} contactos/s" if self.elapsed else ""
+        print(f"📤 GHL: {self.sent} contactos enviados ({self.created} nuevos, {self.updated} actualizados) "
+              f"en {self.elapsed:.1f}s{rate}")
+        if self.skipped:
+            print(f"   {self.skipped} contactos sin email ni teléfono no se enviaron (el upsert no puede identificarlos)")
+        if self.retries or self.rate_limited:
+            print(f"   Reintentos: {self.retries} ({self.rate_limited} por límite de peticiones)")
+        if self.failed:
+            print(f"   ❌ {self.failed} contactos no se pudieron enviar")
+            for failure in self.failures[:5]:
+                print(f"      {failure['email'] or failure['phone']}: {failure['status']} {failure['message']}")
+
+
+class GHLPusher:
+    """Envía contactos a GHL con upserts concurrentes sobre conexiones reutilizadas."""
+
+    def __init__(self, api_key, location_id, base_url=GHL_API_BASE, workers=4, max_retries=5,
+                 backoff=0.5, max_backoff=30.0, timeout=30):
+        """
+        Args:
+            api_key (str): Token de la API (Private Integration o OAuth)
+            location_id (str): Subcuenta (location) de GHL
+            base_url (str): URL base de la API
+            workers (int): Peticiones simultáneas
+            max_retries (int): Reintentos por contacto ante 429, 5xx o errores de red
+            backoff (float): Espera inicial entre reintentos en segundos (se duplica)
+            max_backoff (float): Espera máxima entre reintentos
+            timeout (float): Timeout por petición en segundos
+        """
+        self.location_id = location_id
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool = GHLConnectionPool(base_url, size=self.workers, timeout=timeout)
+        self.headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Version': GHL_API_VERSION,
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+        }
+        self.stats = PushStats()
+        self._pause_until = 0.0
+        self._pause_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, location_id=None, base_url=None, **kwargs):
+        """
+        Crea el cliente con GHL_API_KEY, GHL_LOCATION_ID y GHL_API_BASE.
+
+        Raises:
+            ValueError: Si falta la API key o la location
+        """
+        api_key = os.environ.get('GHL_API_KEY')
+        location_id = location_id or os.environ.get('GHL_LOCATION_ID')
+        if not api_key:
+            raise ValueError('GHL_API_KEY no está configurada')
+        if not location_id:
+            raise ValueError('Falta la location de GHL (--ghl-location-id o GHL_LOCATION_ID)')
+        return cls(api_key, location_id, base_url=base_url or os.environ.get('GHL_API_BASE') or GHL_API_BASE,
+                   **kwargs)
+
+    def _pause(self, seconds):
+        """Hace esperar a todos los hilos hasta que pase la ventana del límite."""
+        with self._pause_lock:
+            self._pause_until = max(self._pause_until, time.monotonic() + seconds)
+
+    def _wait_for_window(self):
+        delay = self._pause_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _retry_delay(self, attempt, headers=None):
+        """Espera antes del reintento: Retry-After si existe, si no exponencial con jitter."""
+        if headers is not None:
+            retry_after = headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+            interval = headers.get('X-RateLimit-Interval-Milliseconds')
+            if interval and headers.get('X-RateLimit-Remaining') == '0':
+                return int(interval) / 1000
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def upsert(self, payload):
+        """
+        Envía un contacto con reintentos.
+
+        Args:
+            payload (dict): Resultado de contact_payload
+
+        Returns:
+            bool: True si GHL aceptó el contacto
+        """
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        status, message = None, ''
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_window()
+            headers = None
+            try:
+                status, headers, data = self.pool.request('POST', UPSERT_PATH, body, self.headers)
+            except (OSError, http.client.HTTPException) as e:
+                status, message = None, str(e) or type(e).__name__
+            else:
+                if 200 <= status < 300:
+                    try:
+                        created = bool(json.loads(data or b'{}').get('new'))
+                    except ValueError:
+                        created = False
+                    self.stats.record(sent=1, created=int(created), updated=int(not created))
+                    if headers.get('X-RateLimit-Remaining') == '0':
+                        self._pause(self._retry_delay(attempt, headers))
+                    return True
+                message = data[:200].decode('utf-8', 'replace')
+                if status not in RETRY_STATUSES:
+                    break
+            if attempt == self.max_retries:
+                break
+            delay = self._retry_delay(attempt, headers)
+            if status == 429:
+                self.stats.record(rate_limited=1)
+                self._pause(delay)
+            else:
+                time.sleep(delay)
+            self.stats.record(retries=1)
+        self.stats.add_failure(payload, status, message)
+        return False
+
+    def push_frame(self, ghl_df):
+        """
+        Envía todas las filas de un DataFrame de contactos GHL.
+
+        Las filas se convierten a payload a medida que hay hueco en el pool de
+        hilos (como máximo 4 contactos en vuelo por hilo).
+
+        Args:
+            ghl_df (DataFrame): Contactos con encabezados GHL y columna Tags
+
+        Returns:
+            PushStats: Estadísticas acumuladas del cliente
+        """
+        start = time.perf_counter()
+        columns = list(ghl_df.columns)
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for values in ghl_df.itertuples(index=False, name=None):
+                if len(in_flight) >= self.workers * 4:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                payload = contact_payload(dict(zip(columns, values)), self.location_id)
+                if 'email' not in payload and 'phone' not in payload:
+                    # Sin clave de upsert cada reintento o reenvío crearía un contacto nuevo
+                    self.stats.record(skipped=1)
+                    continue
+                in_flight.add(executor.submit(self.upsert, payload))
+            for future in wait(in_flight).done:
+                future.result()
+        self.stats.elapsed += time.perf_counter() - start
+        return self.stats
+
+    def close(self):
+        """Cierra las conexiones abiertas."""
+        self.pool.close()
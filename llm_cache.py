@@ -0,0 +1,131 @@
+"""
+Caché persistente en SQLite para las etiquetas asignadas por el LLM.
+
+Cada entrada se identifica por el texto de carreras normalizado, el país
+normalizado, el modelo y un hash del prompt; si cambia el prompt o el modelo
+las entradas anteriores dejan de coincidir automáticamente.
+"""
+
+import sqlite3
+import time
+
+
+class LLMTagCache:
+    """Caché de etiquetas del LLM con expiración por TTL y límite de entradas."""
+
+    def __init__(self, path, ttl_seconds=None, max_entries=None):
+        """
+        Args:
+            path (str): Ruta del archivo SQLite (':memory:' para una caché temporal)
+            ttl_seconds (float): Antigüedad máxima de una entrada (None = sin expiración)
+            max_entries (int): Número máximo de entradas; se eliminan las menos usadas
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_tags (
+                carreras TEXT NOT NULL,
+                country TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (carreras, country, model, prompt_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_tags_accessed ON llm_tags (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, carreras, country, model, prompt_hash):
+        """
+        Busca una etiqueta en la caché.
+
+        Args:
+            prompt_hash (str o tuple): Hash del prompt, o varios en orden de preferencia
+                                       (se usa la primera entrada vigente)
+
+        Returns:
+            str: Etiqueta guardada ('' si el LLM no asignó ninguna) o None si no existe
+        """
+        now = time.time()
+        for candidate in ((prompt_hash,) if isinstance(prompt_hash, str) else prompt_hash):
+            row = self._conn.execute(
+                "SELECT tag, created_at FROM llm_tags WHERE carreras = ? AND country = ? AND model = ? AND prompt_hash = ?",
+                (carreras, country, model, candidate),
+            ).fetchone()
+            if row is not None and (self.ttl_seconds is None or now - row[1] <= self.ttl_seconds):
+                prompt_hash = candidate
+                break
+        else:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._conn.execute(
+            "UPDATE llm_tags SET accessed_at = ? WHERE carreras = ? AND country = ? AND model = ? AND prompt_hash = ?",
+            (now, carreras, country, model, prompt_hash),
+        )
+        return row[0]
+
+    def set(self, carreras, country, model, prompt_hash, tag):
+        """Guarda la etiqueta asignada por el LLM ('' también se guarda)."""
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_tags VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (carreras, country, model, prompt_hash, tag, now, now),
+        )
+
+    def answers(self, model=None):
+        """
+        Respuestas guardadas (sin contar como aciertos ni cambiar su uso).
+
+        Args:
+            model (str): Solo las de este modelo (None = todas)
+
+        Returns:
+            iterator: Pares (carreras normalizadas, etiqueta) sin repetir carreras
+        """
+        query = "SELECT carreras, tag FROM llm_tags"
+        params = ()
+        if model is not None:
+            query += " WHERE model = ?"
+            params = (model,)
+        if self.ttl_seconds is not None:
+            query += " AND" if params else " WHERE"
+            query += " created_at >= ?"
+            params += (time.time() - self.ttl_seconds,)
+        seen = set()
+        for carreras, tag in self._conn.execute(query + " ORDER BY accessed_at DESC", params):
+            if carreras not in seen:
+                seen.add(carreras)
+                yield carreras, tag
+
+    def evict(self):
+        """Elimina entradas expiradas y las menos usadas si se supera max_entries."""
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM llm_tags WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM llm_tags WHERE rowid NOT IN "
+                "(SELECT rowid FROM llm_tags ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+        self._conn.commit()
+
+    def commit(self):
+        """Aplica la política de expiración y persiste los cambios."""
+        self.evict()
+
+    def close(self):
+        """Persiste los cambios y cierra la conexión."""
+        self.commit()
+        self._conn.close()
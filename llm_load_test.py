@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga del etiquetado con LLM contra el servidor stub local.
+
+Genera filas sintéticas (synthetic_workbook) y las etiqueta a través del stub
+con latencia, errores y límites de peticiones configurables, usando el mismo
+camino que el proceso real:
+
+- ``generate``: generate_tags fila por fila (query_openai_for_tags para las
+  filas que solo tienen la etiqueta de país), con varios hilos.
+- ``apply``: apply_llm_tags sobre el DataFrame (textos únicos, peticiones
+  simultáneas y lotes opcionales), como contactos_pais.py.
+
+Informa del rendimiento (filas y peticiones por segundo), la latencia de cola
+vista por el cliente (incluye los reintentos del cliente de OpenAI), los
+errores del servidor y las filas que quedan solo con la etiqueta de país.
+
+Uso:
+    python llm_load_test.py --rows 2000 --workers 16 --latency lognormal:0.2,0.5
+    python llm_load_test.py --mode apply --batch-size 10 --error-rate 0.05 --rate-limit-rps 30
+    python llm_load_test.py --base-url http://127.0.0.1:8765/v1   # stub ya arrancado
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import contactos_pais
+from contactos_pais import apply_llm_tags, generate_tags, needs_llm_tag
+from llm_stub_server import load_answers, parse_latency, start_stub_server
+from stage_profiler import StageProfiler
+from synthetic_workbook import build_university_frame
+
+def build_rows(n_rows, seed=7):
+    """
+    Filas (carreras, país) con la mezcla de idiomas del generador sintético.
+
+    Returns:
+        DataFrame: Columnas Carreras, Country y Tags (sin LLM)
+    """
+    frame = build_university_frame(n_rows, seed=seed)
+    rows = frame[['Carreras_Disponibles', 'País']].set_axis(['Carreras', 'Country'], axis=1)
+    rows['Tags'] = [generate_tags(carreras, country, use_llm=False)
+                    for carreras, country in zip(rows['Carreras'], rows['Country'])]
+    return rows
+
+def country_only_rows(tags, countries):
+    """Número de filas cuyas etiquetas son únicamente el país"""
+    return sum(needs_llm_tag(tag, country) for tag, country in zip(tags, countries))
+
+def run_load_test(rows, mode='generate', workers=8, timeout=None, batch_size=1, verbose=False):
+    """
+    Etiqueta las filas contra el LLM configurado en OPENAI_API_BASE y mide la carga.
+
+    Args:
+        rows (DataFrame): Resultado de build_rows
+        mode (str): 'generate' (generate_tags por fila) o 'apply' (apply_llm_tags)
+        workers (int): Hilos (generate) o peticiones simultáneas (apply)
+        timeout (float): Timeout por petición en segundos (solo apply)
+        batch_size (int): Universidades por petición (solo apply)
+        verbose (bool): Mostrar los mensajes de cada consulta al LLM
+
+    Returns:
+        dict: Informe con rendimiento, latencias, fallos y filas solo con país
+    """
+    # El cliente de OpenAI tarda en importarse; no debe contar como latencia de las primeras peticiones
+    import openai  # noqa: F401
+
+    profiler = StageProfiler()
+    failures = {'requests': 0}
+    lock = threading.Lock()
+    originals = {name: getattr(contactos_pais, name)
+                 for name in ('query_openai_for_tags', 'query_openai_for_tags_batch')}
+
+    def measured(func):
+        """Mide cada petición y cuenta las que fallan tras los reintentos del cliente"""
+        timed = profiler.timed(func)
+        def wrapper(*args, **kwargs):
+            result = timed(*args, **kwargs)
+            if result is None or (isinstance(result, list) and None in result):
+                with lock:
+                    failures['requests'] += 1
+            return result
+        return wrapper
+
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        # generate_tags y apply_llm_tags buscan las funciones de consulta en el módulo en cada llamada
+        contactos_pais.query_openai_for_tags = measured(originals['query_openai_for_tags'])
+        if batch_size > 1:
+            contactos_pais.query_openai_for_tags_batch = measured(originals['query_openai_for_tags_batch'])
+        try:
+            if mode == 'generate':
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    tags = list(pool.map(lambda row: generate_tags(*row),
+                                         zip(rows['Carreras'], rows['Country'])))
+            else:
+                tags = list(apply_llm_tags(rows, max_workers=workers, timeout=timeout, batch_size=batch_size))
+        finally:
+            for name, func in originals.items():
+                setattr(contactos_pais, name, func)
+    elapsed = time.perf_counter() - start
+
+    latency = profiler.llm_latency_summary()
+    return {
+        'mode': mode,
+        'rows': len(rows),
+        'workers': workers,
+        'batch_size': batch_size,
+        'elapsed_s': round(elapsed, 3),
+        'rows_per_s': round(len(rows) / elapsed, 1) if elapsed else None,
+        'requests_per_s': round(latency['requests'] / elapsed, 1) if elapsed else None,
+        'latency': latency,
+        'failed_requests': failures['requests'],
+        'country_only_before': country_only_rows(rows['Tags'], rows['Country']),
+        'country_only_after': country_only_rows(tags, rows['Country']),
+    }
+
+def print_report(report, state=None):
+    """Imprime el informe de run_load_test y los contadores del stub"""
+    latency = report['latency']
+    print(f"📊 {report['rows']} filas en {report['elapsed_s']:.2f}s ({report['rows_per_s']} filas/s), "
+          f"modo {report['mode']}, {report['workers']} hilos")
+    if latency['requests']:
+        print(f"   Peticiones: {latency['requests']} ({report['requests_per_s']}/s) | "
+              f"p50 {latency['p50_s']:.3f}s, p95 {latency['p95_s']:.3f}s, "
+              f"p99 {latency['p99_s']:.3f}s, máx {latency['max_s']:.3f}s")
+    else:
+        print("   Ninguna fila necesitó el LLM")
+    if state is not None:
+        print(f"   Servidor: {state.requests} peticiones recibidas, {state.errors} errores 500, "
+              f"{state.rate_limited} respuestas 429")
+    print(f"   Peticiones fallidas tras reintentos: {report['failed_requests']}")
+    print(f"   Filas solo con etiqueta de país: {report['country_only_before']} antes del LLM, "
+          f"{report['country_only_after']} después")
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del etiquetado con LLM contra el stub local")
+    parser.add_argument('--rows', type=int, default=1000, help='Número de filas sintéticas')
+    parser.add_argument('--mode', choices=['generate', 'apply'], default='generate',
+                        help='generate_tags por fila o apply_llm_tags sobre el DataFrame')
+    parser.add_argument('--workers', type=int, default=8, help='Hilos o peticiones simultáneas')
+    parser.add_argument('--batch-size', type=int, default=1, help='Universidades por petición (modo apply)')
+    parser.add_argument('--timeout', type=float, default=None, help='Timeout por petición (modo apply)')
+    parser.add_argument('--seed', type=int, default=7, help='Semilla de las filas y del stub')
+    parser.add_argument('--base-url', default=None, help='Usar un servidor ya arrancado en lugar del stub interno')
+    parser.add_argument('--latency', default='0.05', help='Latencia del stub (ver llm_stub_server.py)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de errores 500 del stub')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fracción de 429 del stub')
+    parser.add_argument('--rate-limit-rps', type=int, default=None, help='Peticiones por segundo antes de 429')
+    parser.add_argument('--answers', default=None, help='JSON con respuestas predefinidas del stub')
+    parser.add_argument('--json', default=None, help='Guardar el informe en este archivo JSON')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar los mensajes de cada consulta')
+    args = parser.parse_args()
+    if args.batch_size > 1 and args.mode != 'apply':
+        parser.error("--batch-size solo se usa con --mode apply")
+    try:
+        parse_latency(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"🧪 Generando {args.rows} filas sintéticas...")
+    rows = build_rows(args.rows, seed=args.seed)
+
+    server = state = None
+    previous = {key: os.environ.get(key) for key in ("OPENAI_API_KEY", "OPENAI_API_BASE")}
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        answers = load_answers(args.answers) if args.answers else None
+        server, state, base_url = start_stub_server(answers=answers, latency=args.latency,
+                                                    error_rate=args.error_rate,
+                                                    rate_limit_rate=args.rate_limit_rate,
+                                                    rate_limit_rps=args.rate_limit_rps, seed=args.seed)
+    os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "stub"
+    os.environ["OPENAI_API_BASE"] = base_url
+    print(f"🤖 LLM en {base_url}")
+    try:
+        report = run_load_test(rows, mode=args.mode, workers=args.workers, timeout=args.timeout,
+                               batch_size=args.batch_size, verbose=args.verbose)
+    finally:
+        if server is not None:
+            server.shutdown()
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    if state is not None:
+        report['server'] = {'requests': state.requests, 'errors': state.errors,
+                            'rate_limited': state.rate_limited}
+    print_report(report, state)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+        print(f"💾 Informe guardado en {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
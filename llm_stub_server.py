@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Servidor local compatible con la API de chat completions de OpenAI.
+
+Sirve respuestas predefinidas para probar el etiquetado con LLM sin llamar a
+la API real. También simula un proveedor con problemas: latencia según una
+distribución, errores 500 aleatorios y respuestas 429 (una fracción de las
+peticiones o todo lo que supere un límite de peticiones por segundo). Uso:
+
+    python llm_stub_server.py --port 8765 --latency 0.2
+    python llm_stub_server.py --latency lognormal:0.3,0.6 --error-rate 0.02 --rate-limit-rps 20
+    python llm_stub_server.py --answers respuestas.json
+    export OPENAI_API_KEY=stub OPENAI_API_BASE=http://127.0.0.1:8765/v1
+
+Para medir el etiquetado contra el stub ver llm_load_test.py.
+"""
+
+import argparse
+import collections
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Elementos numerados de un prompt por lotes: "[1] PAÍS: ... | CARRERAS: ..."
+BATCH_ITEM_PATTERN = re.compile(r'^\[(\d+)\] (.*)$', re.MULTILINE)
+
+# Respuestas por defecto: primera subcadena encontrada en el prompt -> respuesta
+DEFAULT_ANSWERS = [
+    ("administracion", "logistica internacional"),
+    ("contabilidad", "logistica internacional"),
+    ("sistemas", "cabinas de experimentacion"),
+    ("informatica", "cabinas de experimentacion"),
+    ("ambiental", "entrenador energias renovables"),
+]
+
+
+# Distribuciones de latencia: nombre -> número de parámetros
+LATENCY_DISTRIBUTIONS = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2, 'exp': 1}
+
+
+def parse_latency(spec):
+    """
+    Interpreta una distribución de latencia.
+
+    Formatos: ``0.2`` (fija), ``uniform:MIN,MAX``, ``normal:MEDIA,DESV``,
+    ``lognormal:MEDIANA,SIGMA`` (colas largas como las de una API real) y
+    ``exp:MEDIA``. Todos los valores en segundos.
+
+    Args:
+        spec (str o float): Latencia fija o especificación de la distribución
+
+    Returns:
+        tuple: (nombre, parámetros)
+
+    Raises:
+        ValueError: Si la especificación no es válida
+    """
+    if isinstance(spec, (int, float)):
+        name, values = 'fixed', (float(spec),)
+    else:
+        name, _, params = str(spec).partition(':')
+        if not params:
+            name, params = 'fixed', name
+        values = tuple(float(value) for value in params.split(','))
+    # Latencias negativas o infinitas harían fallar time.sleep en la primera petición
+    if (LATENCY_DISTRIBUTIONS.get(name) != len(values)
+            or not all(math.isfinite(value) and value >= 0 for value in values)
+            or (name == 'uniform' and values[0] > values[1])):
+        raise ValueError(f"Distribución de latencia no válida: {spec}")
+    return (name, values)
+
+
+def sample_latency(distribution, rng):
+    """
+    Obtiene una latencia de la distribución (nunca negativa).
+
+    Args:
+        distribution (tuple): Resultado de parse_latency
+        rng (random.Random): Generador aleatorio
+
+    Returns:
+        float: Segundos
+    """
+    name, params = distribution
+    if name == 'fixed':
+        return params[0]
+    if name == 'uniform':
+        return rng.uniform(*params)
+    if name == 'normal':
+        return max(0.0, rng.gauss(*params))
+    if name == 'lognormal':
+        median, sigma = params
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+    return rng.expovariate(1 / params[0]) if params[0] > 0 else 0.0
+
+
+def load_answers(path):
+    """
+    Lee respuestas predefinidas de un JSON.
+
+    Acepta un objeto ``{"subcadena": "respuesta"}`` o una lista de pares
+    ``[["subcadena", "respuesta"], ...]``; la primera subcadena encontrada en
+    el prompt (en minúsculas) decide la respuesta.
+
+    Args:
+        path (str): Archivo JSON
+
+    Returns:
+        list: Tuplas (subcadena, respuesta)
+    """
+    with open(path, encoding='utf-8') as handle:
+        data = json.load(handle)
+    pairs = data.items() if isinstance(data, dict) else data
+    return [(str(needle).lower(), str(answer)) for needle, answer in pairs]
+
+
+class StubState:
+    """Configuración y contadores compartidos por los hilos del servidor."""
+
+    def __init__(self, answers=None, latency=0.0, max_batch_items=None, error_rate=0.0,
+                 rate_limit_rate=0.0, rate_limit_rps=None, retry_after=0.05, seed=None):
+        self.answers = list(DEFAULT_ANSWERS if answers is None else answers)
+        self.latency = parse_latency(latency)
+        self.max_batch_items = max_batch_items
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rate_limit_rps = rate_limit_rps
+        self.retry_after = retry_after
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._accepted = collections.deque()
+
+    def admit(self):
+        """
+        Decide el resultado de una petición nueva y actualiza los contadores.
+
+        Returns:
+            tuple: (código HTTP, latencia en segundos); 429 se responde sin latencia
+        """
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            if self.rate_limit_rps:
+                # Ventana deslizante de un segundo con las peticiones aceptadas
+                while self._accepted and now - self._accepted[0] >= 1.0:
+                    self._accepted.popleft()
+                over_limit = len(self._accepted) >= self.rate_limit_rps
+            else:
+                over_limit = False
+            if over_limit or self._rng.random() < self.rate_limit_rate:
+                self.rate_limited += 1
+                return 429, 0.0
+            self._accepted.append(now)
+            latency = sample_latency(self.latency, self._rng)
+            if self._rng.random() < self.error_rate:
+                self.errors += 1
+                return 500, latency
+            return 200, latency
+
+    def answer_for(self, prompt):
+        """Devuelve la respuesta predefinida para el prompt o cadena vacía."""
+        prompt = prompt.lower()
+        for needle, answer in self.answers:
+            if needle in prompt:
+                return answer
+        return ""
+
+    def content_for(self, prompt):
+        """Respuesta completa: texto simple o arreglo JSON si el prompt es un lote."""
+        batch_items = BATCH_ITEM_PATTERN.findall(prompt)
+        if not batch_items:
+            return self.answer_for(prompt)
+        if self.max_batch_items is not None and len(batch_items) > self.max_batch_items:
+            # Simula un modelo que no respeta el formato con lotes grandes
+            return "Lo siento, no puedo clasificar tantas universidades a la vez"
+        return json.dumps([self.answer_for(text) for _, text in batch_items], ensure_ascii=False)
+
+
+def make_handler(state):
+    """Crea la clase manejadora HTTP ligada al estado dado."""
+
+    class ChatCompletionsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            status, latency = state.admit()
+            if status == 429:
+                # El cliente de OpenAI respeta retry-after-ms antes de reintentar
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                                headers={'retry-after-ms': str(int(state.retry_after * 1000)),
+                                         'retry-after': str(math.ceil(state.retry_after))})
+                return
+            if latency:
+                time.sleep(latency)
+            if status == 500:
+                self._send_json(500, {"error": {"message": "Stub internal error", "type": "server_error"}})
+                return
+
+            messages = request.get('messages', [])
+            prompt = messages[-1].get('content', '') if messages else ''
+            self._send_json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get('model', 'stub'),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": state.content_for(prompt)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+    return ChatCompletionsHandler
+
+
+def start_stub_server(host='127.0.0.1', port=0, answers=None, latency=0.0, max_batch_items=None,
+                      error_rate=0.0, rate_limit_rate=0.0, rate_limit_rps=None, retry_after=0.05, seed=None):
+    """
+    Arranca el servidor en un hilo de fondo.
+
+    Args:
+        host (str): Dirección de escucha
+        port (int): Puerto (0 = puerto libre aleatorio)
+        answers (list): Tuplas (subcadena, respuesta); None usa DEFAULT_ANSWERS
+        latency (float o str): Latencia fija en segundos o distribución (ver parse_latency)
+        max_batch_items (int): Lotes más grandes reciben una respuesta malformada
+        error_rate (float): Fracción de peticiones que reciben un error 500
+        rate_limit_rate (float): Fracción de peticiones que reciben un 429
+        rate_limit_rps (int): Peticiones por segundo aceptadas; el resto recibe 429
+        retry_after (float): Segundos indicados en las cabeceras de los 429
+        seed (int): Semilla de la latencia y los errores aleatorios
+
+    Returns:
+        tuple: (servidor, estado, base_url)
+    """
+    state = StubState(answers=answers, latency=latency, max_batch_items=max_batch_items, error_rate=error_rate,
+                      rate_limit_rate=rate_limit_rate, rate_limit_rps=rate_limit_rps, retry_after=retry_after,
+                      seed=seed)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server, state, base_url
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Servidor local compatible con OpenAI chat completions")
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección de escucha')
+    parser.add_argument('--port', type=int, default=8765, help='Puerto de escucha')
+    parser.add_argument('--latency', default='0',
+                        help='Latencia por respuesta: segundos fijos o uniform:MIN,MAX, normal:MEDIA,DESV, '
+                             'lognormal:MEDIANA,SIGMA, exp:MEDIA')
+    parser.add_argument('--max-batch-items', type=int, default=None, help='Lotes más grandes reciben una respuesta malformada')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de peticiones con error 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fracción de peticiones con 429')
+    parser.add_argument('--rate-limit-rps', type=int, default=None, help='Peticiones por segundo antes de responder 429')
+    parser.add_argument('--retry-after', type=float, default=0.05, help='Segundos de espera indicados en los 429')
+    parser.add_argument('--answers', default=None, help='JSON con respuestas predefinidas {"subcadena": "respuesta"}')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla de la latencia y los errores')
+    args = parser.parse_args()
+
+    try:
+        parse_latency(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+    answers = load_answers(args.answers) if args.answers else None
+    server, state, base_url = start_stub_server(args.host, args.port, answers=answers, latency=args.latency,
+                                                max_batch_items=args.max_batch_items, error_rate=args.error_rate,
+                                                rate_limit_rate=args.rate_limit_rate,
+                                                rate_limit_rps=args.rate_limit_rps,
+                                                retry_after=args.retry_after, seed=args.seed)
+    print(f"🤖 Servidor stub escuchando en {base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"📊 Peticiones: {state.requests} | Errores 500: {state.errors} | 429: {state.rate_limited}")
+        server.shutdown()
@@ -0,0 +1,74 @@
+"""
+Etapa de etiquetado con LLM en paralelo.
+
+Envía las consultas al LLM (individuales o por lotes) con un pool de hilos de
+tamaño acotado y devuelve los resultados en el mismo orden de entrada, de modo
+que cada etiqueta vuelve a su fila original.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def query_llm_concurrently(items, query_fn, max_workers=4, timeout=None):
+    """
+    Ejecuta ``query_fn(carreras, pais, timeout=timeout)`` para cada elemento.
+
+    Args:
+        items (list): Lista de tuplas (carreras, pais)
+        query_fn (callable): Función que consulta al LLM y devuelve una etiqueta,
+            '' si no asigna ninguna o None si la petición falla
+        max_workers (int): Número máximo de peticiones simultáneas (1 = serial)
+        timeout (float): Timeout por petición en segundos (opcional)
+
+    Returns:
+        list: Etiquetas devueltas por el LLM (None en fallos), alineadas con ``items``
+    """
+    def run(item):
+        carreras, country = item
+        try:
+            return query_fn(carreras, country, timeout=timeout)
+        except Exception as e:
+            print(f"  ❌ Error inesperado en consulta al LLM: {str(e)}")
+            return None
+
+    if max_workers is None or max_workers <= 1 or len(items) <= 1:
+        return [run(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # map conserva el orden de entrada aunque las respuestas lleguen desordenadas
+        return list(pool.map(run, items))
+
+
+def query_llm_batches_concurrently(items, batch_fn, batch_size=10, max_workers=4, timeout=None):
+    """
+    Divide los elementos en lotes y ejecuta ``batch_fn(lote, timeout=timeout)`` en paralelo.
+
+    Args:
+        items (list): Lista de tuplas (carreras, pais)
+        batch_fn (callable): Función que recibe un lote y devuelve una etiqueta por elemento
+        batch_size (int): Número de elementos por lote
+        max_workers (int): Número máximo de lotes simultáneos (1 = serial)
+        timeout (float): Timeout por petición en segundos (opcional)
+
+    Returns:
+        list: Etiquetas devueltas por el LLM (None en fallos), alineadas con ``items``
+    """
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    def run(batch):
+        try:
+            results = batch_fn(batch, timeout=timeout)
+        except Exception as e:
+            print(f"  ❌ Error inesperado en consulta al LLM: {str(e)}")
+            return [None] * len(batch)
+        if results is None or len(results) != len(batch):
+            return [None] * len(batch)
+        return results
+
+    if max_workers is None or max_workers <= 1 or len(batches) <= 1:
+        batch_results = [run(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            batch_results = list(pool.map(run, batches))
+
+    return [tag for results in batch_results for tag in results]
@@ -0,0 +1,228 @@
+"""
+Normalización de teléfonos a E.164 según la región del contacto.
+
+El país de cada fila se traduce a su código ISO de región y el número se
+analiza una sola vez con esa región, de modo que los números locales
+("2561-8727" en Honduras) y los que traen el código de país sin '+'
+("50425618727") se resuelven igual para cualquier país. Los números que ya
+vienen en E.164 se validan directamente contra los patrones de metadatos
+precompilados, sin pasar por ``phonenumbers.parse``.
+"""
+
+import functools
+import re
+import unicodedata
+
+import pandas as pd
+import phonenumbers
+from phonenumbers import NumberParseException
+
+# Formato E.164 estricto: '+' seguido de 2 a 15 dígitos sin cero inicial
+E164_PATTERN = re.compile(r'^\+[1-9]\d{1,14}$')
+
+# Caracteres que se conservan al limpiar un teléfono
+NON_PHONE_CHARS = re.compile(r'[^\d\s\(\)\+\-]')
+NON_DIGITS = re.compile(r'\D')
+SCIENTIFIC_NOTATION = re.compile(r'e[+-]', re.IGNORECASE)
+
+# Separadores entre varios teléfonos en una misma celda (en orden de prioridad)
+PHONE_SEPARATORS = [';', ',', '/', '|', '\n', '\t', ' y ', ' - ', ' -']
+
+EMPTY_PHONE_VALUES = {'', '–', '-', '—', 'nan', 'none'}
+
+# Tipos de número que phonenumbers considera válidos (mismo orden que _number_type_helper)
+NUMBER_TYPE_DESCS = ['premium_rate', 'toll_free', 'shared_cost', 'voip', 'personal_number',
+                     'pager', 'uan', 'voicemail', 'fixed_line', 'mobile']
+
+
+def _fold(text):
+    """Minúsculas y sin acentos, para comparar nombres de países."""
+    text = unicodedata.normalize('NFD', str(text).strip().lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+@functools.lru_cache(maxsize=1)
+def country_region_table():
+    """
+    Tabla nombre de país (inglés o español, sin acentos) -> código ISO de región.
+
+    Se construye a partir de los nombres de país incluidos en phonenumbers y se
+    carga solo la primera vez que se necesita.
+
+    Returns:
+        dict: Nombre normalizado -> código de región
+    """
+    from phonenumbers.geodata.locale import LOCALE_DATA
+
+    table = {}
+    for region, names in LOCALE_DATA.items():
+        if region not in phonenumbers.SUPPORTED_REGIONS:
+            continue
+        for language in ('aa', 'en', 'es'):
+            name = names.get(language, '')
+            # Los valores '*xx' remiten al nombre en otro idioma
+            while name.startswith('*'):
+                name = names.get(name[1:], '')
+            if name:
+                table.setdefault(_fold(name), region)
+    return table
+
+
+def _desc_matcher(desc, general_lengths):
+    """Compila un PhoneNumberDesc en (patrón, longitudes posibles) o None."""
+    if desc is None or not desc.national_number_pattern:
+        return None
+    lengths = frozenset(desc.possible_length or general_lengths)
+    return re.compile(desc.national_number_pattern), lengths
+
+
+@functools.lru_cache(maxsize=None)
+def _fast_path_rules(country_code):
+    """
+    Reglas precompiladas para validar sin parsear los números de un código de país.
+
+    Solo se usan para códigos con una única región geográfica; para los demás
+    (p. ej. +1, compartido por varios países) devuelve None y se usa phonenumbers.
+    """
+    regions = phonenumbers.COUNTRY_CODE_TO_REGION_CODE.get(country_code, ())
+    if len(regions) != 1 or regions[0] == phonenumbers.REGION_CODE_FOR_NON_GEO_ENTITY:
+        return None
+    metadata = phonenumbers.PhoneMetadata.metadata_for_region(regions[0])
+    if metadata is None:
+        return None
+
+    general_lengths = tuple(metadata.general_desc.possible_length or ())
+    general = _desc_matcher(metadata.general_desc, general_lengths)
+    if general is None:
+        return None
+    types = [m for m in (_desc_matcher(getattr(metadata, name), general_lengths)
+                         for name in NUMBER_TYPE_DESCS) if m is not None]
+    national_prefix = (re.compile(metadata.national_prefix_for_parsing)
+                       if metadata.national_prefix_for_parsing else None)
+    return general, types, national_prefix
+
+
+def _matches(matcher, number):
+    pattern, lengths = matcher
+    return (not lengths or len(number) in lengths) and pattern.fullmatch(number) is not None
+
+
+def fast_e164(text):
+    """
+    Valida un número que ya está en E.164 sin llamar a ``phonenumbers.parse``.
+
+    Args:
+        text (str): Número limpio
+
+    Returns:
+        str: El número si es válido, '' si es inválido o None si no se puede
+        decidir por la vía rápida (hay que usar phonenumbers)
+    """
+    if not E164_PATTERN.match(text):
+        return None
+    digits = text[1:]
+    for size in (1, 2, 3):
+        country_code = int(digits[:size])
+        if country_code in phonenumbers.COUNTRY_CODE_TO_REGION_CODE:
+            break
+    else:
+        return ''
+
+    rules = _fast_path_rules(country_code)
+    if rules is None:
+        return None
+    general, types, national_prefix = rules
+    national_number = digits[size:]
+    # Un posible prefijo nacional obliga a phonenumbers a decidir si lo elimina
+    if national_prefix is not None and national_prefix.match(national_number):
+        return None
+    if len(national_number) < 2:
+        return None
+
+    if _matches(general, national_number) and any(_matches(m, national_number) for m in types):
+        return text
+    return ''
+
+
+def _parse_e164(text, region=None):
+    """Analiza con phonenumbers y devuelve E.164 o '' si no es válido."""
+    try:
+        pn = phonenumbers.parse(text, region)
+    except NumberParseException:
+        return ''
+    if not phonenumbers.is_valid_number(pn):
+        return ''
+    formatted = phonenumbers.format_number(pn, phonenumbers.PhoneNumberFormat.E164)
+    return formatted if E164_PATTERN.match(formatted) else ''
+
+
+def clean_phone_text(num):
+    """
+    Limpia el texto de una celda de teléfono (vacíos, '.0', notación científica,
+    varios teléfonos y caracteres extraños).
+
+    Args:
+        num: Valor de la celda
+
+    Returns:
+        str: Teléfono limpio o '' si no tiene al menos 7 dígitos
+    """
+    if num is None or (not isinstance(num, str) and pd.isna(num)):
+        return ''
+
+    clean = str(num).strip()
+    if clean.lower() in EMPTY_PHONE_VALUES:
+        return ''
+
+    # Números flotantes (como 50425618727.0)
+    if clean.endswith('.0'):
+        clean = clean[:-2]
+
+    # Números en notación científica
+    if SCIENTIFIC_NOTATION.search(clean):
+        try:
+            clean = str(int(float(clean)))
+        except (ValueError, OverflowError):
+            return ''
+
+    # Solo el primer teléfono si hay varios
+    for sep in PHONE_SEPARATORS:
+        if sep in clean:
+            clean = clean.split(sep)[0].strip()
+            break
+
+    clean = NON_PHONE_CHARS.sub('', clean).strip()
+    if len(NON_DIGITS.sub('', clean)) < 7:
+        return ''
+    return clean
+
+
+def format_phone_e164(num, region=None):
+    """
+    Formatea un teléfono a E.164 usando la región del contacto.
+
+    Args:
+        num: Valor de la celda de teléfono
+        region (str): Código ISO de la región del contacto (None si se desconoce)
+
+    Returns:
+        str: Número en formato E.164 o string vacío si no es válido
+    """
+    clean = clean_phone_text(num)
+    if not clean:
+        return ''
+
+    has_plus = clean.startswith('+')
+    if not has_plus and isinstance(region, str) and region:
+        # Número local o con el código de país sin '+'
+        result = _parse_e164(clean, region)
+        if result:
+            return result
+
+    # El número incluye el código de país (con '+' o sin región válida)
+    international = clean if has_plus else '+' + clean
+    if international.count('+') == 1:
+        result = fast_e164('+' + NON_DIGITS.sub('', international))
+        if result is not None:
+            return result
+    return _parse_e164(international)
@@ -0,0 +1,62 @@
+"""
+Reparto de un DataFrame en bloques de filas entre procesos.
+
+Las etapas de limpieza por fila (teléfonos, emails, normalización y
+etiquetado por keywords) no comparten estado entre filas, así que se pueden
+ejecutar en varios núcleos. Los bloques son contiguos y los resultados se
+devuelven en el mismo orden, de modo que al concatenarlos se recupera el
+orden original.
+"""
+
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def worker_pool(workers):
+    """
+    Crea el pool de procesos para ``workers`` > 1.
+
+    Args:
+        workers (int): Número de procesos
+
+    Returns:
+        ProcessPoolExecutor o un contexto que devuelve None (modo serial)
+    """
+    if workers and workers > 1:
+        return ProcessPoolExecutor(max_workers=workers)
+    return contextlib.nullcontext()
+
+
+def split_frame(df, parts):
+    """
+    Divide un DataFrame en bloques contiguos de tamaño similar.
+
+    Args:
+        df (DataFrame): Filas a repartir
+        parts (int): Número máximo de bloques
+
+    Returns:
+        list: Bloques no vacíos en el orden original
+    """
+    positions = np.array_split(np.arange(len(df)), max(1, min(parts, len(df))))
+    return [df.iloc[p] for p in positions if len(p)]
+
+
+def map_frame_chunks(pool, func, df, parts, *args):
+    """
+    Ejecuta ``func((bloque, *args))`` sobre cada bloque en el pool.
+
+    Args:
+        pool (ProcessPoolExecutor): Pool de procesos
+        func (callable): Función de nivel de módulo (debe poder serializarse)
+        df (DataFrame): Filas a repartir
+        parts (int): Número de bloques (normalmente uno por proceso)
+        *args: Argumentos adicionales para cada llamada
+
+    Returns:
+        list: Resultados en el orden de los bloques
+    """
+    chunks = split_frame(df, parts)
+    return list(pool.map(func, [(chunk, *args) for chunk in chunks]))
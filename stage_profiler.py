@@ -0,0 +1,392 @@
+"""
+Perfilado por etapas del procesamiento (--profile).
+
+Cada etapa (lectura del Excel, teléfonos, emails, etiquetado, LLM, escritura
+del CSV...) acumula tiempo de reloj, tiempo de CPU, número de llamadas y de
+elementos procesados, y el pico de memoria: el máximo RSS del proceso y, con
+tracemalloc activado, el pico de memoria asignada por Python y numpy durante
+la etapa. También se guardan las latencias de cada petición al LLM para
+calcular percentiles. El informe se escribe en JSON junto al CSV de salida.
+
+Opcionalmente una etapa se perfila con cProfile y se guarda en un archivo
+``.prof`` que se puede abrir con ``python -m pstats`` o snakeviz. Los perfiles
+de los procesos del pool viajan con su StageProfiler y se suman al volcado.
+
+Las funciones aceptan ``profiler=None`` (sin perfilado) y usan
+``profile_stage`` para no tener que comprobarlo en cada etapa.
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Percentiles de latencia del LLM incluidos en el informe
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+
+def peak_rss_mb():
+    """
+    Máximo de memoria residente del proceso hasta ahora.
+
+    Returns:
+        float: MB (None si la plataforma no lo permite)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentile(values, q):
+    """
+    Percentil con interpolación lineal (como numpy.percentile).
+
+    Args:
+        values (list): Valores ya ordenados
+        q (float): Percentil entre 0 y 100
+
+    Returns:
+        float: Valor del percentil (None si no hay valores)
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _new_stage():
+    return {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'items': 0,
+            'tracemalloc_peak_mb': None, 'rss_peak_mb': None}
+
+
+class _CollectedStats:
+    """Estadísticas de cProfile ya recogidas, en la forma que acepta pstats.Stats."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class StageProfiler:
+    """Acumulador de tiempos, memoria y contadores por etapa."""
+
+    def __init__(self, trace_memory=False, cprofile_stage=None):
+        """
+        Args:
+            trace_memory (bool): Medir el pico de memoria de cada etapa con tracemalloc
+                                 (más preciso, pero ralentiza el proceso)
+            cprofile_stage (str): Etapa que se perfila con cProfile (opcional)
+        """
+        self.trace_memory = trace_memory
+        self.cprofile_stage = cprofile_stage
+        self.stages = {}
+        self.counts = {}
+        self.llm_latencies = []
+        self._stack = []
+        self._lock = threading.Lock()
+        self._cprofile = None
+        # Estadísticas de cProfile de los procesos del pool (ver merge)
+        self._cprofile_parts = []
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def __getstate__(self):
+        # Los perfiles de los procesos del pool se envían al proceso principal; el
+        # perfil de cProfile no se puede serializar, pero sus estadísticas sí
+        state = self.__dict__.copy()
+        state['_lock'] = None
+        state['_cprofile'] = None
+        state['_stack'] = []
+        state['_cprofile_parts'] = self._cprofile_stats()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name, items=None):
+        """
+        Mide una etapa; las llamadas repetidas con el mismo nombre se acumulan.
+
+        Args:
+            name (str): Nombre de la etapa
+            items (int): Elementos procesados en esta llamada (opcional)
+        """
+        record = self.stages.setdefault(name, _new_stage())
+        if self.trace_memory:
+            # El pico de la etapa exterior incluye el de las interiores
+            current_peak = tracemalloc.get_traced_memory()[1]
+            for outer in self._stack:
+                outer['peak'] = max(outer['peak'], current_peak)
+            tracemalloc.reset_peak()
+        frame = {'peak': 0}
+        self._stack.append(frame)
+        profile = self._cprofile_for(name)
+        if profile is not None:
+            profile.enable()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] += time.perf_counter() - wall
+            record['cpu_s'] += time.process_time() - cpu
+            if profile is not None:
+                profile.disable()
+            record['calls'] += 1
+            if items is not None:
+                record['items'] += int(items)
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                for outer in self._stack:
+                    outer['peak'] = max(outer['peak'], peak)
+                record['tracemalloc_peak_mb'] = round(max(record['tracemalloc_peak_mb'] or 0,
+                                                          peak / (1024 * 1024)), 1)
+            record['rss_peak_mb'] = peak_rss_mb()
+
+    def _cprofile_for(self, name):
+        """Perfil de cProfile de la etapa indicada (uno solo, acumulado entre llamadas)."""
+        if name != self.cprofile_stage or any(frame.get('cprofile') for frame in self._stack[:-1]):
+            return None
+        if self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+        self._stack[-1]['cprofile'] = True
+        return self._cprofile
+
+    def _cprofile_stats(self):
+        """Estadísticas de cProfile propias y de los procesos ya sumados."""
+        parts = list(self._cprofile_parts)
+        if self._cprofile is not None:
+            self._cprofile.create_stats()
+            parts.append(self._cprofile.stats)
+        return parts
+
+    def worker_profiler(self):
+        """
+        Perfil vacío con la misma configuración de cProfile para un proceso del pool.
+
+        Returns:
+            StageProfiler: Perfil a rellenar en el proceso y sumar después con merge
+        """
+        return StageProfiler(cprofile_stage=self.cprofile_stage)
+
+    def count(self, name, value=1):
+        """Suma ``value`` al contador ``name`` (filas leídas, contactos escritos...)."""
+        self.counts[name] = self.counts.get(name, 0) + int(value)
+
+    def record_latency(self, seconds):
+        """Guarda la latencia de una petición al LLM (se llama desde varios hilos)."""
+        with self._lock:
+            self.llm_latencies.append(seconds)
+
+    def timed(self, func):
+        """
+        Envuelve una función de consulta al LLM para registrar su latencia.
+
+        Args:
+            func (callable): Función que hace una petición
+
+        Returns:
+            callable: Misma firma; cada llamada se mide con record_latency
+        """
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record_latency(time.perf_counter() - start)
+        return wrapper
+
+    def merge(self, other):
+        """
+        Suma las etapas y contadores de otro perfil (p. ej. de un proceso del pool).
+
+        Args:
+            other (StageProfiler): Perfil a sumar
+        """
+        for name, stage in other.stages.items():
+            record = self.stages.setdefault(name, _new_stage())
+            for key in ('calls', 'wall_s', 'cpu_s', 'items'):
+                record[key] += stage[key]
+            for key in ('tracemalloc_peak_mb', 'rss_peak_mb'):
+                if stage[key] is not None:
+                    record[key] = max(record[key] or 0, stage[key])
+        for name, value in other.counts.items():
+            self.count(name, value)
+        with self._lock:
+            self.llm_latencies.extend(other.llm_latencies)
+        self._cprofile_parts.extend(other._cprofile_stats())
+
+    def llm_latency_summary(self):
+        """
+        Resumen de las latencias del LLM.
+
+        Returns:
+            dict: Peticiones, media, máximo y percentiles en segundos
+        """
+        latencies = sorted(self.llm_latencies)
+        summary = {'requests': len(latencies)}
+        if latencies:
+            summary['mean_s'] = round(sum(latencies) / len(latencies), 4)
+            for q in LATENCY_PERCENTILES:
+                summary[f'p{q}_s'] = round(percentile(latencies, q), 4)
+            summary['max_s'] = round(latencies[-1], 4)
+        return summary
+
+    def report(self, **metadata):
+        """
+        Construye el informe completo.
+
+        Args:
+            **metadata: Datos de la ejecución (entrada, salida, opciones...)
+
+        Returns:
+            dict: Informe serializable en JSON
+        """
+        total = {
+            'wall_s': round(time.perf_counter() - self._start_wall, 4),
+            'cpu_s': round(time.process_time() - self._start_cpu, 4),
+            'rss_peak_mb': peak_rss_mb(),
+        }
+        if resource is not None:
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            total['children_cpu_s'] = round(children.ru_utime + children.ru_stime, 4)
+        if self.trace_memory:
+            total['tracemalloc_peak_mb'] = round(max(
+                [tracemalloc.get_traced_memory()[1] / (1024 * 1024)] +
+                [stage['tracemalloc_peak_mb'] or 0 for stage in self.stages.values()]), 1)
+
+        stages = []
+        for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]['wall_s']):
+            entry = {'stage': name, **stage}
+            entry['wall_s'] = round(stage['wall_s'], 4)
+            entry['cpu_s'] = round(stage['cpu_s'], 4)
+            entry['wall_pct'] = round(100 * stage['wall_s'] / total['wall_s'], 1) if total['wall_s'] else 0.0
+            if stage['items'] and stage['wall_s']:
+                entry['items_per_s'] = round(stage['items'] / stage['wall_s'], 1)
+            stages.append(entry)
+
+        return {**metadata, 'total': total, 'stages': stages, 'counts': dict(self.counts),
+                'llm_latency': self.llm_latency_summary(), 'tracemalloc': self.trace_memory}
+
+    def write(self, path, **metadata):
+        """
+        Escribe el informe JSON (y el volcado de cProfile si se pidió, sumando el
+        del proceso principal y los de los procesos del pool).
+
+        Args:
+            path (str): Archivo JSON de salida
+            **metadata: Datos de la ejecución incluidos en el informe
+
+        Returns:
+            dict: Informe escrito
+        """
+        report = self.report(**metadata)
+        parts = self._cprofile_stats()
+        if parts:
+            prof_path = os.path.splitext(path)[0] + f"_{self.cprofile_stage}.prof"
+            pstats.Stats(*(_CollectedStats(stats) for stats in parts)).dump_stats(prof_path)
+            report['cprofile'] = prof_path
+            report['cprofile_parts'] = len(parts)
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+        return report
+
+    def print_summary(self, report, limit=8):
+        """
+        Imprime las etapas más lentas del informe.
+
+        Args:
+            report (dict): Resultado de report()/write()
+            limit (int): Número de etapas a mostrar
+        """
+        total = report['total']
+        print(f"\n⏱️  Perfil: {total['wall_s']:.2f}s de reloj, {total['cpu_s']:.2f}s de CPU, "
+              f"pico RSS {total['rss_peak_mb']} MB")
+        for stage in report['stages'][:limit]:
+            items = f", {stage['items']} elementos" if stage['items'] else ""
+            print(f"   {stage['stage']}: {stage['wall_s']:.3f}s ({stage['wall_pct']}%), "
+                  f"CPU {stage['cpu_s']:.3f}s{items}")
+        latency = report['llm_latency']
+        if latency['requests']:
+            print(f"   LLM: {latency['requests']} peticiones, p50 {latency['p50_s']:.3f}s, "
+                  f"p95 {latency['p95_s']:.3f}s, máx {latency['max_s']:.3f}s")
+
+
+def profile_stage(profiler, name, items=None):
+    """
+    Contexto de una etapa, o un contexto vacío si no se está perfilando.
+
+    Args:
+        profiler (StageProfiler): Perfil activo o None
+        name (str): Nombre de la etapa
+        items (int): Elementos procesados (opcional)
+    """
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.stage(name, items)
+
+
+def profile_iter(profiler, name, iterable):
+    """
+    Recorre ``iterable`` midiendo como etapa el tiempo de obtener cada elemento.
+
+    Args:
+        profiler (StageProfiler): Perfil activo o None
+        name (str): Nombre de la etapa (p. ej. lectura por bloques del Excel)
+        iterable: Generador a medir
+
+    Yields:
+        Los elementos de ``iterable``
+    """
+    if profiler is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        with profiler.stage(name) as record:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                record['calls'] -= 1
+                return
+            record['items'] += len(item) if hasattr(item, '__len__') else 1
+        yield item
+
+
+def profiled(profiler, name, func):
+    """
+    Envuelve una función de columna para medirla como la etapa ``name``.
+
+    Args:
+        profiler (StageProfiler): Perfil activo
+        name (str): Nombre de la etapa
+        func (callable): Función cuyo primer argumento es la columna (Series)
+
+    Returns:
+        callable: Misma firma; cuenta las filas de la columna como elementos
+    """
+    def wrapper(series, *args, **kwargs):
+        with profiler.stage(name, items=len(series)):
+            return func(series, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Generador de libros Excel sintéticos de universidades de LATAM.
+
+Produce filas con el mismo esquema que BD_LATAM.xlsx (Nombre_Universidad,
+Teléfono_Principal, Carreras_Disponibles, País...) y con los problemas que
+aparecen en los datos reales: teléfonos en notación científica, con sufijo
+".0", guardados como número o con varios números en la misma celda, emails
+placeholder ("no disponible", "N/A", "–") o múltiples, carreras en español,
+inglés y portugués, y universidades repetidas con otro email o teléfono.
+
+La generación es vectorizada con numpy (1M de filas en unos 15 s) y la
+escritura usa el modo write_only de openpyxl para no cargar el libro entero
+en memoria.
+
+Uso:
+    python synthetic_workbook.py --rows 100000 --output bd_sintetica.xlsx
+    python synthetic_workbook.py --rows 1000000 --output bd_1m.xlsx --seed 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+# País -> (código internacional, formatos nacionales de teléfono, ciudades)
+# En los formatos cada "#" es un dígito aleatorio
+COUNTRY_PROFILES = {
+    'Honduras': ('504', ['2###-####', '9###-####', '3### ####'], ['Tegucigalpa', 'San Pedro Sula', 'La Ceiba']),
+    'México': ('52', ['55 #### ####', '(33) ####-####', '81 ####-####'], ['Ciudad de México', 'Guadalajara', 'Monterrey']),
+    'Perú': ('51', ['(01) ###-####', '01 #######', '9## ### ###'], ['Lima', 'Arequipa', 'Trujillo']),
+    'Chile': ('56', ['2 2### ####', '9 #### ####', '(2) 2###-####'], ['Santiago', 'Valparaíso', 'Concepción']),
+    'Colombia': ('57', ['601 #######', '(604) ### ####', '3## ### ####'], ['Bogotá', 'Medellín', 'Cali']),
+    'República Dominicana': ('1', ['809-###-####', '(829) ###-####', '849 ### ####'], ['Santo Domingo', 'Santiago de los Caballeros']),
+    'Argentina': ('54', ['11 ####-####', '(0351) ###-####', '11 15-####-####'], ['Buenos Aires', 'Córdoba', 'Rosario']),
+    'Ecuador': ('593', ['(02) ###-####', '09# ### ####', '04-###-####'], ['Quito', 'Guayaquil', 'Cuenca']),
+    'Panamá': ('507', ['###-####', '6###-####'], ['Ciudad de Panamá', 'David']),
+    'Guatemala': ('502', ['2###-####', '5### ####'], ['Ciudad de Guatemala', 'Quetzaltenango']),
+    'Costa Rica': ('506', ['2###-####', '8### ####'], ['San José', 'Heredia']),
+    'Brasil': ('55', ['(11) ####-####', '(21) 9####-####'], ['São Paulo', 'Rio de Janeiro']),
+}
+
+# Pesos aproximados de cada país en la base real
+COUNTRY_WEIGHTS = [8, 14, 10, 9, 13, 7, 11, 6, 4, 5, 4, 9]
+
+INSTITUTION_PREFIXES = ['Universidad', 'Universidad Nacional', 'Universidad Tecnológica', 'Instituto Tecnológico',
+                        'Universidad Autónoma', 'Universidad Católica', 'Escuela Superior', 'Universidade Federal',
+                        'Pontificia Universidad', 'Instituto Superior']
+
+INSTITUTION_TYPES = ['Privada', 'Pública', 'Pública', 'Privada', 'Mixta', '–', '', 'N/A']
+
+# Carreras en español, inglés y portugués (algunas con y sin tilde)
+CAREERS = [
+    'Ingeniería Industrial', 'Ingenieria Industrial', 'Industrial Engineering', 'Engenharia de Produção',
+    'Logística Internacional', 'Comercio Exterior', 'International Business', 'Supply Chain Management',
+    'Administración de Empresas', 'Business Administration', 'Administração', 'Contabilidad y Auditoría',
+    'Ingeniería en Energías Renovables', 'Renewable Energy Engineering', 'Ingeniería Ambiental',
+    'Sistemas Computacionales', 'Computer Science', 'Ciência da Computação', 'Ingeniería Mecatrónica',
+    'Medicina', 'Enfermería', 'Nursing', 'Derecho', 'Psicología', 'Arquitectura', 'Diseño Gráfico',
+    'Ingeniería Eléctrica', 'Electrical Engineering', 'Ingeniería Civil', 'Turismo y Hotelería',
+]
+
+EMAIL_PLACEHOLDERS = ['no disponible', 'N/A', '–', 'sin correo', 'n/d', '', 'correo@', 'info@']
+
+NOTES = ['', '', '', 'Contactar en horario de oficina', 'Datos verificados 2024', 'Teléfono no contesta', 'Campus nuevo']
+
+COLUMNS = ['Nombre_Universidad', 'Tipo_Institución', 'País', 'Teléfono_Principal', 'Tel_Admisiones',
+           'Email_General', 'Rector_Email', 'Dirección_Completa', 'Sitio_Web', 'Facebook', 'Instagram',
+           'LinkedIn', 'WhatsApp', 'Carreras_Disponibles', 'Notas_Adicionales']
+
+
+def _fill_digits(formats, rng):
+    """
+    Sustituye cada '#' de los formatos por un dígito aleatorio.
+
+    Se trabaja por formato (hay pocos) sobre una matriz de bytes, para no
+    recorrer los números carácter a carácter.
+
+    Args:
+        formats (ndarray): Formato nacional de cada fila
+        rng (Generator): Generador aleatorio
+
+    Returns:
+        tuple: (números con formato, solo dígitos) como arrays de str
+    """
+    national = np.empty(len(formats), dtype=object)
+    plain = np.empty(len(formats), dtype=object)
+    for pattern in np.unique(formats):
+        rows = np.flatnonzero(formats == pattern)
+        template = np.frombuffer(pattern.encode('ascii'), dtype=np.uint8)
+        matrix = np.tile(template, (len(rows), 1))
+        holes = template == ord('#')
+        matrix[:, holes] = rng.integers(ord('0'), ord('9') + 1, (len(rows), holes.sum()), dtype=np.uint8)
+        digit_columns = matrix[:, holes | ((template >= ord('0')) & (template <= ord('9')))]
+        national[rows] = matrix.view(f'S{len(template)}').ravel().astype(str)
+        plain[rows] = np.ascontiguousarray(digit_columns).view(f'S{digit_columns.shape[1]}').ravel().astype(str)
+    return national, plain
+
+
+def _messy_phones(country_codes, formats, rng, empty_share=0.08):
+    """
+    Teléfonos con los formatos problemáticos de la base real.
+
+    Args:
+        country_codes (ndarray): Código internacional de cada fila
+        formats (ndarray): Formato nacional de cada fila
+        rng (Generator): Generador aleatorio
+        empty_share (float): Fracción de celdas vacías o placeholder
+
+    Returns:
+        list: Valores de celda (str, int o float)
+    """
+    national, digits = _fill_digits(formats, rng)
+    shares = np.array([0.35, 0.24, 0.07, 0.08, 0.11, 0.15]) * (1 - empty_share)
+    kinds = rng.choice(['national', 'international', 'scientific', 'dot_zero', 'numeric', 'multi', 'empty'],
+                       size=len(national), p=list(shares) + [empty_share])
+    separators = np.array(['; ', ' / ', ', ', ' y '])[rng.integers(0, 4, len(national))]
+    second_endings = rng.integers(10, 99, len(national))
+    placeholders = np.array(['', '–', 'nan', 'No disponible', '0'])[rng.integers(0, 5, len(national))]
+    values = []
+    for kind, code, number, plain, separator, ending, placeholder in zip(
+            kinds.tolist(), country_codes.tolist(), national.tolist(), digits.tolist(),
+            separators.tolist(), second_endings.tolist(), placeholders.tolist()):
+        full = code + plain.lstrip('0')
+        if kind == 'national':
+            values.append(number)
+        elif kind == 'international':
+            values.append(f"+{code} {number}")
+        elif kind == 'scientific':
+            values.append(f"{float(full):.10E}".replace('E+', 'E'))
+        elif kind == 'dot_zero':
+            values.append(f"{full}.0")
+        elif kind == 'numeric':
+            # Celda numérica: read_excel(dtype=str) la devuelve como texto
+            values.append(int(full))
+        elif kind == 'multi':
+            values.append(f"+{code} {number}{separator}+{code} {number[:-2]}{ending}")
+        else:
+            values.append(placeholder)
+    return values
+
+
+def build_university_frame(n_rows, seed=7, duplicate_share=0.08):
+    """
+    Genera un DataFrame con el esquema de BD_LATAM.xlsx y datos sucios realistas.
+
+    Args:
+        n_rows (int): Número de filas
+        seed (int): Semilla (el resultado es reproducible)
+        duplicate_share (float): Fracción de filas que repiten una universidad anterior
+
+    Returns:
+        DataFrame: Filas listas para escribir con write_workbook
+    """
+    rng = np.random.default_rng(seed)
+    countries = np.array(list(COUNTRY_PROFILES))
+    weights = np.array(COUNTRY_WEIGHTS, dtype=float) / sum(COUNTRY_WEIGHTS)
+
+    # Institución de cada fila; las repetidas apuntan a una fila anterior
+    ids = np.arange(n_rows)
+    repeated = rng.random(n_rows) < duplicate_share
+    repeated[0] = False
+    ids[repeated] = (rng.random(repeated.sum()) * np.flatnonzero(repeated)).astype(int)
+    while n_rows and not np.array_equal(ids[ids], ids):
+        ids = ids[ids]
+
+    country_of_id = rng.choice(len(countries), size=n_rows, p=weights)
+    country_index = country_of_id[ids]
+    country = countries[country_index]
+    prefix = np.array(INSTITUTION_PREFIXES)[rng.integers(0, len(INSTITUTION_PREFIXES), n_rows)[ids]]
+    # Tablas país x opción (se repiten las opciones de los países con menos)
+    city_table = np.array([[profile[2][k % len(profile[2])] for k in range(3)]
+                           for profile in COUNTRY_PROFILES.values()])
+    format_table = np.array([[profile[1][k % len(profile[1])] for k in range(3)]
+                             for profile in COUNTRY_PROFILES.values()])
+    cities = city_table[country_index, rng.integers(0, 3, n_rows)[ids]]
+    names = np.char.add(np.char.add(np.char.add(prefix.astype(str), ' de '), cities),
+                        np.char.add(' ', ids.astype(str)))
+    slug = np.char.add('uni', ids.astype(str))
+
+    codes = np.array([profile[0] for profile in COUNTRY_PROFILES.values()])[country_index]
+    formats = format_table[country_index, rng.integers(0, 3, n_rows)]
+
+    # Emails: institucionales, placeholders, varios en una celda o en mayúsculas
+    email_kind = rng.choice(['ok', 'placeholder', 'multi', 'upper'], size=n_rows, p=[0.66, 0.18, 0.08, 0.08])
+    base_email = np.char.add(np.char.add('info@', slug), '.edu')
+    general = np.where(email_kind == 'ok', base_email, '')
+    general = np.where(email_kind == 'upper', np.char.upper(base_email), general)
+    general = np.where(email_kind == 'multi',
+                       np.char.add(np.char.add(base_email, '; admisiones@'), np.char.add(slug, '.edu')), general)
+    placeholders = np.array(EMAIL_PLACEHOLDERS)[rng.integers(0, len(EMAIL_PLACEHOLDERS), n_rows)]
+    general = np.where(email_kind == 'placeholder', placeholders, general)
+    # Las filas repetidas usan otro buzón de la misma institución
+    general = np.where(repeated & (email_kind == 'ok'), np.char.add(np.char.add('contacto@', slug), '.edu'), general)
+    rector = np.where(rng.random(n_rows) < 0.4, np.char.add(np.char.add('rectoria@', slug), '.edu'),
+                      np.array(['n/d', '', 'No disponible'])[rng.integers(0, 3, n_rows)])
+
+    # De 1 a 5 carreras distintas por fila (permutación aleatoria de cada fila)
+    n_careers = rng.integers(1, 6, n_rows).tolist()
+    picks = np.argsort(rng.random((n_rows, len(CAREERS))), axis=1)[:, :5].tolist()
+    careers = [', '.join(CAREERS[i] for i in pick[:k]) for pick, k in zip(picks, n_careers)]
+
+    websites = np.where(rng.random(n_rows) < 0.8, np.char.add(np.char.add('https://www.', slug), '.edu/'), '')
+    social = lambda site, share: np.where(rng.random(n_rows) < share, np.char.add(site, slug), '')
+
+    whatsapp = np.where(rng.random(n_rows) < 0.5,
+                        np.char.add(codes, rng.integers(30000000, 99999999, n_rows).astype(str)), '')
+
+    frame = pd.DataFrame({
+        'Nombre_Universidad': names,
+        'Tipo_Institución': np.array(INSTITUTION_TYPES)[rng.integers(0, len(INSTITUTION_TYPES), n_rows)],
+        'País': country,
+        'Teléfono_Principal': _messy_phones(codes, formats, rng),
+        'Tel_Admisiones': _messy_phones(codes, formats, rng, empty_share=0.3),
+        'Email_General': general,
+        'Rector_Email': rector,
+        'Dirección_Completa': np.char.add(np.char.add('Av. Principal ', rng.integers(1, 999, n_rows).astype(str)),
+                                          np.char.add(', ', cities)),
+        'Sitio_Web': websites,
+        'Facebook': social('https://facebook.com/', 0.5),
+        'Instagram': social('https://instagram.com/', 0.35),
+        'LinkedIn': social('https://linkedin.com/school/', 0.25),
+        'WhatsApp': whatsapp,
+        'Carreras_Disponibles': careers,
+        'Notas_Adicionales': np.array(NOTES)[rng.integers(0, len(NOTES), n_rows)],
+    }, columns=COLUMNS)
+    return frame
+
+
+def write_workbook(df, path, sheet_name='Universidades'):
+    """
+    Escribe el DataFrame en un .xlsx con openpyxl en modo write_only.
+
+    Las celdas vacías ('' o None) se dejan sin valor, como en un Excel real, y
+    los teléfonos numéricos se guardan como números.
+
+    Args:
+        df (DataFrame): Filas a escribir
+        path (str): Archivo de salida
+        sheet_name (str): Nombre de la hoja
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        sheet.append([None if value == '' else value for value in row])
+    workbook.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un Excel sintético de universidades de LATAM")
+    parser.add_argument('--rows', type=int, default=10000, help='Número de filas (1k a 1M)')
+    parser.add_argument('--output', default='bd_sintetica.xlsx', help='Archivo .xlsx de salida')
+    parser.add_argument('--seed', type=int, default=7, help='Semilla del generador')
+    parser.add_argument('--duplicates', type=float, default=0.08, help='Fracción de universidades repetidas')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = build_university_frame(args.rows, seed=args.seed, duplicate_share=args.duplicates)
+    generated = time.perf_counter() - start
+    write_workbook(df, args.output)
+    written = time.perf_counter() - start - generated
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print(f"✅ {args.output}: {len(df)} filas, {size_mb:.1f} MB "
+          f"(generado en {generated:.1f}s, escrito en {written:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Clasificador local de carreras como filtro previo al LLM.
+
+Las filas que TAG_RULES no etiqueta se consultaban todas al LLM. Este módulo
+entrena un modelo lineal (una regresión logística por categoría) sobre TF-IDF de
+palabras y n-gramas de caracteres de 3 a 5 dentro de cada palabra. Las
+muestras son los textos que las keywords ya etiquetan y las respuestas
+guardadas en la caché del LLM (incluidas las vacías, "sin categoría"). Todas
+las filas pendientes se puntúan en un solo lote y solo las que quedan por
+debajo del umbral de confianza siguen al LLM.
+
+La matriz TF-IDF se guarda como CSR en arrays de numpy (indptr, indices,
+data) y los productos con los pesos se hacen con ``np.bincount``, sin scipy
+ni scikit-learn. El modelo entrenado se guarda en un ``.npz`` con su versión
+de formato, las categorías y un identificador; al arrancar solo se carga.
+
+Uso:
+    python tag_classifier.py BD_LATAM.xlsx --llm-cache llm_tags_cache.sqlite --output tag_classifier.npz
+    python contactos_pais.py BD_LATAM.xlsx --tag-classifier tag_classifier.npz --classifier-threshold 0.8
+"""
+
+import argparse
+import collections
+import datetime
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+# Versión del formato del archivo del modelo; cambiarla invalida los modelos anteriores
+CLASSIFIER_FORMAT_VERSION = 1
+
+# Confianza mínima (probabilidad de la clase elegida) para no consultar al LLM
+DEFAULT_THRESHOLD = 0.8
+
+# Respuesta del LLM que no asignó ninguna categoría
+NO_TAG = ''
+
+CHAR_NGRAMS = (3, 4, 5)
+MIN_DF = 2
+MAX_FEATURES = 50000
+
+
+def _row_ids(indptr):
+    """Fila de cada valor almacenado de una matriz CSR."""
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+def _sparse_dot(rows, indices, data, dense, n_rows):
+    """Producto de una matriz dispersa (n_rows x d, en coordenadas) por una densa (d x k)."""
+    return np.column_stack([np.bincount(rows, weights=data * dense[indices, k], minlength=n_rows)
+                            for k in range(dense.shape[1])])
+
+
+class TextVectorizer:
+    """TF-IDF de palabras y n-gramas de caracteres por palabra, como matriz CSR de numpy."""
+
+    def __init__(self, vocabulary=None, idf=None):
+        """
+        Args:
+            vocabulary (list): Rasgos en el orden de las columnas (None = sin ajustar)
+            idf (ndarray): IDF de cada columna
+        """
+        self.vocabulary = {feature: index for index, feature in enumerate(vocabulary or [])}
+        self.idf = idf
+        self._word_features = {}
+
+    def _features_of_word(self, word):
+        """Rasgos de una palabra (memorizados: las carreras repiten muchas palabras)."""
+        features = self._word_features.get(word)
+        if features is None:
+            padded = f" {word} "
+            features = [f"w:{word}"]
+            for n in CHAR_NGRAMS:
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+            self._word_features[word] = features
+        return features
+
+    def features(self, text):
+        """Lista de rasgos (con repeticiones) de un texto ya normalizado."""
+        features = []
+        for word in text.split():
+            features.extend(self._features_of_word(word))
+        return features
+
+    def fit(self, texts):
+        """
+        Elige el vocabulario (frecuencia documental >= MIN_DF, como máximo
+        MAX_FEATURES rasgos) y calcula el IDF.
+
+        Args:
+            texts (list): Textos normalizados de entrenamiento
+        """
+        document_frequency = collections.Counter()
+        for text in texts:
+            document_frequency.update(set(self.features(text)))
+        kept = [(feature, count) for feature, count in document_frequency.items() if count >= MIN_DF]
+        kept.sort(key=lambda item: (-item[1], item[0]))
+        kept = kept[:MAX_FEATURES]
+        self.vocabulary = {feature: index for index, (feature, _) in enumerate(kept)}
+        counts = np.array([count for _, count in kept], dtype=np.float64)
+        self.idf = np.log((1 + len(texts)) / (1 + counts)) + 1
+        return self
+
+    def transform(self, texts):
+        """
+        Matriz TF-IDF (tf sublineal, filas con norma L2 = 1).
+
+        Args:
+            texts (list): Textos normalizados
+
+        Returns:
+            tuple: (indptr, indices, data) de la matriz CSR de len(texts) filas
+        """
+        vocabulary = self.vocabulary
+        indptr = [0]
+        indices = []
+        counts = []
+        for text in texts:
+            row = collections.Counter(index for index in map(vocabulary.get, self.features(text))
+                                      if index is not None)
+            indices.extend(row.keys())
+            counts.extend(row.values())
+            indptr.append(len(indices))
+        indptr = np.array(indptr, dtype=np.int64)
+        indices = np.array(indices, dtype=np.int64)
+        data = (1 + np.log(np.array(counts, dtype=np.float64))) * self.idf[indices]
+        rows = _row_ids(indptr)
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(texts)))
+        data /= np.where(norms > 0, norms, 1)[rows]
+        return indptr, indices, data
+
+    @property
+    def feature_names(self):
+        """Rasgos en el orden de las columnas."""
+        names = [None] * len(self.vocabulary)
+        for feature, index in self.vocabulary.items():
+            names[index] = feature
+        return names
+
+
+def _sigmoid(scores):
+    return 0.5 * (1 + np.tanh(0.5 * scores))
+
+
+class TagClassifier:
+    """Regresión logística uno-contra-todos (una por categoría) sobre TextVectorizer."""
+
+    def __init__(self, categories, vectorizer=None, weights=None, bias=None, threshold=DEFAULT_THRESHOLD,
+                 meta=None):
+        """
+        Args:
+            categories (list): Categorías de TAG_RULES, en su orden
+            vectorizer (TextVectorizer): Vectorizador ajustado (None = sin entrenar)
+            weights (ndarray): Pesos (rasgos x categorías)
+            bias (ndarray): Sesgo por categoría
+            threshold (float): Confianza mínima para aceptar una predicción
+            meta (dict): Metadatos del entrenamiento
+        """
+        self.categories = list(categories)
+        self.vectorizer = vectorizer or TextVectorizer()
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+        self.meta = meta or {}
+
+    @property
+    def model_id(self):
+        """Identificador del modelo (hash de sus pesos), para la huella del modo incremental."""
+        return self.meta.get('model_id')
+
+    def fit(self, texts, targets, epochs=100, learning_rate=0.5, l2=1e-4, seed=0):
+        """
+        Entrena con descenso de gradiente por lotes completos (Adam).
+
+        Args:
+            texts (list): Textos normalizados
+            targets (ndarray): 1 si el texto tiene la categoría (textos x categorías);
+                               una fila de ceros es un texto sin categoría
+            epochs (int): Pasadas sobre los datos
+            learning_rate (float): Paso de Adam
+            l2 (float): Regularización L2 de los pesos
+            seed (int): Semilla de la inicialización
+
+        Returns:
+            TagClassifier: self
+        """
+        self.vectorizer.fit(texts)
+        indptr, indices, data = self.vectorizer.transform(texts)
+        rows = _row_ids(indptr)
+        n_samples, n_features = len(texts), len(self.vectorizer.vocabulary)
+        rng = np.random.default_rng(seed)
+        weights = rng.normal(0, 0.01, (n_features, len(self.categories)))
+        prior = np.clip(targets.mean(axis=0), 1e-3, 1 - 1e-3)
+        bias = np.log(prior / (1 - prior))
+        moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+        beta1, beta2 = 0.9, 0.999
+        for step in range(1, epochs + 1):
+            error = (_sigmoid(_sparse_dot(rows, indices, data, weights, n_samples) + bias) - targets) / n_samples
+            grad_weights = _sparse_dot(indices, rows, data, error, n_features) + l2 * weights
+            grad_bias = error.sum(axis=0)
+            correction = np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+            for param, grad, first, second in ((weights, grad_weights, moments[0], moments[1]),
+                                               (bias, grad_bias, moments[2], moments[3])):
+                first *= beta1
+                first += (1 - beta1) * grad
+                second *= beta2
+                second += (1 - beta2) * grad * grad
+                param -= learning_rate * correction * first / (np.sqrt(second) + 1e-8)
+        self.weights, self.bias = weights, bias
+        digest = hashlib.sha256(weights.tobytes() + bias.tobytes())
+        self.meta.update({'samples': n_samples, 'features': n_features, 'model_id': digest.hexdigest()[:16]})
+        return self
+
+    def predict_proba(self, texts):
+        """Probabilidad de cada categoría (textos x categorías) en un solo lote."""
+        if not len(texts):
+            return np.zeros((0, len(self.categories)))
+        indptr, indices, data = self.vectorizer.transform(texts)
+        return _sigmoid(_sparse_dot(_row_ids(indptr), indices, data, self.weights, len(texts)) + self.bias)
+
+    def predict(self, texts):
+        """
+        Categorías de cada texto y confianza de la decisión.
+
+        Una categoría se asigna si su probabilidad es >= 0.5; la confianza de un
+        texto es la de su decisión más dudosa (mínimo de max(p, 1 - p)).
+
+        Returns:
+            tuple: (lista de listas de categorías, ndarray de confianzas)
+        """
+        proba = self.predict_proba(texts)
+        chosen = proba >= 0.5
+        confidence = np.where(chosen, proba, 1 - proba).min(axis=1, initial=1.0)
+        labels = [[self.categories[index] for index in np.flatnonzero(row)] for row in chosen]
+        return labels, confidence
+
+    def save(self, path):
+        """Guarda el modelo en un .npz (sin pickle)."""
+        meta = {**self.meta, 'format_version': CLASSIFIER_FORMAT_VERSION, 'categories': self.categories,
+                'threshold': self.threshold}
+        with open(path, 'wb') as handle:
+            np.savez_compressed(handle, weights=self.weights, bias=self.bias, idf=self.vectorizer.idf,
+                                vocabulary=np.array(self.vectorizer.feature_names, dtype=str),
+                                meta=np.array(json.dumps(meta, ensure_ascii=False)))
+
+    @classmethod
+    def load(cls, path, categories=None):
+        """
+        Carga un modelo guardado con save.
+
+        Args:
+            path (str): Archivo .npz
+            categories (list): Categorías esperadas (p. ej. las de TAG_RULES); si no
+                               coinciden el modelo está desactualizado
+
+        Raises:
+            ValueError: Si el formato o las categorías no coinciden
+        """
+        with np.load(path, allow_pickle=False) as archive:
+            meta = json.loads(str(archive['meta']))
+            if meta.get('format_version') != CLASSIFIER_FORMAT_VERSION:
+                raise ValueError(f"{path}: formato del clasificador {meta.get('format_version')}, "
+                                 f"se esperaba {CLASSIFIER_FORMAT_VERSION}; vuelve a entrenarlo")
+            if categories is not None and list(meta['categories']) != list(categories):
+                raise ValueError(f"{path}: las categorías del clasificador no coinciden con TAG_RULES; "
+                                 f"vuelve a entrenarlo")
+            vectorizer = TextVectorizer(archive['vocabulary'].tolist(), archive['idf'])
+            return cls(meta['categories'], vectorizer, archive['weights'], archive['bias'],
+                       threshold=meta.get('threshold', DEFAULT_THRESHOLD), meta=meta)
+
+
+def training_samples(texts, categories, llm_answers=()):
+    """
+    Muestras de entrenamiento a partir del etiquetado por keywords y del LLM.
+
+    Args:
+        texts (iterable): Textos de carreras normalizados
+        categories (list): Categorías de TAG_RULES
+        llm_answers (iterable): Pares (texto normalizado, etiqueta del LLM o NO_TAG)
+
+    Returns:
+        tuple: (textos únicos, matriz objetivo textos x categorías, origen
+                {'keywords': n, 'llm': n})
+    """
+    # Importación diferida: contactos_pais importa este módulo
+    from contactos_pais import TAG_MATCHER
+
+    position = {name: index for index, name in enumerate(categories)}
+    samples = {}
+    sources = {'keywords': 0, 'llm': 0}
+    for text in dict.fromkeys(texts):
+        matched = TAG_MATCHER.match(text) if text else []
+        if matched:
+            samples[text] = matched
+            sources['keywords'] += 1
+    for text, tag in llm_answers:
+        # Las respuestas vacías son ejemplos de "sin categoría"
+        if text and text not in samples and (tag in position or tag == NO_TAG):
+            samples[text] = [tag] if tag else []
+            sources['llm'] += 1
+    texts = list(samples)
+    targets = np.zeros((len(texts), len(categories)))
+    for row, labels in enumerate(samples.values()):
+        targets[row, [position[label] for label in labels]] = 1
+    return texts, targets, sources
+
+
+def train_classifier(texts, targets, categories, holdout=0.1, seed=0, **fit_options):
+    """
+    Entrena y mide el modelo en una parte reservada de las muestras.
+
+    La medida usa un modelo entrenado sin esa parte; el modelo devuelto se
+    entrena después con todas las muestras.
+
+    Returns:
+        TagClassifier: Modelo entrenado con metadatos de precisión y cobertura
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(texts))
+    n_holdout = int(len(texts) * holdout) if len(texts) >= 50 else 0
+    meta = {'trained_at': datetime.datetime.now().isoformat(timespec='seconds')}
+    if n_holdout:
+        test, train = order[:n_holdout], order[n_holdout:]
+        model = TagClassifier(categories).fit([texts[i] for i in train], targets[train], seed=seed, **fit_options)
+        _, confidence = model.predict([texts[i] for i in test])
+        correct = ((model.predict_proba([texts[i] for i in test]) >= 0.5) == (targets[test] > 0)).all(axis=1)
+        accepted = confidence >= DEFAULT_THRESHOLD
+        meta['holdout'] = {
+            'samples': n_holdout,
+            'accuracy': round(float(correct.mean()), 4),
+            'accepted_share': round(float(accepted.mean()), 4),
+            'accepted_accuracy': round(float(correct[accepted].mean()), 4) if accepted.any() else None,
+        }
+    return TagClassifier(categories, meta=meta).fit(texts, targets, seed=seed, **fit_options)
+
+
+def main():
+    # Importaciones diferidas: contactos_pais importa este módulo
+    from contactos_pais import LLM_MODEL, TAG_RULES, normalize_series
+    from llm_cache import LLMTagCache
+    from tag_coverage import load_careers
+    from workbook_cache import WorkbookCache
+    from workbook_inputs import expand_input_paths, parse_sheet_selector
+
+    parser = argparse.ArgumentParser(description="Entrena el clasificador local que filtra las filas antes del LLM")
+    parser.add_argument('inputs', nargs='+', help='Excel de origen (.xlsx) o CSV exportados (columna Carreras)')
+    parser.add_argument('--sheet', default=None, help='Hojas a leer del Excel (como en contactos_pais.py)')
+    parser.add_argument('--llm-cache', default='llm_tags_cache.sqlite', help='Caché del LLM con respuestas anteriores')
+    parser.add_argument('--output', default='tag_classifier.npz', help='Archivo del modelo (por defecto: tag_classifier.npz)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Confianza mínima guardada con el modelo (por defecto: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--epochs', type=int, default=100, help='Pasadas de entrenamiento (por defecto: 100)')
+    parser.add_argument('--workbook-cache', default='.workbook_cache', help='Directorio de la caché de Excel parseados')
+    parser.add_argument('--no-workbook-cache', action='store_true', help='Leer el Excel sin usar la caché de libros')
+    args = parser.parse_args()
+    if not 0 < args.threshold <= 1:
+        parser.error('--threshold debe estar entre 0 y 1')
+    try:
+        paths = expand_input_paths(args.inputs)
+        sheets = parse_sheet_selector(args.sheet) if args.sheet else None
+        carreras = load_careers(paths, None if args.no_workbook_cache else WorkbookCache(args.workbook_cache), sheets)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+
+    texts = normalize_series(carreras.drop_duplicates()).tolist()
+    llm_answers = []
+    if args.llm_cache and os.path.exists(args.llm_cache):
+        cache = LLMTagCache(args.llm_cache)
+        llm_answers = list(cache.answers(LLM_MODEL))
+        cache.close()
+    texts, targets, sources = training_samples(texts, list(TAG_RULES), llm_answers)
+    if not texts:
+        parser.error('No hay textos etiquetados por keywords ni respuestas del LLM para entrenar')
+    print(f"🧮 Entrenando con {len(texts)} textos ({sources['keywords']} por keywords, "
+          f"{sources['llm']} del LLM)...")
+    model = train_classifier(texts, targets, list(TAG_RULES), epochs=args.epochs)
+    model.threshold = args.threshold
+    model.save(args.output)
+
+    holdout = model.meta.get('holdout')
+    if holdout:
+        accepted = holdout['accepted_accuracy']
+        print(f"📊 Validación ({holdout['samples']} textos): precisión {holdout['accuracy']:.1%}; "
+              f"con confianza >= {DEFAULT_THRESHOLD}: {holdout['accepted_share']:.1%} de los textos"
+              f"{f', precisión {accepted:.1%}' if accepted is not None else ''}")
+    print(f"💾 Modelo {model.model_id} guardado en {args.output} "
+          f"({model.meta['features']} rasgos, umbral {model.threshold})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
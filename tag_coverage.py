@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Cobertura de TAG_RULES: aciertos por keyword y por categoría.
+
+Recorre una sola vez cada texto de carreras distinto (normalizado como en
+generate_tags) con el autómata de TAG_MATCHER y registra cada aparición de
+cada keyword, ponderada por el número de filas con ese texto. El informe
+incluye:
+
+- filas y textos por keyword y por categoría,
+- keywords muertas (nunca aparecen),
+- keywords que sobre-coinciden: aparecen sobre todo dentro de palabras más
+  largas (``it`` en "quality", ``lean`` en "clean"), con esas palabras como
+  ejemplo, y las filas cuya categoría depende solo de esas coincidencias,
+- las carreras normalizadas más frecuentes entre las filas sin ninguna
+  categoría (las que quedan solo con la etiqueta de país).
+
+Las carreras se leen de la caché de libros (sin volver a parsear el Excel si
+ya está en caché) o de un CSV ya exportado (columna Carreras). Uso:
+
+    python tag_coverage.py BD_LATAM.xlsx
+    python tag_coverage.py contactos_todos_paises.csv --output cobertura.json --csv cobertura.csv
+"""
+
+import argparse
+import collections
+import csv
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contactos_pais import TAG_MATCHER, clean_value_series, normalize_series, read_workbook
+from workbook_cache import WorkbookCache
+from workbook_inputs import expand_input_paths, parse_sheet_selector
+
+# Una keyword sobre-coincide si al menos esta fracción de sus filas solo la
+# contiene dentro de otra palabra
+OVERMATCH_SHARE = 0.5
+
+# Separadores entre carreras dentro de una celda (antes de normalizar)
+PHRASE_SEPARATORS = re.compile(r'[,;/|\n]+')
+
+# Terminaciones que no convierten una keyword en parte de otra palabra
+PLURAL_SUFFIXES = {'', 's', 'es'}
+
+# Ejemplos de palabras que contienen una keyword sobre-coincidente
+TOP_WORDS = 5
+
+
+def career_texts(carreras):
+    """
+    Textos de carreras distintos, normalizados, con sus filas.
+
+    Args:
+        carreras (Series): Columna Carreras_Disponibles (Excel) o Carreras (CSV)
+
+    Returns:
+        DataFrame: Columnas raw (texto original limpio), text (normalizado) y rows
+    """
+    codes, uniques = pd.factorize(clean_value_series(carreras))
+    rows = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    raw = pd.Series(uniques, dtype=object)
+    return pd.DataFrame({'raw': raw, 'text': normalize_series(raw).to_numpy(dtype=object), 'rows': rows})
+
+
+def _enclosing_word(text, start, end):
+    """Palabra completa del texto que contiene text[start:end]."""
+    while start > 0 and text[start - 1].isalnum():
+        start -= 1
+    while end < len(text) and text[end].isalnum():
+        end += 1
+    return text[start:end]
+
+
+def _inside_word(text, start, end):
+    """
+    True si la aparición está pegada a otras letras o dígitos.
+
+    Un plural justo detrás ("energia" en "energias") no cuenta como otra palabra.
+    """
+    if start > 0 and text[start - 1].isalnum():
+        return True
+    suffix_end = end
+    while suffix_end < len(text) and text[suffix_end].isalnum():
+        suffix_end += 1
+    return text[end:suffix_end] not in PLURAL_SUFFIXES
+
+
+def analyze_coverage(texts, matcher=TAG_MATCHER, top_phrases=30):
+    """
+    Mide la cobertura de las reglas sobre los textos de career_texts.
+
+    Args:
+        texts (DataFrame): Resultado de career_texts
+        matcher (KeywordTagMatcher): Autómata de las reglas (por defecto TAG_MATCHER)
+        top_phrases (int): Carreras sin categoría que se incluyen en el informe
+
+    Returns:
+        dict: Informe con summary, categories, keywords, dead_keywords,
+              overmatching y untagged_phrases
+    """
+    n_keywords = len(matcher.keywords)
+    keyword_rows = np.zeros(n_keywords, dtype=np.int64)
+    keyword_texts = np.zeros(n_keywords, dtype=np.int64)
+    inside_rows = np.zeros(n_keywords, dtype=np.int64)
+    only_rows = np.zeros(n_keywords, dtype=np.int64)
+    inside_words = [collections.Counter() for _ in range(n_keywords)]
+    category_rows = np.zeros(len(matcher.categories), dtype=np.int64)
+    category_inside_rows = np.zeros(len(matcher.categories), dtype=np.int64)
+
+    # El mismo texto normalizado puede venir de varios textos originales
+    grouped = texts.groupby('text', sort=False)['rows'].sum()
+    untagged = []
+    for text, rows in grouped.items():
+        if not text:
+            continue
+        # Por keyword: True si alguna aparición es una palabra completa
+        whole = {}
+        for keyword, start, end in matcher.find_keywords(text):
+            inside = _inside_word(text, start, end)
+            whole[keyword] = whole.get(keyword, False) or not inside
+            if inside:
+                inside_words[keyword][_enclosing_word(text, start, end)] += rows
+        if not whole:
+            untagged.append(text)
+            continue
+        by_category = collections.defaultdict(list)
+        for keyword, is_whole in whole.items():
+            keyword_rows[keyword] += rows
+            keyword_texts[keyword] += 1
+            if not is_whole:
+                inside_rows[keyword] += rows
+            by_category[matcher.keywords[keyword][0]].append((keyword, is_whole))
+        for category, hits in by_category.items():
+            category_rows[category] += rows
+            if len(hits) == 1:
+                only_rows[hits[0][0]] += rows
+            if not any(is_whole for _, is_whole in hits):
+                category_inside_rows[category] += rows
+
+    keywords = []
+    for index, (category, keyword) in enumerate(matcher.keywords):
+        rows = int(keyword_rows[index])
+        share = inside_rows[index] / rows if rows else 0.0
+        keywords.append({
+            'category': matcher.categories[category],
+            'keyword': keyword,
+            'rows': rows,
+            'texts': int(keyword_texts[index]),
+            'inside_word_rows': int(inside_rows[index]),
+            'inside_word_share': round(share, 4),
+            'only_match_rows': int(only_rows[index]),
+            'overmatch': bool(rows and share >= OVERMATCH_SHARE),
+            'inside_words': [word for word, _ in inside_words[index].most_common(TOP_WORDS)],
+        })
+
+    categories = []
+    for index, name in enumerate(matcher.categories):
+        own = [entry for entry in keywords if entry['category'] == name]
+        categories.append({
+            'category': name,
+            'rows': int(category_rows[index]),
+            'inside_word_only_rows': int(category_inside_rows[index]),
+            'keywords': len(own),
+            'dead_keywords': sum(1 for entry in own if not entry['rows']),
+        })
+
+    total_rows = int(texts['rows'].sum())
+    empty_rows = int(grouped.get('', 0))
+    untagged_rows = int(grouped.loc[untagged].sum()) if untagged else 0
+    return {
+        'summary': {
+            'rows': total_rows,
+            'texts': int(len(grouped) - ('' in grouped.index)),
+            'tagged_rows': total_rows - empty_rows - untagged_rows,
+            'untagged_rows': untagged_rows,
+            'empty_rows': empty_rows,
+            'keywords': n_keywords,
+            'dead_keywords': sum(1 for entry in keywords if not entry['rows']),
+            'overmatching_keywords': sum(1 for entry in keywords if entry['overmatch']),
+        },
+        'categories': categories,
+        'keywords': keywords,
+        'dead_keywords': [f"{entry['category']}: {entry['keyword']}" for entry in keywords if not entry['rows']],
+        'overmatching': sorted((entry for entry in keywords if entry['overmatch']),
+                               key=lambda entry: -entry['inside_word_rows']),
+        'untagged_phrases': untagged_phrases(texts, set(untagged), top_phrases),
+    }
+
+
+def untagged_phrases(texts, untagged, top=30):
+    """
+    Carreras más frecuentes (normalizadas) entre las filas sin categoría.
+
+    Args:
+        texts (DataFrame): Resultado de career_texts
+        untagged (set): Textos normalizados sin ninguna keyword
+        top (int): Número de carreras a devolver
+
+    Returns:
+        list: Diccionarios {phrase, rows} de mayor a menor
+    """
+    selected = texts[texts['text'].isin(untagged)]
+    if selected.empty:
+        return []
+    phrases = selected.assign(phrase=selected['raw'].str.split(PHRASE_SEPARATORS)).explode('phrase')
+    phrases['phrase'] = normalize_series(phrases['phrase'])
+    counts = phrases[phrases['phrase'] != ''].groupby('phrase')['rows'].sum()
+    counts = counts.sort_values(ascending=False, kind='stable').head(top)
+    return [{'phrase': phrase, 'rows': int(rows)} for phrase, rows in counts.items()]
+
+
+def load_careers(paths, workbook_cache=None, sheets=None):
+    """
+    Columna de carreras de un CSV exportado o del Excel (vía la caché de libros).
+
+    Args:
+        paths (list): Rutas de entrada (.csv o .xlsx)
+        workbook_cache (WorkbookCache): Caché de hojas parseadas (opcional)
+        sheets: Selector de hojas de parse_sheet_selector (None = primera hoja)
+
+    Returns:
+        Series: Texto de carreras de todas las filas
+    """
+    if all(path.lower().endswith('.csv') for path in paths):
+        frames = [pd.read_csv(path, dtype=str, keep_default_na=False, usecols=['Carreras']) for path in paths]
+        return pd.concat(frames, ignore_index=True)['Carreras']
+    df = read_workbook(paths[0] if len(paths) == 1 else paths, workbook_cache, sheets)
+    if 'Carreras_Disponibles' not in df.columns:
+        raise ValueError("El Excel no tiene la columna Carreras_Disponibles")
+    return df['Carreras_Disponibles']
+
+
+def write_report(report, path):
+    """Guarda el informe completo en JSON."""
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, ensure_ascii=False, indent=2)
+
+
+def write_csv(report, path):
+    """
+    Guarda la tabla de keywords en CSV y las carreras sin categoría en <csv>_untagged.csv.
+
+    Returns:
+        tuple: (CSV de keywords, CSV de carreras sin categoría)
+    """
+    fields = ['category', 'keyword', 'rows', 'texts', 'inside_word_rows', 'inside_word_share',
+              'only_match_rows', 'overmatch', 'inside_words']
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields)
+        writer.writeheader()
+        for entry in report['keywords']:
+            writer.writerow({**entry, 'inside_words': ' | '.join(entry['inside_words'])})
+    untagged_path = (path[:-len('.csv')] if path.endswith('.csv') else path) + '_untagged.csv'
+    pd.DataFrame(report['untagged_phrases'], columns=['phrase', 'rows']).to_csv(
+        untagged_path, index=False, encoding='utf-8')
+    return path, untagged_path
+
+
+def print_report(report, top=10):
+    """Imprime el resumen de cobertura."""
+    summary = report['summary']
+    print(f"\n📊 Cobertura de TAG_RULES: {summary['rows']} filas, {summary['texts']} textos de carreras distintos")
+    print(f"   Con alguna categoría: {summary['tagged_rows']} | Sin categoría: {summary['untagged_rows']} | "
+          f"Sin carreras: {summary['empty_rows']}")
+    for category in report['categories']:
+        inside = (f", {category['inside_word_only_rows']} solo por coincidencias dentro de otra palabra"
+                  if category['inside_word_only_rows'] else "")
+        print(f"   {category['category']}: {category['rows']} filas{inside} "
+              f"({category['dead_keywords']}/{category['keywords']} keywords sin aciertos)")
+    if report['dead_keywords']:
+        print(f"\n💤 {len(report['dead_keywords'])} keywords sin ningún acierto:")
+        for name in report['dead_keywords'][:top]:
+            print(f"   {name}")
+        if len(report['dead_keywords']) > top:
+            print(f"   ... y {len(report['dead_keywords']) - top} más")
+    if report['overmatching']:
+        print(f"\n⚠️  Keywords que coinciden sobre todo dentro de otras palabras:")
+        for entry in report['overmatching'][:top]:
+            print(f"   '{entry['keyword']}' ({entry['category']}): {entry['inside_word_rows']}/{entry['rows']} filas, "
+                  f"p. ej. {', '.join(entry['inside_words'])}")
+    if report['untagged_phrases']:
+        print(f"\n💡 Carreras más frecuentes sin categoría:")
+        for entry in report['untagged_phrases'][:top]:
+            print(f"   {entry['rows']:>6}  {entry['phrase']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cobertura de TAG_RULES por keyword y por categoría")
+    parser.add_argument('inputs', nargs='+', help='Excel de origen (.xlsx) o CSV exportados (columna Carreras)')
+    parser.add_argument('--sheet', default=None, help='Hojas a leer del Excel (como en contactos_pais.py)')
+    parser.add_argument('--output', default='tag_coverage.json', help='Informe JSON (por defecto: tag_coverage.json)')
+    parser.add_argument('--csv', default=None, help='Guardar también la tabla de keywords en CSV')
+    parser.add_argument('--top', type=int, default=30, help='Carreras sin categoría del informe (por defecto: 30)')
+    parser.add_argument('--workbook-cache', default='.workbook_cache', help='Directorio de la caché de Excel parseados')
+    parser.add_argument('--no-workbook-cache', action='store_true', help='Leer el Excel sin usar la caché de libros')
+    args = parser.parse_args()
+    try:
+        paths = expand_input_paths(args.inputs)
+        sheets = parse_sheet_selector(args.sheet) if args.sheet else None
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+
+    workbook_cache = None if args.no_workbook_cache else WorkbookCache(args.workbook_cache)
+    try:
+        carreras = load_careers(paths, workbook_cache, sheets)
+    except ValueError as e:
+        parser.error(str(e))
+    report = analyze_coverage(career_texts(carreras), top_phrases=args.top)
+    print_report(report)
+    write_report(report, args.output)
+    print(f"\n💾 Informe guardado en {args.output}")
+    if args.csv:
+        keywords_csv, untagged_csv = write_csv(report, args.csv)
+        print(f"💾 Tablas CSV: {keywords_csv}, {untagged_csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
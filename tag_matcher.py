@@ -0,0 +1,174 @@
+"""
+Motor de etiquetado por palabras clave basado en un autómata Aho-Corasick.
+
+Compila TAG_RULES una sola vez y encuentra todas las categorías presentes en
+un texto normalizado con una única pasada, en lugar de revisar cada keyword
+con ``in`` por separado.
+"""
+
+from collections import deque
+
+
+class KeywordTagMatcher:
+    """
+    Autómata Aho-Corasick construido a partir de un diccionario de reglas
+    ``{categoria: [keywords]}``.
+
+    Las coincidencias son por subcadena (igual que ``keyword in texto``), por lo
+    que el resultado es idéntico al del recorrido anidado sobre TAG_RULES.
+    """
+
+    def __init__(self, rules):
+        """
+        Args:
+            rules (dict): Diccionario categoría -> lista de keywords normalizadas
+        """
+        self.categories = list(rules.keys())
+        self._all_mask = (1 << len(self.categories)) - 1
+        # (índice de categoría, keyword) de cada keyword, para find_keywords
+        self.keywords = []
+
+        # goto[estado] = {caracter: estado_siguiente}; el estado 0 es la raíz
+        goto = [{}]
+        output = [0]
+        terminal = [[]]
+
+        for index, keywords in enumerate(rules.values()):
+            bit = 1 << index
+            for keyword in keywords:
+                if not keyword:
+                    continue
+                self.keywords.append((index, keyword))
+                state = 0
+                for char in keyword:
+                    next_state = goto[state].get(char)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][char] = next_state
+                        goto.append({})
+                        output.append(0)
+                        terminal.append([])
+                    state = next_state
+                output[state] |= bit
+                terminal[state].append(len(self.keywords) - 1)
+
+        # Calcular enlaces de fallo en anchura y propagar las salidas
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        order = []
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                candidate = goto[fallback].get(char, 0)
+                fail[next_state] = candidate if candidate != next_state else 0
+                output[next_state] |= output[fail[next_state]]
+                queue.append(next_state)
+
+        # Convertir a un DFA completo: cada estado hereda las transiciones de su
+        # enlace de fallo, así el recorrido es un solo dict.get por caracter.
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        for state in order:
+            transitions = dict(delta[fail[state]])
+            transitions.update(goto[state])
+            delta[state] = transitions
+
+        # Keywords que terminan en cada estado, incluidas las de su cadena de fallo
+        # (el orden en anchura garantiza que el estado de fallo ya está resuelto)
+        keyword_output = [tuple(terminal[0])] + [()] * (len(goto) - 1)
+        for state in order:
+            keyword_output[state] = tuple(terminal[state]) + keyword_output[fail[state]]
+
+        self._delta = delta
+        self._output = output
+        self._keyword_output = keyword_output
+        self._keyword_lengths = [len(keyword) for _, keyword in self.keywords]
+
+    def match_mask(self, text):
+        """
+        Recorre el texto una vez y devuelve la máscara de bits de categorías encontradas.
+
+        Args:
+            text (str): Texto ya normalizado
+
+        Returns:
+            int: Máscara con un bit por categoría (en el orden de las reglas)
+        """
+        delta = self._delta
+        output = self._output
+        all_mask = self._all_mask
+        state = 0
+        found = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+                if found == all_mask:
+                    break
+        return found
+
+    def match(self, text):
+        """
+        Devuelve las categorías presentes en el texto, en el orden de las reglas.
+
+        Args:
+            text (str): Texto ya normalizado
+
+        Returns:
+            list: Nombres de las categorías encontradas
+        """
+        if not text:
+            return []
+        found = self.match_mask(text)
+        return [name for index, name in enumerate(self.categories) if found >> index & 1]
+
+    def find_keywords(self, text):
+        """
+        Recorre el texto una vez y devuelve cada aparición de cada keyword.
+
+        A diferencia de match_mask no se detiene al encontrar todas las
+        categorías; se usa para medir la cobertura de las reglas (tag_coverage.py).
+
+        Args:
+            text (str): Texto ya normalizado
+
+        Returns:
+            list: Tuplas (índice en self.keywords, inicio, fin) en orden de fin
+        """
+        delta = self._delta
+        keyword_output = self._keyword_output
+        lengths = self._keyword_lengths
+        state = 0
+        found = []
+        for end, char in enumerate(text, 1):
+            state = delta[state].get(char, 0)
+            for keyword in keyword_output[state]:
+                found.append((keyword, end - lengths[keyword], end))
+        return found
+
+
+def match_tags_loop(rules, text):
+    """
+    Implementación de referencia: recorrido anidado sobre las reglas con ``in``.
+
+    Se conserva para validar y comparar el rendimiento del autómata.
+
+    Args:
+        rules (dict): Diccionario categoría -> lista de keywords normalizadas
+        text (str): Texto ya normalizado
+
+    Returns:
+        list: Nombres de las categorías encontradas
+    """
+    tags = []
+    if text:
+        for tag_name, keywords in rules.items():
+            for keyword in keywords:
+                if keyword in text:
+                    tags.append(tag_name)
+                    break
+    return tags
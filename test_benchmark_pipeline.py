@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmarks por etapa de process_excel_to_ghl_csv con pytest-benchmark.
+
+Genera un Excel sintético (synthetic_workbook) de BENCH_ROWS filas y mide por
+separado la lectura del Excel, la limpieza a columnas GHL, el etiquetado por
+keywords, el filtrado de campos requeridos, la fusión de duplicados, la
+exportación a CSV y el proceso completo sin LLM. La media de cada etapa se
+compara con benchmark_baselines.json (escalada linealmente por número de
+filas); una etapa falla si supera la referencia más la tolerancia.
+
+Uso:
+    pip install pytest-benchmark
+    python -m pytest test_benchmark_pipeline.py --benchmark-only
+    BENCH_ROWS=100000 python -m pytest test_benchmark_pipeline.py --benchmark-only
+    BENCH_SAVE_BASELINE=1 python -m pytest test_benchmark_pipeline.py --benchmark-only
+
+Sin pytest-benchmark instalado el módulo se omite.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contactos_pais import (add_tags_column, build_ghl_dataframe, filter_required_fields,
+                            prepare_for_export, process_excel_to_ghl_csv, read_workbook)
+from dedup_engine import dedupe_contacts
+from synthetic_workbook import build_university_frame, write_workbook
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baselines.json')
+BENCH_ROWS = int(os.environ.get('BENCH_ROWS', '5000'))
+BENCH_ROUNDS = int(os.environ.get('BENCH_ROUNDS', '3'))
+SAVE_BASELINE = os.environ.get('BENCH_SAVE_BASELINE') == '1'
+
+def load_baselines():
+    """Lee benchmark_baselines.json ({} si todavía no existe)"""
+    if not os.path.exists(BASELINES_PATH):
+        return {}
+    with open(BASELINES_PATH, encoding='utf-8') as handle:
+        return json.load(handle)
+
+BASELINES = load_baselines()
+MEASURED = {}
+
+def check_baseline(benchmark, stage):
+    """
+    Compara la media medida con la referencia de la etapa.
+
+    La referencia se guardó con BASELINES['rows'] filas y se escala de forma
+    lineal a BENCH_ROWS. Con BENCH_SAVE_BASELINE=1 solo se registra la medida.
+    """
+    mean = benchmark.stats.stats.mean
+    MEASURED[stage] = mean
+    benchmark.extra_info['rows'] = BENCH_ROWS
+    if SAVE_BASELINE or stage not in BASELINES.get('stages', {}):
+        return
+    expected = BASELINES['stages'][stage] * BENCH_ROWS / BASELINES['rows']
+    limit = expected * (1 + BASELINES.get('tolerance', 0.5))
+    benchmark.extra_info['baseline_s'] = round(expected, 4)
+    assert mean <= limit, (f"{stage}: {mean:.3f}s por encima de la referencia "
+                           f"{expected:.3f}s (+{BASELINES.get('tolerance', 0.5):.0%})")
+
+@pytest.fixture(scope='module', autouse=True)
+def save_baselines():
+    """Con BENCH_SAVE_BASELINE=1 escribe las medias de este run como nuevas referencias"""
+    yield
+    if SAVE_BASELINE and MEASURED:
+        baselines = {'rows': BENCH_ROWS, 'tolerance': BASELINES.get('tolerance', 0.5),
+                     'stages': {stage: round(mean, 4) for stage, mean in sorted(MEASURED.items())}}
+        with open(BASELINES_PATH, 'w', encoding='utf-8') as handle:
+            json.dump(baselines, handle, ensure_ascii=False, indent=2)
+            handle.write('\n')
+
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    """Excel sintético de BENCH_ROWS filas"""
+    path = str(tmp_path_factory.mktemp('bench') / 'bd_sintetica.xlsx')
+    write_workbook(build_university_frame(BENCH_ROWS), path)
+    return path
+
+@pytest.fixture(scope='module')
+def excel_df(workbook):
+    return read_workbook(workbook)
+
+@pytest.fixture(scope='module')
+def ghl_df(excel_df):
+    return build_ghl_dataframe(excel_df)
+
+@pytest.fixture(scope='module')
+def tagged_df(ghl_df):
+    return filter_required_fields(add_tags_column(ghl_df.copy(), use_llm=False))
+
+def run(benchmark, func, make_args):
+    """Mide func con argumentos nuevos en cada ronda (las etapas modifican el DataFrame)"""
+    return benchmark.pedantic(func, setup=lambda: (make_args(), {}), rounds=BENCH_ROUNDS, iterations=1)
+
+def test_read_excel(benchmark, workbook):
+    df = run(benchmark, read_workbook, lambda: (workbook,))
+    assert len(df) == BENCH_ROWS
+    check_baseline(benchmark, 'read_excel')
+
+def test_build_ghl_dataframe(benchmark, excel_df):
+    ghl = run(benchmark, build_ghl_dataframe, lambda: (excel_df.copy(),))
+    assert len(ghl) == BENCH_ROWS
+    check_baseline(benchmark, 'build_ghl_dataframe')
+
+def test_keyword_tags(benchmark, ghl_df):
+    tagged = run(benchmark, lambda df: add_tags_column(df, use_llm=False), lambda: (ghl_df.copy(),))
+    assert tagged['Tags'].ne('').any()
+    check_baseline(benchmark, 'keyword_tags')
+
+def test_filter_required(benchmark, ghl_df):
+    filtered = run(benchmark, filter_required_fields, lambda: (ghl_df.copy(),))
+    assert 0 < len(filtered) <= BENCH_ROWS
+    check_baseline(benchmark, 'filter_required')
+
+def test_dedup(benchmark, tagged_df):
+    merged, stats = run(benchmark, dedupe_contacts, lambda: (tagged_df.copy(),))
+    # El generador repite universidades, así que siempre hay algo que fusionar
+    assert stats.removed > 0 and len(merged) == len(tagged_df) - stats.removed
+    check_baseline(benchmark, 'dedup')
+
+def test_to_csv(benchmark, tagged_df, tmp_path):
+    output = str(tmp_path / 'contactos.csv')
+    run(benchmark, lambda df: prepare_for_export(df).to_csv(output, index=False, encoding='utf-8'),
+        lambda: (tagged_df.copy(),))
+    assert os.path.getsize(output) > 0
+    check_baseline(benchmark, 'to_csv')
+
+def test_end_to_end(benchmark, workbook, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    output = run(benchmark, lambda path: process_excel_to_ghl_csv(path, use_llm=False), lambda: (workbook,))
+    assert os.path.exists(output)
+    check_baseline(benchmark, 'end_to_end')
@@ -9,7 +9,18 @@ import os
 # Añadir el directorio actual al path para importar las funciones
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from contactos_pais import normalize, generate_tags, TAG_RULES
+import pandas as pd
+
+from contactos_pais import normalize, generate_tags, TAG_RULES, TAG_MATCHER
+from contactos_pais import clean_value, clean_value_series, normalize_series
+from contactos_pais import normalize_email, format_phone_e164_strict, validate_country
+from contactos_pais import extract_email_columns, split_contact_emails, filter_by_country
+from column_mapper import map_unique, map_unique_fields, UniqueMapStats
+from phone_engine import fast_e164
+from country_resolver import GHL_VALID_COUNTRIES, country_region, resolve_country
+from dedup_engine import dedupe_contacts, website_domains
+from tag_matcher import KeywordTagMatcher, match_tags_loop
+from tag_coverage import analyze_coverage, career_texts
 
 def test_normalize():
     """Pruebas para la función normalize"""
@@ -101,6 +112,364 @@ def test_tag_rules():
     print("📊 TAG_RULES verificado\n")
     return True
 
+def test_tag_matcher():
+    """Verificar que el autómata da el mismo resultado que el recorrido anidado"""
+    print("🧪 Probando autómata de TAG_RULES...")
+    
+    # Textos con keywords solapadas, subcadenas cortas y sin coincidencias
+    test_cases = [
+        "ingenieria industrial y logistica",
+        "operations management y quality control",
+        "capitulo de sanitaria",
+        "medicina enfermeria odontologia",
+        "renewable energy industrial engineering business",
+        "",
+    ]
+    test_cases.extend(normalize(kw) for kws in TAG_RULES.values() for kw in kws)
+    
+    passed = 0
+    total = len(test_cases)
+    
+    for text in test_cases:
+        expected = match_tags_loop(TAG_RULES, text)
+        result = TAG_MATCHER.match(text)
+        if result == expected:
+            passed += 1
+        else:
+            print(f"❌ '{text}' -> {result} (esperado: {expected})")
+    
+    print(f"📊 tag_matcher: {passed}/{total} pruebas pasaron\n")
+    return passed == total
+
+def test_vectorized_cleaning():
+    """Verificar que clean_value_series y normalize_series coinciden con las versiones por celda"""
+    print("🧪 Probando limpieza vectorizada...")
+    
+    values = ["  Universidad  ", "nan", "NaN", "None", "–", "-", "—", "", "undefined",
+              "NULL", "República Dominicana", "Perú ", "Ingeniería & Diseño", None, float('nan')]
+    series = pd.Series(values, dtype=object)
+    
+    passed = 0
+    total = len(values) * 2
+    
+    for value, result in zip(values, clean_value_series(series)):
+        if result == clean_value(value):
+            passed += 1
+        else:
+            print(f"❌ clean_value_series({value!r}) -> {result!r} (esperado: {clean_value(value)!r})")
+    
+    for value, result in zip(values, normalize_series(series)):
+        if result == normalize(value):
+            passed += 1
+        else:
+            print(f"❌ normalize_series({value!r}) -> {result!r} (esperado: {normalize(value)!r})")
+    
+    print(f"📊 limpieza vectorizada: {passed}/{total} pruebas pasaron\n")
+    return passed == total
+
+def test_map_unique():
+    """Verificar que normalizar solo los valores únicos da el mismo resultado que apply"""
+    print("🧪 Probando normalización por valores únicos...")
+    
+    columns = [
+        (["info@uni.edu", "no disponible", None, "a@x.edu; b@x.edu", "info@uni.edu"], normalize_email),
+        (["504 2561-8727", "50425618727.0", "–", None, "504 2561-8727"], format_phone_e164_strict),
+        (["Honduras", "Perú", None, "Chile", "Honduras"], validate_country),
+    ]
+    stats = UniqueMapStats()
+    
+    passed = 0
+    total = len(columns)
+    
+    for values, func in columns:
+        series = pd.Series(values, dtype=object, name=func.__name__)
+        expected = list(series.apply(func))
+        result = list(map_unique(series, func, stats=stats))
+        if result == expected:
+            passed += 1
+        else:
+            print(f"❌ {func.__name__}: {result} (esperado: {expected})")
+    
+    if stats.columns.get('normalize_email', {}).get('uniques') != 3:
+        print("❌ Conteo de valores únicos incorrecto")
+        passed -= 1
+    
+    # El coste por celda se mide una vez por columna: los bloques siguientes solo
+    # ejecutan el normalizador sobre sus valores únicos
+    calls = []
+    def counted(value):
+        calls.append(value)
+        return value
+    block = pd.Series(["a", "b", "a", "b"] * 10, dtype=object)
+    for _ in range(3):
+        map_unique(block, counted, stats=stats, name='bloques')
+    total += 1
+    if len(calls) == 3 * 3 + len(block) and stats.columns['bloques']['rows'] == 3 * len(block):
+        passed += 1
+    else:
+        print(f"❌ El coste por celda se midió de nuevo en cada bloque ({len(calls)} llamadas)")
+    
+    # El coste por celda se mide con la versión sin memoria del normalizador y
+    # también para los normalizadores vectorizados
+    baseline_calls = []
+    map_unique(block, counted, stats=stats, name='memorizado',
+               baseline=lambda value: baseline_calls.append(value) or value)
+    map_unique(block, clean_value_series, series_func=True, stats=stats, name='vectorizado')
+    total += 1
+    if (len(baseline_calls) == len(block) and stats.columns['memorizado']['saved'] is not None
+            and stats.columns['vectorizado']['saved'] is not None):
+        passed += 1
+    else:
+        print("❌ Ahorro sin medir con el normalizador sin memoria o vectorizado")
+    
+    # País se resuelve una sola vez para el nombre de GHL y la región
+    countries = pd.Series(["México", "Mexico", None, "Perú", "MX"], dtype=object)
+    names, regions = map_unique_fields(countries, resolve_country, stats=stats, name='País')
+    total += 1
+    if (list(names) == [validate_country(value) for value in countries]
+            and list(regions.fillna('')) == [country_region(value) or '' for value in countries]
+            and stats.columns['País']['rows'] == len(countries)):
+        passed += 1
+    else:
+        print(f"❌ map_unique_fields: {list(names)} / {list(regions)}")
+    
+    print(f"📊 map_unique: {passed}/{total} pruebas pasaron\n")
+    return passed == total
+
+def test_phone_regions():
+    """Verificar el formateo E.164 usando la región del país de la fila"""
+    print("🧪 Probando teléfonos con región del país...")
+    
+    test_cases = [
+        (("2561-8727", country_region("Honduras")), "+50425618727"),
+        (("50425618727.0", country_region("Honduras")), "+50425618727"),
+        (("01 6265000", country_region("Perú")), "+5116265000"),
+        (("809-555-1234", country_region("República Dominicana")), "+18095551234"),
+        (("2 2354 2000", country_region("Chile")), "+56223542000"),
+        (("+1 809 555 1234", country_region("Honduras")), "+18095551234"),
+        (("2561-8727", None), ""),
+        (("123", "HN"), ""),
+    ]
+    
+    passed = 0
+    total = len(test_cases) + 2
+    
+    for (num, region), expected in test_cases:
+        result = format_phone_e164_strict(num, region)
+        if result == expected:
+            passed += 1
+        else:
+            print(f"❌ '{num}' ({region}) -> '{result}' (esperado: '{expected}')")
+    
+    # Vía rápida: E.164 válido sin parsear, inválido descartado
+    if fast_e164("+50425618727") == "+50425618727":
+        passed += 1
+    else:
+        print("❌ La vía rápida no aceptó +50425618727")
+    if fast_e164("+50412") == "":
+        passed += 1
+    else:
+        print("❌ La vía rápida no descartó +50412")
+    
+    print(f"📊 Teléfonos por región: {passed}/{total} pruebas pasaron\n")
+    return passed == total
+
+def test_country_resolver():
+    """Verificar que los países en español, inglés o ISO se resuelven al nombre de GHL y su región"""
+    print("🧪 Probando resolución de países...")
+    
+    test_cases = [
+        ("México", ("Mexico", "MX")),
+        ("Perú ", ("Peru", "PE")),
+        ("República Dominicana", ("Dominican Republic", "DO")),
+        ("PANAMÁ", ("Panama", "PA")),
+        ("Brasil", ("Brazil", "BR")),
+        ("Dominican Republic", ("Dominican Republic", "DO")),
+        ("EE.UU.", ("United States", "US")),
+        ("Costa de Marfil", ("Ivory Coast", "CI")),
+        ("CO", ("Colombia", "CO")),
+        ("Puerto Rico", ("", "PR")),
+        ("NULL", ("", None)),
+        (None, ("", None)),
+    ]
+    
+    passed = 0
+    total = len(test_cases) + 2
+    
+    for country, expected in test_cases:
+        result = tuple(resolve_country(country))
+        if result == expected:
+            passed += 1
+        else:
+            print(f"❌ {country!r} -> {result} (esperado: {expected})")
+    
+    # Cada nombre de GHL se resuelve a sí mismo y tiene región para los teléfonos
+    unresolved = [name for name in GHL_VALID_COUNTRIES
+                  if resolve_country(name).name != name or resolve_country(name).region is None]
+    if not unresolved:
+        passed += 1
+    else:
+        print(f"❌ Nombres de GHL sin resolver: {unresolved}")
+    
+    # El país en español ya no pierde la etiqueta de país
+    country = validate_country("Perú")
+    if generate_tags("Medicina", country, use_llm=False) == "peru":
+        passed += 1
+    else:
+        print(f"❌ 'Perú' -> Country '{country}' sin etiqueta de país")
+    
+    # --country acepta el nombre de GHL, el español o el código ISO; si no es un
+    # país reconocido se busca como texto
+    rows = pd.DataFrame({'País': ["México", "MX", "Perú", None, "Rep. Dominicana", "México"]})
+    selected = {query: list(filter_by_country(rows, query).index)
+                for query in ("Mexico", "méxico", "MX", "Rep.")}
+    expected_rows = {"Mexico": [0, 1, 5], "méxico": [0, 1, 5], "MX": [0, 1, 5], "Rep.": [4]}
+    total += 1
+    if selected == expected_rows:
+        passed += 1
+    else:
+        print(f"❌ Filtro por país: {selected} (esperado: {expected_rows})")
+    
+    print(f"📊 Resolución de países: {passed}/{total} pruebas pasaron\n")
+    return passed == total
+
+def test_dedup_engine():
+    """Verificar la fusión de duplicados por email, teléfono, dominio e institución"""
+    print("🧪 Probando fusión de contactos duplicados...")
+    
+    ghl_df = pd.DataFrame({
+        'First Name': ["Universidad A", "Universidad B", "UNIVERSIDAD Á", "Universidad C", "Universidad D", "", ""],
+        'Last Name': ["", "Privada", "Pública", "", "", "", ""],
+        'Email': ["a@a.edu", "", "INFO@a.edu", "", "c@c.edu", "", ""],
+        'Phone': ["+50411", "+50422", "+50433", "+50422", "", "", ""],
+        'Additional Phone Numbers': ["", "", "+50411", "", "", "", ""],
+        'Additional Email Addresses': ["", "", "rector@a.edu", "", "", "", ""],
+        'Country': ["Honduras"] * 7,
+        'Website': ["", "", "", "http://www.c.edu/inicio", "c.edu", "", ""],
+        'Tags': ["honduras, medicina", "honduras", "honduras, derecho", "", "honduras", "", ""],
+    })
+    result, stats = dedupe_contacts(ghl_df)
+    
+    checks = [
+        # A y Á se unen por institución + país; B, C y D por teléfono y dominio
+        (list(result.index) == [0, 1, 5, 6], "orden de entrada y filas sin clave conservadas"),
+        (result.loc[0, 'Last Name'] == "Pública", "campos vacíos completados"),
+        (result.loc[0, 'Additional Email Addresses'] == "INFO@a.edu, rector@a.edu", "emails adicionales"),
+        (result.loc[0, 'Additional Phone Numbers'] == "+50433", "teléfonos adicionales sin repetir"),
+        (result.loc[0, 'Tags'] == "honduras, medicina, derecho", "unión de etiquetas"),
+        (result.loc[1, 'Email'] == "c@c.edu", "email de una fila fusionada"),
+        (stats.removed == 3 and stats.merged_groups == 2, "estadísticas"),
+        (list(website_domains(pd.Series(["https://www.Uni.edu/x", "facebook.com/uni", "n/a"]))) == ["uni.edu", "", ""],
+         "dominios"),
+    ]
+    
+    # Un teléfono compartido por demasiadas filas no une instituciones distintas
+    shared = pd.DataFrame({'First Name': [f"U{i}" for i in range(30)], 'Email': '', 'Phone': "+50411",
+                           'Country': "Honduras"})
+    checks.append((len(dedupe_contacts(shared)[0]) == 30, "bloques demasiado grandes ignorados"))
+    
+    # Con columnas object (--legacy-cleaning) la fusión no escribe sobre vistas de solo lectura
+    legacy, legacy_stats = dedupe_contacts(ghl_df.astype(object))
+    checks.append((legacy.equals(result.astype(object)) and legacy_stats.removed == 3, "columnas object"))
+    
+    passed = 0
+    for ok, description in checks:
+        if ok:
+            passed += 1
+        else:
+            print(f"❌ {description}")
+    
+    print(f"📊 Deduplicación: {passed}/{len(checks)} pruebas pasaron\n")
+    return passed == len(checks)
+
+def test_email_extraction():
+    """Verificar el email principal y los adicionales, por celda y vectorizado"""
+    print("🧪 Probando extracción de emails...")
+    
+    general = ["Info@Uni.edu; admisiones@uni.edu", "no disponible", None, "contacto: rector@x.edu y otro@x.edu",
+               "josé@x.com", "a@x.edu, a@x.edu", "correo@dominio.com", "", "info@uni.edu"]
+    rector = ["rector@uni.edu", "r@y.org", "n/d", "RECTOR@X.EDU", None, "b@x.edu", "c@x.edu", "", "admisiones@uni.edu"]
+    expected = [
+        ("info@uni.edu", "admisiones@uni.edu, rector@uni.edu"),
+        ("", "r@y.org"),
+        ("", ""),
+        ("rector@x.edu", "otro@x.edu"),
+        ("", ""),
+        ("a@x.edu", "b@x.edu"),
+        ("", "c@x.edu"),
+        ("", ""),
+        ("info@uni.edu", "admisiones@uni.edu"),
+    ]
+    index = range(10, 10 + len(general))
+    stats = UniqueMapStats()
+    emails, additional = extract_email_columns(pd.Series(general, index=index, dtype=object),
+                                               pd.Series(rector, index=index, dtype=object), stats=stats)
+    
+    passed = 0
+    total = len(expected) * 2
+    
+    for raw, extra, result, wanted in zip(general, rector, zip(emails, additional), expected):
+        if split_contact_emails(raw, extra) == wanted:
+            passed += 1
+        else:
+            print(f"❌ split_contact_emails({raw!r}, {extra!r}) -> {split_contact_emails(raw, extra)} (esperado: {wanted})")
+        if result == wanted:
+            passed += 1
+        else:
+            print(f"❌ extract_email_columns({raw!r}, {extra!r}) -> {result} (esperado: {wanted})")
+    
+    if list(emails.index) != list(index) or normalize_email("a@x.edu; b@x.edu") != "a@x.edu":
+        print("❌ Índice o email principal incorrecto")
+        passed -= 1
+    
+    # Los únicos de las dos columnas se comparan con las celdas de las dos columnas
+    if stats.columns['emails']['rows'] != 2 * len(general) or stats.columns['emails']['uniques'] > 2 * len(general):
+        print(f"❌ Estadísticas de emails incorrectas: {stats.columns['emails']}")
+        passed -= 1
+    
+    print(f"📊 Emails: {passed}/{total} pruebas pasaron\n")
+    return passed == total
+
+def test_tag_coverage():
+    """Verificar los aciertos por keyword, las keywords muertas y las que sobre-coinciden"""
+    print("🧪 Probando cobertura de TAG_RULES...")
+    
+    rules = {
+        "energia": ["energias renovables", "forestal", "geotermia"],
+        "industria": ["lean", "it", "industrial"],
+    }
+    carreras = pd.Series(["Energías Renovables, Ingeniería Forestal", "Clean Energy", "Arquitectura; Auditoría",
+                          "Enfermería, Medicina", "Medicina", "Diseño Industrial / IT", None, "Enfermería, Medicina"])
+    report = analyze_coverage(career_texts(carreras), KeywordTagMatcher(rules))
+    keywords = {entry['keyword']: entry for entry in report['keywords']}
+    categories = {entry['category']: entry['rows'] for entry in report['categories']}
+    matcher = KeywordTagMatcher(rules)
+    expected_categories = {name: sum(name in matcher.match(normalize(text)) for text in carreras)
+                           for name in rules}
+    
+    checks = [
+        (report['summary']['rows'] == 8 and report['summary']['empty_rows'] == 1, "filas y celdas vacías"),
+        (report['summary']['untagged_rows'] == 3, "filas sin categoría"),
+        (categories == expected_categories, "filas por categoría iguales al autómata"),
+        (keywords['energias renovables']['rows'] == 1 and keywords['forestal']['only_match_rows'] == 0, "aciertos por keyword"),
+        (report['dead_keywords'] == ["energia: geotermia"], "keywords muertas"),
+        (keywords['lean']['overmatch'] and keywords['lean']['inside_words'] == ['clean'], "lean dentro de clean"),
+        (keywords['it']['rows'] == 2 and keywords['it']['inside_word_rows'] == 1, "it como palabra y dentro de otra"),
+        (not keywords['industrial']['overmatch'], "industrial como palabra completa"),
+        (report['untagged_phrases'][:2] == [{'phrase': 'medicina', 'rows': 3}, {'phrase': 'enfermeria', 'rows': 2}],
+         "carreras sin categoría"),
+    ]
+    
+    passed = 0
+    for ok, description in checks:
+        if ok:
+            passed += 1
+        else:
+            print(f"❌ {description}")
+    
+    print(f"📊 Cobertura: {passed}/{len(checks)} pruebas pasaron\n")
+    return passed == len(checks)
+
 def main():
     """Ejecutar todas las pruebas"""
     print("🚀 Iniciando pruebas unitarias para contactos_pais.py\n")
@@ -109,6 +478,14 @@ def main():
         test_normalize,
         test_generate_tags,
         test_tag_rules,
+        test_tag_matcher,
+        test_vectorized_cleaning,
+        test_map_unique,
+        test_phone_regions,
+        test_country_resolver,
+        test_dedup_engine,
+        test_email_extraction,
+        test_tag_coverage,
     ]
     
     passed = 0
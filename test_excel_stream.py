@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Pruebas del modo por bloques (lectura con openpyxl en modo solo lectura)
+"""
+
+import sys
+import os
+import gzip
+import json
+import tempfile
+import pstats
+
+import pandas as pd
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from excel_stream import iter_excel_chunks
+from workbook_cache import WorkbookCache
+from workbook_inputs import expand_input_paths, parse_sheet_selector, read_inputs
+from contactos_pais import process_excel_to_ghl_csv, process_excel_split_by_country, process_excel_incremental
+from stage_profiler import StageProfiler
+from synthetic_workbook import build_university_frame, write_workbook
+from ghl_push import GHLPusher
+from ghl_mock_server import start_mock_server
+from csv_shards import CSVSharding, file_sha256
+from column_schema import CONTACTOS_PLAN, GHL_PLAN, compile_schema
+from contactos import process_excel_to_ghl_csv as process_contactos
+
+def build_workbook(path):
+    """Crea un Excel pequeño con teléfonos numéricos, celdas vacías y emails duplicados"""
+    rows = []
+    for i in range(23):
+        rows.append({
+            'Nombre_Universidad': f"Universidad {i}",
+            'Tipo_Institución': "Privada" if i % 2 else None,
+            'País': "Honduras" if i % 3 else "Chile",
+            'Teléfono_Principal': 50425618727 if i % 4 == 0 else "504 2561-8727",
+            'Email_General': f"info{i % 7}@uni.edu" if i % 5 else "no disponible",
+            'Carreras_Disponibles': "Ingeniería Industrial" if i % 2 else "Medicina",
+        })
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+def test_chunks_match_read_excel():
+    """Los bloques concatenados deben ser iguales a pd.read_excel(dtype=str)"""
+    print("🧪 Probando lectura por bloques...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        expected = pd.read_excel(path, sheet_name=0, dtype=str)
+        chunks = list(iter_excel_chunks(path, chunk_size=5))
+
+    result = pd.concat(chunks)
+    expected = expected.astype(object).where(expected.notna(), None)
+    result = result.where(result.notna(), None)
+
+    if len(chunks) != 5 or expected.shape != result.shape or not (expected.values == result.values).all():
+        print("❌ Los bloques no coinciden con read_excel")
+        return False
+    print("✅ Bloques idénticos a read_excel\n")
+    return True
+
+def test_streaming_matches_full():
+    """El modo por bloques debe exportar los mismos contactos que el modo normal"""
+    print("🧪 Probando exportación por bloques vs completa...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        os.chdir(tmp)
+        try:
+            output = process_excel_to_ghl_csv(path, use_llm=False)
+            full = pd.read_csv(output, dtype=str, keep_default_na=False)
+            output = process_excel_to_ghl_csv(path, use_llm=False, chunk_size=4)
+            streamed = pd.read_csv(output, dtype=str, keep_default_na=False)
+        finally:
+            os.chdir(cwd)
+
+    if list(full.columns) != list(streamed.columns) or sorted(full['Email']) != sorted(streamed['Email']):
+        print("❌ Los contactos exportados difieren")
+        return False
+    print("✅ Mismos contactos en ambos modos\n")
+    return True
+
+def test_split_matches_country():
+    """Cada CSV del modo dividido debe ser idéntico al generado con --country"""
+    print("🧪 Probando exportación dividida por país...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        # Variantes de escritura del mismo país deben ir al mismo archivo
+        df = pd.read_excel(path, dtype=str)
+        df.loc[df.index % 2 == 0, 'País'] = df['País'].map({'Chile': 'CL', 'Honduras': 'honduras '})
+        df.to_excel(path, index=False)
+        os.chdir(tmp)
+        try:
+            outputs = process_excel_split_by_country(path, use_llm=False, split_workers=2)
+            split = {country: open(output, 'rb').read() for country, output in outputs.items()}
+            single = {}
+            for country in outputs:
+                output = process_excel_to_ghl_csv(path, country, use_llm=False)
+                single[country] = open(output, 'rb').read()
+        finally:
+            os.chdir(cwd)
+
+    if (sorted(outputs) != ['Chile', 'Honduras'] or split != single
+            or outputs['Honduras'] != 'contactos_honduras_ghl.csv'):
+        print("❌ Los CSV por país difieren de --country")
+        return False
+    print("✅ CSV por país idénticos a --country\n")
+    return True
+
+def test_workbook_cache():
+    """La caché de libros debe devolver la misma hoja y detectar cambios del Excel"""
+    print("🧪 Probando caché de libros parseados...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        cache = WorkbookCache(os.path.join(tmp, "cache"))
+        
+        expected = pd.read_excel(path, sheet_name=0, dtype=str)
+        first = cache.read_excel(path)
+        second = cache.read_excel(path)
+        counts = cache.country_counts(path)
+        
+        # Mismo contenido con otro mtime: se reutiliza tras comprobar el hash
+        os.utime(path, ns=(0, 0))
+        touched = cache.read_excel(path)
+        
+        # Contenido distinto: se vuelve a parsear
+        pd.DataFrame({'País': ["Chile"]}).to_excel(path, index=False)
+        changed = cache.read_excel(path)
+
+    same = expected.equals(first) and expected.equals(second) and expected.equals(touched)
+    if not same or (cache.hits, cache.misses) != (2, 2) or len(changed) != 1:
+        print(f"❌ Caché incorrecta (aciertos={cache.hits}, fallos={cache.misses})")
+        return False
+    if counts != {'Chile': 8, 'Honduras': 15}:
+        print(f"❌ Conteo por país incorrecto: {counts}")
+        return False
+    print("✅ Caché de libros correcta\n")
+    return True
+
+def test_incremental_matches_full():
+    """El modo incremental solo reprocesa filas modificadas y el CSV completo no cambia"""
+    print("🧪 Probando modo incremental...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        os.chdir(tmp)
+        try:
+            process_excel_incremental(path, use_llm=False)
+            
+            # Nueva versión del Excel con una fila modificada
+            df = pd.read_excel(path, dtype=str)
+            df.loc[3, 'Email_General'] = "nuevo@uni.edu"
+            df.to_excel(path, index=False)
+            
+            output, delta = process_excel_incremental(path, use_llm=False)
+            merged = open(output, 'rb').read()
+            delta_df = pd.read_csv(delta, dtype=str, keep_default_na=False)
+            full = open(process_excel_to_ghl_csv(path, use_llm=False), 'rb').read()
+        finally:
+            os.chdir(cwd)
+
+    if merged != full:
+        print("❌ El CSV completo del modo incremental difiere del modo normal")
+        return False
+    if list(delta_df['Email']) != ["nuevo@uni.edu"]:
+        print(f"❌ El CSV delta debería tener solo la fila modificada: {list(delta_df['Email'])}")
+        return False
+    print("✅ Modo incremental correcto\n")
+    return True
+
+def test_workers_match_serial():
+    """Con varios procesos el CSV debe ser idéntico al del modo serial"""
+    print("🧪 Probando limpieza con pool de procesos...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        os.chdir(tmp)
+        try:
+            serial = open(process_excel_to_ghl_csv(path, use_llm=False), 'rb').read()
+            parallel = open(process_excel_to_ghl_csv(path, use_llm=False, workers=3), 'rb').read()
+        finally:
+            os.chdir(cwd)
+
+    if serial != parallel:
+        print("❌ El CSV con --workers difiere del serial")
+        return False
+    print("✅ CSV idéntico con --workers\n")
+    return True
+
+def test_multi_sheet_inputs():
+    """Varios archivos y hojas se combinan con procedencia y se deduplican juntos"""
+    print("🧪 Probando lectura de varios archivos y hojas...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        df = pd.read_excel(path, dtype=str)
+        for k in range(2):
+            with pd.ExcelWriter(os.path.join(tmp, f"lote{k}.xlsx")) as writer:
+                for country, group in df.iloc[k::2].groupby('País'):
+                    group.to_excel(writer, sheet_name=country, index=False)
+        
+        paths = expand_input_paths([os.path.join(tmp, "lote*.xlsx")])
+        combined, sources = read_inputs(paths, parse_sheet_selector("all"), workers=2)
+        single, _ = read_inputs(paths, parse_sheet_selector("Honduras"), workers=1)
+        os.chdir(tmp)
+        try:
+            output = process_excel_to_ghl_csv(paths, use_llm=False, sheets=parse_sheet_selector("all"))
+            merged = pd.read_csv(output, dtype=str, keep_default_na=False)
+            full = pd.read_csv(process_excel_to_ghl_csv(path, use_llm=False), dtype=str, keep_default_na=False)
+        finally:
+            os.chdir(cwd)
+
+    expected_sources = ["lote0.xlsx:Chile", "lote0.xlsx:Honduras", "lote1.xlsx:Chile", "lote1.xlsx:Honduras"]
+    if sources != expected_sources or len(combined) != len(df) or len(single) != 15:
+        print(f"❌ Hojas leídas incorrectas: {sources} ({len(combined)} filas)")
+        return False
+    if list(combined['Source'].unique()) != expected_sources:
+        print("❌ La columna Source no respeta el orden de archivos y hojas")
+        return False
+    if sorted(merged['Email']) != sorted(full['Email']) or 'Source' not in merged.columns:
+        print("❌ La exportación combinada no deduplica igual que un solo archivo")
+        return False
+    print("✅ Varios archivos y hojas combinados correctamente\n")
+    return True
+
+def test_profile_report():
+    """--profile mide las etapas sin cambiar el CSV y escribe el informe JSON"""
+    print("🧪 Probando perfilado por etapas...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        os.chdir(tmp)
+        try:
+            plain = open(process_excel_to_ghl_csv(path, use_llm=False), 'rb').read()
+            profiler = StageProfiler(cprofile_stage='phones')
+            profiled_csv = open(process_excel_to_ghl_csv(path, use_llm=False, profiler=profiler), 'rb').read()
+            for latency in (0.1, 0.2, 0.3, 0.4):
+                profiler.record_latency(latency)
+            report = profiler.write(os.path.join(tmp, "perfil.json"))
+            has_prof = os.path.exists(report.get('cprofile', ''))
+            # Con --workers la etapa se ejecuta en los procesos del pool y su cProfile se suma
+            pool_profiler = StageProfiler(cprofile_stage='phones')
+            process_excel_to_ghl_csv(path, use_llm=False, profiler=pool_profiler, workers=2)
+            pool_report = pool_profiler.write(os.path.join(tmp, "perfil_pool.json"))
+            pool_calls = [func for func in pstats.Stats(pool_report['cprofile']).stats
+                          if func[2] == 'format_phone_e164'] if 'cprofile' in pool_report else []
+        finally:
+            os.chdir(cwd)
+
+    stages = {stage['stage']: stage for stage in report['stages']}
+    expected = {'read_excel', 'phones', 'emails', 'countries', 'clean_text', 'keyword_tags', 'dedup', 'to_csv'}
+    if plain != profiled_csv or not expected <= set(stages) or not has_prof:
+        print(f"❌ Perfil incompleto o CSV distinto: {sorted(stages)}")
+        return False
+    if not pool_calls or pool_report['cprofile_parts'] != 2:
+        print("❌ El volcado de cProfile no incluye las etapas de los procesos del pool")
+        return False
+    if stages['read_excel']['items'] != 23 or report['counts']['rows_read'] != 23:
+        print("❌ Conteo de filas leídas incorrecto")
+        return False
+    latency = report['llm_latency']
+    if latency['requests'] != 4 or abs(latency['p50_s'] - 0.25) > 1e-9 or latency['max_s'] != 0.4:
+        print(f"❌ Percentiles de latencia incorrectos: {latency}")
+        return False
+    print("✅ Perfil por etapas correcto\n")
+    return True
+
+def test_synthetic_workbook():
+    """El Excel sintético es reproducible, trae datos sucios y el proceso completo lo acepta"""
+    print("🧪 Probando el generador de Excel sintético...")
+    df = build_university_frame(600, seed=3)
+    if not df.equals(build_university_frame(600, seed=3)) or len(df) != 600:
+        print("❌ El generador no es reproducible con la misma semilla")
+        return False
+    phones = df['Teléfono_Principal'].astype(str)
+    messy = {
+        'científica': phones.str.contains('E1', regex=False).any(),
+        'sufijo .0': phones.str.endswith('.0').any(),
+        'numérico': df['Teléfono_Principal'].map(lambda value: isinstance(value, int)).any(),
+        'varios números': phones.str.count(r'\+').gt(1).any(),
+        'placeholder': df['Email_General'].isin(['no disponible', 'N/A', '–']).any(),
+        'repetidas': df['Nombre_Universidad'].duplicated().any(),
+    }
+    if not all(messy.values()):
+        print(f"❌ Faltan casos sucios: {[name for name, ok in messy.items() if not ok]}")
+        return False
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            os.chdir(tmp)
+            write_workbook(df, 'bd.xlsx')
+            output = process_excel_to_ghl_csv('bd.xlsx', use_llm=False)
+            result = pd.read_csv(output, dtype=str, keep_default_na=False)
+        finally:
+            os.chdir(cwd)
+    if not 0 < len(result) < len(df) or result['Phone'].str.contains('E', regex=False).any():
+        print(f"❌ Resultado inesperado: {len(result)} contactos")
+        return False
+    print("✅ Excel sintético procesado correctamente\n")
+    return True
+
+def test_ghl_push():
+    """El envío a GHL sube todos los contactos del CSV con reintentos y conexiones reutilizadas"""
+    print("🧪 Probando el envío a la API de GHL contra el mock...")
+    server, state, base_url = start_mock_server(rate_limit=40, rate_window=0.2, error_rate=0.05, seed=3)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            os.chdir(tmp)
+            write_workbook(build_university_frame(300, seed=5), 'bd.xlsx')
+            pusher = GHLPusher('mock', 'loc123', base_url=base_url, workers=3, max_retries=8, backoff=0.01)
+            output = process_excel_to_ghl_csv('bd.xlsx', use_llm=False, pusher=pusher)
+            first = (pusher.stats.sent, pusher.stats.created, pusher.stats.failed, pusher.stats.retries)
+            simulated = state.rate_limited + state.errors
+            # Reenviar los mismos contactos solo los actualiza (upsert idempotente)
+            pusher.stats.created = pusher.stats.updated = 0
+            process_excel_to_ghl_csv('bd.xlsx', use_llm=False, pusher=pusher)
+            second_created, second_updated = pusher.stats.created, pusher.stats.updated
+            pusher.close()
+            exported = pd.read_csv(output, dtype=str, keep_default_na=False)
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+
+    identified = exported[(exported['Email'] != '') | (exported['Phone'] != '')]
+    stored_emails = {contact.get('email') for contact in state.contacts.values()}
+    print(f"📊 Enviados: {first[0]} | Reintentos: {first[3]} | 429: {state.rate_limited} | "
+          f"500: {state.errors} | Conexiones: {state.connections}")
+    if first[2] or first[0] != first[1] or first[0] != len(identified) or len(state.contacts) != len(identified):
+        print(f"❌ Contactos enviados incorrectos: {first} para {len(identified)} filas")
+        return False
+    if not set(identified['Email']) - {''} <= stored_emails:
+        print("❌ Faltan emails del CSV en GHL")
+        return False
+    if second_created or second_updated != len(identified):
+        print("❌ El reenvío creó contactos nuevos")
+        return False
+    if not state.rate_limited or not state.errors or first[3] != simulated:
+        print("❌ No se simularon o reintentaron los 429 y 500")
+        return False
+    if state.connections > 2 * pusher.workers:
+        print(f"❌ No se reutilizaron las conexiones: {state.connections}")
+        return False
+    print("✅ Envío a GHL correcto\n")
+    return True
+
+def test_sharded_output():
+    """Los CSV en partes (con y sin gzip) se unen en el mismo CSV que el modo normal"""
+    print("🧪 Probando la salida en partes y comprimida...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            os.chdir(tmp)
+            write_workbook(build_university_frame(400, seed=9), 'bd.xlsx')
+            # El modo por bloques fusiona duplicados de otra forma: se compara con su propio CSV
+            expected = {}
+            for chunk_size in (None, 60):
+                with open(process_excel_to_ghl_csv('bd.xlsx', use_llm=False, chunk_size=chunk_size), 'rb') as handle:
+                    expected[chunk_size] = handle.read()
+            header = expected[None].split(b'\n', 1)[0] + b'\n'
+            results = {}
+            for name, sharding, chunk_size in [('rows', CSVSharding(max_rows=70), None),
+                                               ('bytes', CSVSharding(max_bytes=9000, compress=True), None),
+                                               ('streaming', CSVSharding(max_rows=50, max_bytes=9000), 60)]:
+                manifest_path = process_excel_to_ghl_csv('bd.xlsx', use_llm=False, sharding=sharding,
+                                                         chunk_size=chunk_size)
+                with open(manifest_path, encoding='utf-8') as handle:
+                    manifest = json.load(handle)
+                parts, sizes, checksums = [], [], True
+                for shard in manifest['shards']:
+                    checksums &= file_sha256(shard['file']) == shard['sha256']
+                    opener = gzip.open if sharding.compress else open
+                    with opener(shard['file'], 'rb') as handle:
+                        data = handle.read()
+                    sizes.append((len(data), shard['rows']))
+                    parts.append(data[len(header):] if data.startswith(header) else None)
+                    os.remove(shard['file'])
+                results[name] = (expected[chunk_size][len(header):], manifest, parts, sizes, checksums)
+        finally:
+            os.chdir(cwd)
+
+    for name, (body, manifest, parts, sizes, checksums) in results.items():
+        if None in parts or b''.join(parts) != body:
+            print(f"❌ Las partes ({name}) no reconstruyen el CSV completo")
+            return False
+        if not checksums or manifest['rows'] != sum(rows for _, rows in sizes) or len(parts) < 2:
+            print(f"❌ Manifiesto incorrecto ({name}): {len(parts)} archivos, {manifest['rows']} filas")
+            return False
+        if any((manifest['max_rows'] and rows > manifest['max_rows']) or
+               (manifest['max_bytes'] and size > manifest['max_bytes']) for size, rows in sizes):
+            print(f"❌ Alguna parte ({name}) supera los límites: {sizes}")
+            return False
+    if not results['bytes'][1]['shards'][0]['file'].endswith('.csv.gz'):
+        print("❌ Las partes comprimidas no terminan en .csv.gz")
+        return False
+    print(f"✅ {', '.join(f'{name}: {len(parts)} archivos' for name, (_, _, parts, _, _) in results.items())}\n")
+    return True
+
+def test_low_memory():
+    """--low-memory produce los mismos CSV en los modos completo, por bloques, por país e incremental"""
+    print("🧪 Probando el modo de memoria reducida...")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            os.chdir(tmp)
+            write_workbook(build_university_frame(400, seed=13), 'bd.xlsx')
+            runs = {
+                'full': lambda low: process_excel_to_ghl_csv('bd.xlsx', use_llm=False, low_memory=low),
+                'chunked': lambda low: process_excel_to_ghl_csv('bd.xlsx', use_llm=False, chunk_size=90,
+                                                                low_memory=low),
+                'split': lambda low: process_excel_split_by_country('bd.xlsx', use_llm=False,
+                                                                   low_memory=low)['Mexico'],
+                'incremental': lambda low: process_excel_incremental('bd.xlsx', use_llm=False,
+                                                                     manifest_path=f'manifest_{low}',
+                                                                     low_memory=low)[0],
+            }
+            outputs = {}
+            for name, run in runs.items():
+                for low in (False, True):
+                    with open(run(low), 'rb') as handle:
+                        outputs[name, low] = handle.read()
+        finally:
+            os.chdir(cwd)
+
+    different = [name for name in runs if outputs[name, False] != outputs[name, True]]
+    if different:
+        print(f"❌ Los CSV con --low-memory difieren en: {different}")
+        return False
+    print(f"✅ CSV idénticos con y sin --low-memory ({', '.join(runs)})\n")
+    return True
+
+def test_column_schema():
+    """El plan del esquema lee solo las columnas mapeadas y valida el encabezado antes de cargar filas"""
+    print("🧪 Probando el esquema declarativo de columnas...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bd.xlsx")
+        build_workbook(path)
+        df = pd.read_excel(path, dtype=str)
+        df.insert(1, 'Columna_Sin_Mapear', "x")
+        df.to_excel(path, index=False)
+        expected = df.drop(columns='Columna_Sin_Mapear')
+        
+        full = GHL_PLAN.read_excel(path)
+        chunked = pd.concat(list(GHL_PLAN.iter_chunks(path, chunk_size=5)))
+        cache = WorkbookCache(os.path.join(tmp, "cache"))
+        cached = [GHL_PLAN.read_excel(path, workbook_cache=cache) for _ in range(2)]
+        # La hoja completa no está en la caché (solo se guardaron las columnas del plan)
+        whole = cache.read_excel(path)
+        
+        # contactos.py conserva las columnas que no están en su esquema
+        ghl_path = os.path.join(tmp, "ghl.xlsx")
+        pd.DataFrame({'First Name': ["Ana", "Luis"], 'Campo Propio': ["a", "b"], 'Last Name': ["Paz", "Soto"],
+                      'Email': ["ana@uni.edu", "luis@uni.edu"], 'Phone': ["(201) 555-0123", None]}).to_excel(
+            ghl_path, index=False)
+        passthrough = {}
+        for name, chunk_size in (('full', None), ('chunked', 1)):
+            output = os.path.join(tmp, f"ghl_{name}.csv")
+            process_contactos(ghl_path, output, chunk_size=chunk_size)
+            passthrough[name] = pd.read_csv(output, dtype=str)
+        
+        try:
+            CONTACTOS_PLAN.read_excel(path)
+            missing_error = None
+        except ValueError as error:
+            missing_error = str(error)
+        try:
+            compile_schema([{'source': 'A', 'header': 'Email'}, {'source': 'B', 'header': 'Email'}])
+            repeated_error = None
+        except ValueError as error:
+            repeated_error = str(error)
+    
+    def same(frame):
+        values = lambda data: data.astype(object).where(data.notna(), None).values
+        return (list(frame.columns) == list(expected.columns) and frame.shape == expected.shape
+                and (values(frame) == values(expected)).all())
+    
+    if not (same(full) and same(chunked) and all(same(c) for c in cached)):
+        print(f"❌ Columnas leídas incorrectas: {list(full.columns)}")
+        return False
+    if (cache.hits, cache.misses) != (1, 2) or 'Columna_Sin_Mapear' not in whole.columns:
+        print(f"❌ Caché con columnas parciales incorrecta (aciertos={cache.hits}, fallos={cache.misses})")
+        return False
+    for name, frame in passthrough.items():
+        if (list(frame.columns) != ['First Name', 'Last Name', 'Email', 'Phone', 'Campo Propio']
+                or list(frame['Campo Propio']) != ["a", "b"] or frame.loc[0, 'Phone'] != "+12015550123"):
+            print(f"❌ contactos.py ({name}) no conserva las columnas sin mapear: {frame.to_dict('list')}")
+            return False
+    if missing_error != "Falta columna obligatoria: First Name" or repeated_error is None:
+        print(f"❌ Validación del esquema incorrecta: {missing_error} | {repeated_error}")
+        return False
+    print(f"✅ {len(full.columns)} columnas mapeadas leídas de {len(df.columns)}, encabezado validado\n")
+    return True
+
+def main():
+    """Ejecutar todas las pruebas"""
+    tests = [test_chunks_match_read_excel, test_streaming_matches_full, test_split_matches_country,
+             test_workbook_cache, test_incremental_matches_full,
+             test_workers_match_serial, test_multi_sheet_inputs, test_profile_report,
+             test_synthetic_workbook, test_ghl_push, test_sharded_output, test_low_memory,
+             test_column_schema]
+    passed = sum(1 for test in tests if test())
+    print(f"🎯 Resumen: {passed}/{len(tests)} suites de pruebas pasaron")
+    return 0 if passed == len(tests) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Pruebas del etiquetado con LLM en paralelo contra el servidor stub local
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+# Añadir el directorio actual al path para importar las funciones
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from contactos_pais import LLM_MODEL, TAG_RULES, apply_fallback_tags, apply_llm_tags, generate_tags, query_openai_for_tags
+from contactos_pais import LLM_BATCH_PROMPT_HASH, LLM_PROMPT_HASH, query_openai_for_tags_batch
+from llm_cache import LLMTagCache
+from llm_load_test import build_rows, run_load_test
+from llm_stub_server import parse_latency, start_stub_server
+from tag_classifier import TagClassifier, training_samples
+
+def set_llm_env(base_url):
+    """Apunta las variables de entorno de OpenAI al stub y devuelve los valores previos"""
+    previous = {k: os.environ.get(k) for k in ("OPENAI_API_KEY", "OPENAI_API_BASE")}
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_API_BASE"] = base_url
+    return previous
+
+def restore_llm_env(previous):
+    """Restaura las variables de entorno de OpenAI"""
+    for key, value in previous.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+def build_frame(n_rows):
+    """Construye un DataFrame con filas que solo quedan con la etiqueta de país"""
+    carreras = [
+        "Administración de Empresas",
+        "Medicina, Enfermería",
+        "Sistemas Computacionales",
+        "Contabilidad y Auditoría",
+        "Ingeniería Ambiental",
+        "Filosofía",
+    ]
+    rows = []
+    for i in range(n_rows):
+        text = f"{carreras[i % len(carreras)]} {i}"
+        country = "Honduras" if i % 3 else "Chile"
+        rows.append({'Carreras': text, 'Country': country,
+                     'Tags': generate_tags(text, country, use_llm=False)})
+    return pd.DataFrame(rows)
+
+def test_concurrent_matches_serial():
+    """El modo concurrente debe producir exactamente las mismas etiquetas que el serial"""
+    print("🧪 Probando etiquetado con LLM concurrente vs serial...")
+
+    server, state, base_url = start_stub_server(latency=0.05)
+    previous = set_llm_env(base_url)
+
+    try:
+        df = build_frame(24)
+
+        start = time.perf_counter()
+        serial = apply_llm_tags(df, max_workers=1, timeout=5)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = apply_llm_tags(df, max_workers=8, timeout=5)
+        concurrent_time = time.perf_counter() - start
+
+        row_by_row = [generate_tags(c, p) for c, p in zip(df['Carreras'], df['Country'])]
+    finally:
+        server.shutdown()
+        restore_llm_env(previous)
+
+    print(f"📊 Serial: {serial_time:.2f}s | Concurrente: {concurrent_time:.2f}s | Peticiones: {state.requests}")
+
+    if list(serial) != list(concurrent) or list(serial) != row_by_row:
+        print("❌ Los resultados difieren entre modos")
+        return False
+    if not any(tag.count(',') for tag in concurrent):
+        print("❌ El LLM no asignó ninguna etiqueta")
+        return False
+
+    print("✅ Resultados idénticos en modo serial, concurrente y fila por fila\n")
+    return True
+
+def test_llm_cache():
+    """Las filas duplicadas se agrupan y una segunda corrida no hace llamadas al LLM"""
+    print("🧪 Probando caché persistente del LLM...")
+
+    server, state, base_url = start_stub_server()
+    previous = set_llm_env(base_url)
+
+    try:
+        df = build_frame(12)
+        # Duplicar filas con variaciones de mayúsculas/tildes que normalizan igual
+        duplicated = df.copy()
+        duplicated['Carreras'] = duplicated['Carreras'].str.upper()
+        df = pd.concat([df, duplicated], ignore_index=True)
+
+        cache = LLMTagCache(':memory:')
+        first = apply_llm_tags(df, max_workers=4, cache=cache)
+        first_requests = state.requests
+        second = apply_llm_tags(df, max_workers=4, cache=cache)
+        second_requests = state.requests - first_requests
+        hits, misses = cache.hits, cache.misses
+        cache.close()
+    finally:
+        server.shutdown()
+        restore_llm_env(previous)
+
+    print(f"📊 Peticiones 1ª corrida: {first_requests} | 2ª corrida: {second_requests} | "
+          f"Aciertos: {hits} | Fallos: {misses}")
+
+    if list(first) != list(second):
+        print("❌ Los resultados con caché difieren")
+        return False
+    if first_requests != misses or second_requests != 0 or hits != misses:
+        print("❌ La caché no evitó las llamadas repetidas")
+        return False
+
+    print("✅ Caché y agrupación de duplicados funcionando\n")
+    return True
+
+def test_llm_batches():
+    """El modo por lotes da el mismo resultado y divide los lotes con respuesta malformada"""
+    print("🧪 Probando clasificación por lotes...")
+
+    # Lotes de más de 3 elementos reciben una respuesta malformada y deben dividirse
+    server, state, base_url = start_stub_server(max_batch_items=3)
+    previous = set_llm_env(base_url)
+
+    try:
+        df = build_frame(30)
+        single = apply_llm_tags(df, max_workers=4)
+        single_requests = state.requests
+        cache = LLMTagCache(':memory:')
+        batched = apply_llm_tags(df, max_workers=4, batch_size=8, cache=cache)
+        batch_requests = state.requests - single_requests
+        # Las respuestas se guardan con el hash del prompt que las produjo y todas se reutilizan
+        cached = apply_llm_tags(df, max_workers=4, batch_size=8, cache=cache)
+        cached_requests = state.requests - single_requests - batch_requests
+        hashes = {row[0] for row in cache._conn.execute("SELECT prompt_hash FROM llm_tags")}
+        cache.close()
+        items = list(zip(df['Carreras'], df['Country']))
+        one = query_openai_for_tags_batch(items[:1], with_prompt_hash=True)
+        two = query_openai_for_tags_batch(items[:2], with_prompt_hash=True)
+    finally:
+        server.shutdown()
+        restore_llm_env(previous)
+
+    print(f"📊 Peticiones individuales: {single_requests} | Peticiones por lotes: {batch_requests}")
+
+    if list(single) != list(batched):
+        print("❌ Los resultados por lotes difieren de los individuales")
+        return False
+    if batch_requests >= single_requests:
+        print("❌ El modo por lotes no redujo el número de peticiones")
+        return False
+    if list(cached) != list(batched) or cached_requests != 0 or not hashes <= {LLM_BATCH_PROMPT_HASH, LLM_PROMPT_HASH}:
+        print(f"❌ Caché por lotes incorrecta ({cached_requests} peticiones, hashes {hashes})")
+        return False
+    if [h for _, h in one] != [LLM_PROMPT_HASH] or [h for _, h in two] != [LLM_BATCH_PROMPT_HASH] * 2:
+        print(f"❌ Hash del prompt incorrecto en lotes: {one} | {two}")
+        return False
+
+    print("✅ Lotes validados y divididos correctamente\n")
+    return True
+
+def test_stub_faults_and_load_test():
+    """El stub simula errores, 429 y respuestas predefinidas, y la prueba de carga los refleja"""
+    print("🧪 Probando errores simulados del stub y la prueba de carga...")
+
+    if parse_latency('lognormal:0.2,0.5') != ('lognormal', (0.2, 0.5)) or parse_latency(0.1) != ('fixed', (0.1,)):
+        print("❌ Distribución de latencia mal interpretada")
+        return False
+    accepted = []
+    for invalid in (-0.1, '-0.1', 'fixed:-1', 'uniform:0.3,0.1', 'exp:inf', 'normal:0.1'):
+        try:
+            parse_latency(invalid)
+            accepted.append(invalid)
+        except ValueError:
+            pass
+    if accepted:
+        print(f"❌ Latencias no válidas aceptadas: {accepted}")
+        return False
+
+    failing, failing_state, failing_url = start_stub_server(error_rate=1.0)
+    limited, limited_state, limited_url = start_stub_server(rate_limit_rate=1.0, retry_after=0.01)
+    canned, canned_state, canned_url = start_stub_server(answers=[("filosof", "cabinas de experimentacion")],
+                                                         latency='uniform:0.01,0.03', seed=1)
+    try:
+        previous = set_llm_env(failing_url)
+        failed = query_openai_for_tags("Filosofía", "Chile")
+        set_llm_env(limited_url)
+        limited_tag = query_openai_for_tags("Filosofía", "Chile")
+        set_llm_env(canned_url)
+        canned_tag = query_openai_for_tags("Filosofía", "Chile")
+        rows = build_rows(80, seed=2)
+        report = run_load_test(rows, mode='apply', workers=4)
+    finally:
+        for server in (failing, limited, canned):
+            server.shutdown()
+        restore_llm_env(previous)
+
+    print(f"📊 500: {failing_state.errors} | 429: {limited_state.rate_limited} | "
+          f"Carga: {report['latency']['requests']} peticiones, p95 {report['latency'].get('p95_s')}")
+
+    # El cliente de OpenAI reintenta dos veces antes de rendirse
+    if failed is not None or limited_tag is not None or failing_state.errors != 3 or limited_state.rate_limited != 3:
+        print("❌ Los errores simulados no llegaron al cliente como fallos")
+        return False
+    if canned_tag != "cabinas de experimentacion":
+        print(f"❌ Respuesta predefinida incorrecta: {canned_tag!r}")
+        return False
+    if (report['rows'] != 80 or report['failed_requests'] != 0 or not report['latency']['requests']
+            or report['latency']['p50_s'] < 0.01 or report['country_only_after'] > report['country_only_before']):
+        print(f"❌ Informe de carga inesperado: {report}")
+        return False
+
+    print("✅ Errores, 429, respuestas predefinidas y prueba de carga correctos\n")
+    return True
+
+def test_local_classifier():
+    """El clasificador entrenado con respuestas del LLM evita peticiones y da las mismas etiquetas"""
+    print("🧪 Probando clasificador local previo al LLM...")
+
+    server, state, base_url = start_stub_server()
+    previous = set_llm_env(base_url)
+
+    try:
+        # Entrenar con las respuestas guardadas de una primera corrida
+        cache = LLMTagCache(':memory:')
+        apply_llm_tags(build_frame(24), max_workers=4, cache=cache)
+        texts, targets, sources = training_samples([], list(TAG_RULES), cache.answers(LLM_MODEL))
+        cache.close()
+        model = TagClassifier(list(TAG_RULES)).fit(texts, targets)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tag_classifier.npz')
+            model.save(path)
+            loaded = TagClassifier.load(path, categories=list(TAG_RULES))
+            try:
+                TagClassifier.load(path, categories=list(TAG_RULES)[:-1])
+                stale_rejected = False
+            except ValueError:
+                stale_rejected = True
+
+        # Textos nuevos (otros números) que no están en el entrenamiento
+        df = build_frame(48).iloc[24:]
+        start_requests = state.requests
+        expected = apply_llm_tags(df, max_workers=4)
+        llm_requests = state.requests - start_requests
+        tagged = apply_fallback_tags(df.copy(), llm_workers=4, tag_classifier=loaded)
+        classifier_requests = state.requests - start_requests - llm_requests
+    finally:
+        server.shutdown()
+        restore_llm_env(previous)
+
+    (labels, confidence), (loaded_labels, loaded_confidence) = model.predict(texts), loaded.predict(texts)
+    print(f"📊 Muestras: {sources['llm']} del LLM | Peticiones solo LLM: {llm_requests} | "
+          f"con clasificador: {classifier_requests}")
+
+    if loaded.model_id != model.model_id or labels != loaded_labels or (confidence != loaded_confidence).any():
+        print("❌ El modelo cargado no coincide con el guardado")
+        return False
+    if not stale_rejected:
+        print("❌ Se cargó un modelo con categorías distintas de TAG_RULES")
+        return False
+    if list(tagged['Tags']) != list(expected):
+        print("❌ Las etiquetas con clasificador difieren de las del LLM")
+        return False
+    if classifier_requests >= llm_requests:
+        print("❌ El clasificador no evitó peticiones al LLM")
+        return False
+
+    print("✅ Clasificador local guardado, cargado y filtrando filas antes del LLM\n")
+    return True
+
+def main():
+    """Ejecutar todas las pruebas"""
+    tests = [test_concurrent_matches_serial, test_llm_cache, test_llm_batches, test_stub_faults_and_load_test,
+             test_local_classifier]
+    passed = sum(1 for test in tests if test())
+    print(f"🎯 Resumen: {passed}/{len(tests)} suites de pruebas pasaron")
+    return 0 if passed == len(tests) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Caché en disco de hojas de Excel ya parseadas.
+
+Parsear un .xlsx con openpyxl es la parte más lenta de cada ejecución. La
+primera vez que se lee un libro, la hoja se guarda en Parquet junto con un
+JSON de metadatos (ruta, tamaño, mtime, hash SHA-256 del contenido, fila de
+encabezados y conteo de contactos por país); las siguientes ejecuciones
+cargan el Parquet. Si la lectura se limitó a algunas columnas (ver
+column_schema), solo se guardan esas y una lectura posterior que pida otras
+vuelve a parsear el libro.
+
+Validación de una entrada:
+- Mismo tamaño y mtime: se usa sin releer el Excel.
+- Mismo tamaño pero otro mtime: se calcula el hash; si coincide se reutiliza.
+- En cualquier otro caso el libro se vuelve a parsear.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from excel_stream import read_excel_header
+
+# Versión del formato de la caché; cambiarla invalida las entradas anteriores
+CACHE_VERSION = 2
+
+
+def file_sha256(path, block_size=1 << 20):
+    """
+    Calcula el hash SHA-256 del contenido de un archivo.
+
+    Args:
+        path (str): Ruta del archivo
+        block_size (int): Tamaño de lectura en bytes
+
+    Returns:
+        str: Hash en hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def country_counts(df, column='País'):
+    """
+    Cuenta los contactos por valor exacto de la columna de país.
+
+    Args:
+        df (DataFrame): Hoja parseada
+        column (str): Columna de país
+
+    Returns:
+        dict: País -> número de filas (sin valores vacíos)
+    """
+    if column not in df.columns:
+        return {}
+    counts = df[column].value_counts(dropna=True)
+    return {str(country): int(count) for country, count in counts.items() if str(country).strip() != ''}
+
+
+class WorkbookCache:
+    """Caché de hojas parseadas en Parquet, una entrada por (archivo, hoja)."""
+
+    def __init__(self, cache_dir='.workbook_cache'):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_paths(self, input_excel, sheet_index):
+        key = hashlib.sha256(f"{os.path.abspath(input_excel)}|{sheet_index}".encode('utf-8')).hexdigest()[:32]
+        base = os.path.join(self.cache_dir, key)
+        return base + '.parquet', base + '.json'
+
+    def _load_meta(self, input_excel, sheet_index):
+        """Devuelve los metadatos de la entrada si sigue siendo válida, o None."""
+        data_path, meta_path = self._entry_paths(input_excel, sheet_index)
+        try:
+            with open(meta_path, encoding='utf-8') as handle:
+                meta = json.load(handle)
+            stat = os.stat(input_excel)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != CACHE_VERSION or not os.path.exists(data_path):
+            return None
+        if meta.get('size') != stat.st_size:
+            return None
+        if meta.get('mtime_ns') != stat.st_mtime_ns:
+            # El archivo se tocó: solo se reutiliza si el contenido es el mismo
+            if meta.get('sha256') != file_sha256(input_excel):
+                return None
+            meta['mtime_ns'] = stat.st_mtime_ns
+            self._write_meta(meta_path, meta)
+        return meta
+
+    def _write_meta(self, meta_path, meta):
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(meta, handle, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def header(self, input_excel, sheet_index=0):
+        """
+        Fila de encabezados completa guardada en la caché.
+
+        Returns:
+            list: Nombres de las columnas de la hoja o None si no hay una entrada válida
+        """
+        meta = self._load_meta(input_excel, sheet_index)
+        return None if meta is None else meta['header']
+
+    def load(self, input_excel, sheet_index=0, columns=None):
+        """
+        Carga la hoja desde la caché.
+
+        Args:
+            input_excel (str): Ruta del archivo Excel
+            sheet_index (int): Índice de la hoja
+            columns (list): Solo estas columnas (None = la hoja completa)
+
+        Returns:
+            DataFrame: Hoja parseada o None si no hay una entrada válida con esas columnas
+        """
+        meta = self._load_meta(input_excel, sheet_index)
+        if meta is None:
+            return None
+        if columns is None:
+            if meta['columns'] != meta['header']:
+                return None
+            columns = meta['columns']
+        elif not set(columns) <= set(meta['columns']):
+            return None
+        data_path, _ = self._entry_paths(input_excel, sheet_index)
+        try:
+            df = pd.read_parquet(data_path, columns=list(columns))
+        except (OSError, ValueError):
+            return None
+        return df[list(columns)]
+
+    def store(self, input_excel, df, sheet_index=0, header=None):
+        """
+        Guarda la hoja parseada y sus metadatos.
+
+        Args:
+            input_excel (str): Ruta del archivo Excel
+            df (DataFrame): Hoja leída con pd.read_excel(dtype=str)
+            sheet_index (int): Índice de la hoja
+            header (list): Encabezado completo si df tiene solo algunas columnas
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, meta_path = self._entry_paths(input_excel, sheet_index)
+        stat = os.stat(input_excel)
+        meta = {
+            'version': CACHE_VERSION,
+            'source': os.path.abspath(input_excel),
+            'sheet_index': sheet_index,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(input_excel),
+            'rows': len(df),
+            'columns': [str(c) for c in df.columns],
+            'header': [str(c) for c in (df.columns if header is None else header)],
+            # Sin la columna de país no se puede contar; se recalcula al pedirlo
+            'country_counts': country_counts(df) if 'País' in df.columns else None,
+        }
+        tmp_path = data_path + '.tmp'
+        df.reset_index(drop=True).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, data_path)
+        self._write_meta(meta_path, meta)
+
+    def read_excel(self, input_excel, sheet_index=0, columns=None, header=None):
+        """
+        Lee la hoja desde la caché o, si no es válida, con pd.read_excel y la guarda.
+
+        Args:
+            input_excel (str): Ruta del archivo Excel
+            sheet_index (int): Índice de la hoja
+            columns (list): Leer solo estas columnas (usecols; None = todas)
+            header (list): Encabezado completo de la hoja, ya leído, para los metadatos
+
+        Returns:
+            DataFrame: Hoja con las columnas pedidas como texto
+        """
+        df = self.load(input_excel, sheet_index, columns)
+        if df is not None:
+            self.hits += 1
+            return df
+        self.misses += 1
+        df = pd.read_excel(input_excel, sheet_name=sheet_index, dtype=str, usecols=columns)
+        if columns is not None and header is None:
+            header = read_excel_header(input_excel, sheet_index)
+        self.store(input_excel, df, sheet_index, header)
+        return df
+
+    def country_counts(self, input_excel, sheet_index=0):
+        """
+        Conteo de contactos por país guardado en la caché.
+
+        Args:
+            input_excel (str): Ruta del archivo Excel
+            sheet_index (int): Índice de la hoja
+
+        Returns:
+            dict: País -> número de filas, o None si no hay una entrada válida con la columna País
+        """
+        meta = self._load_meta(input_excel, sheet_index)
+        return None if meta is None else meta['country_counts']
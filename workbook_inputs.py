@@ -0,0 +1,205 @@
+"""
+Lectura de varios archivos Excel y hojas como un solo conjunto de contactos.
+
+Las rutas admiten comodines ("lotes/*.xlsx") y el selector de hojas puede
+ser "all", una lista de nombres o de índices ("Honduras,Perú" o "0,2"). Cada
+(archivo, hoja) se lee en un proceso distinto y las filas se concatenan en
+el orden de los archivos y las hojas. Cuando se leen varias hojas se añade la
+columna de procedencia ``Source`` con "archivo.xlsx:Hoja".
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from excel_stream import iter_excel_chunks
+from workbook_cache import WorkbookCache
+
+# Columna de procedencia (campo estándar "Source" de los contactos de GHL)
+SOURCE_COLUMN = 'Source'
+
+
+def expand_input_paths(patterns):
+    """
+    Expande rutas y comodines a una lista de archivos sin duplicados.
+
+    Args:
+        patterns (list): Rutas o patrones glob
+
+    Returns:
+        list: Archivos en el orden indicado (cada patrón ordenado alfabéticamente)
+
+    Raises:
+        FileNotFoundError: Si un patrón no coincide con ningún archivo
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches or not all(os.path.exists(m) for m in matches):
+            raise FileNotFoundError(f"Ningún archivo coincide con: {pattern}")
+        for match in matches:
+            if match not in paths:
+                paths.append(match)
+    return paths
+
+
+def parse_sheet_selector(spec):
+    """
+    Interpreta el selector de hojas de la línea de comandos.
+
+    Args:
+        spec (str): "all", o nombres/índices separados por comas (None = primera hoja)
+
+    Returns:
+        str o list: 'all' o lista de nombres (str) e índices (int)
+    """
+    if spec is None:
+        return [0]
+    if spec.strip().lower() == 'all':
+        return 'all'
+    items = []
+    for item in spec.split(','):
+        item = item.strip()
+        if item:
+            items.append(int(item) if item.lstrip('-').isdigit() else item)
+    return items or [0]
+
+
+def resolve_sheets(path, selector):
+    """
+    Traduce el selector a las hojas concretas de un archivo.
+
+    Args:
+        path (str): Archivo Excel
+        selector: Resultado de parse_sheet_selector
+
+    Returns:
+        list: Tuplas (índice, nombre) de las hojas seleccionadas
+
+    Raises:
+        ValueError: Si una hoja indicada no existe en el archivo
+    """
+    workbook = load_workbook(path, read_only=True)
+    try:
+        names = list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+    if selector == 'all':
+        return list(enumerate(names))
+    sheets = []
+    for item in selector:
+        if isinstance(item, int):
+            if not -len(names) <= item < len(names):
+                raise ValueError(f"La hoja {item} no existe en {path} ({len(names)} hojas)")
+            index = item % len(names)
+        elif item in names:
+            index = names.index(item)
+        else:
+            raise ValueError(f"La hoja '{item}' no existe en {path}: {names}")
+        if (index, names[index]) not in sheets:
+            sheets.append((index, names[index]))
+    return sheets
+
+
+def sheet_tasks(paths, selector=None):
+    """
+    Lista las hojas a leer de todos los archivos.
+
+    Args:
+        paths (list): Archivos Excel
+        selector: Resultado de parse_sheet_selector (None = primera hoja)
+
+    Returns:
+        list: Tuplas (ruta, índice de hoja, etiqueta de procedencia)
+    """
+    selector = [0] if selector is None else selector
+    return [(path, index, f"{os.path.basename(path)}:{name}")
+            for path in paths for index, name in resolve_sheets(path, selector)]
+
+
+def _read_sheet(task):
+    """Lee una hoja (en un proceso del pool); devuelve (DataFrame, acierto de caché)."""
+    path, index, cache_dir, plan = task
+    cache = WorkbookCache(cache_dir) if cache_dir is not None else None
+    if plan is not None:
+        df = plan.read_excel(path, index, workbook_cache=cache)
+    elif cache is not None:
+        df = cache.read_excel(path, index)
+    else:
+        df = pd.read_excel(path, sheet_name=index, dtype=str)
+    return df, cache is not None and cache.hits > 0
+
+
+def read_inputs(paths, selector=None, workers=4, workbook_cache=None, plan=None):
+    """
+    Lee todas las hojas seleccionadas de todos los archivos y las concatena.
+
+    Args:
+        paths (list): Archivos Excel (ya expandidos)
+        selector: Resultado de parse_sheet_selector (None = primera hoja)
+        workers (int): Procesos de lectura (1 = serial)
+        workbook_cache (WorkbookCache): Caché de hojas parseadas (opcional)
+        plan (MappingPlan): Leer solo las columnas de este plan (None = todas)
+
+    Returns:
+        tuple: (DataFrame combinado, lista de etiquetas de procedencia leídas)
+    """
+    tasks = sheet_tasks(paths, selector)
+    cache_dir = workbook_cache.cache_dir if workbook_cache is not None else None
+    jobs = [(path, index, cache_dir, plan) for path, index, _ in tasks]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(_read_sheet, jobs))
+    else:
+        results = [_read_sheet(job) for job in jobs]
+
+    frames = []
+    for (_, _, label), (df, hit) in zip(tasks, results):
+        if workbook_cache is not None:
+            if hit:
+                workbook_cache.hits += 1
+            else:
+                workbook_cache.misses += 1
+        if len(tasks) > 1:
+            df = df.copy()
+            df[SOURCE_COLUMN] = label
+        frames.append(df)
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return df, [label for _, _, label in tasks]
+
+
+def iter_input_chunks(paths, selector=None, chunk_size=5000, plan=None):
+    """
+    Recorre por bloques todas las hojas seleccionadas, una tras otra.
+
+    Args:
+        paths (list): Archivos Excel (ya expandidos)
+        selector: Resultado de parse_sheet_selector (None = primera hoja)
+        chunk_size (int): Número de filas por bloque
+        plan (MappingPlan): Leer solo las columnas de este plan (None = todas)
+
+    Yields:
+        DataFrame: Bloque de filas de una sola hoja; el índice es continuo entre
+        hojas y, si hay varias hojas, incluye la columna de procedencia
+    """
+    tasks = sheet_tasks(paths, selector)
+    offset = 0
+    for path, index, label in tasks:
+        end = offset
+        if plan is not None:
+            chunks = plan.iter_chunks(path, chunk_size=chunk_size, sheet_index=index)
+        else:
+            chunks = iter_excel_chunks(path, chunk_size=chunk_size, sheet_index=index)
+        for chunk in chunks:
+            chunk.index = chunk.index + offset
+            if len(tasks) > 1:
+                chunk[SOURCE_COLUMN] = label
+            end = chunk.index[-1] + 1
+            yield chunk
+        offset = end